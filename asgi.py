@@ -0,0 +1,232 @@
+"""
+ASGI entry point that serves the LLM endpoints with async handlers
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+POST /api/chat (JSON replies) and POST /api/quick-query run as coroutines.
+They await Gemini and GROQ through their async clients, and the stub
+backend through asyncio.sleep, so one process can hold hundreds of LLM
+calls in flight without a thread for each. The short blocking steps
+(weather lookups, database writes) run in worker threads inside the Flask
+app context. Every other route, including streaming chat, is served by the
+regular Flask app from a pool of ASGI_WSGI_WORKERS threads.
+"""
+
+import asyncio
+import json
+import os
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from blueprints import chat
+from main import create_app
+from services import chat_sessions, llm_router, response_cache, semantic_cache
+
+# Threads serving the Flask (WSGI) routes
+ASGI_WSGI_WORKERS = int(os.getenv("ASGI_WSGI_WORKERS", "32"))
+
+
+async def cached_response(endpoint, cache_key, text, generate):
+    """Exact-match cache, then answers to similar questions, then await generate()"""
+    cache = response_cache.get_cache(endpoint)
+    answer = cache.lookup(cache_key)
+    if answer:
+        # Exact hits keep their entry (and its expiry) as it is
+        return answer
+    answer = semantic_cache.lookup(endpoint, text, cache_key[1:])
+    if answer:
+        cache.set(cache_key, answer)
+        return answer
+    answer = await generate()
+    cache.set(cache_key, answer)
+    semantic_cache.remember(endpoint, text, cache_key[1:], answer)
+    return answer
+
+
+class AsyncApp:
+    """Async handlers for the LLM endpoints in front of the Flask app"""
+
+    def __init__(self, flask_app, wsgi_workers=ASGI_WSGI_WORKERS):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_workers)
+        self.allowed_origins = os.environ.get("ALLOWED_ORIGINS", "*").split(",")
+        self.routes = {
+            ("POST", "/api/chat"): self.chat,
+            ("POST", "/api/quick-query"): self.quick_query,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        handler = None
+        if scope["type"] == "http":
+            handler = self.routes.get((scope["method"], scope["path"]))
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        if handler is None or self.wants_event_stream(headers):
+            return await self.wsgi(scope, receive, send)
+
+        try:
+            data = json.loads(await self.read_body(receive) or b"null")
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            payload, status = await handler(data)
+        else:
+            payload, status = {"error": "Expected a JSON object"}, 400
+        await self.send_json(send, payload, status, headers.get("origin"))
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def wants_event_stream(headers):
+        # Streaming chat stays on the Flask route
+        accept = parse_accept_header(headers.get("accept"), MIMEAccept)
+        best = accept.best_match(["application/json", "text/event-stream"])
+        return best == "text/event-stream"
+
+    @staticmethod
+    async def read_body(receive):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return body
+
+    async def send_json(self, send, payload, status, origin):
+        body = json.dumps(payload).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        # Same policy as Flask-CORS in main.create_app
+        if origin and ("*" in self.allowed_origins or origin in self.allowed_origins):
+            headers += [
+                (b"access-control-allow-origin", origin.encode("latin-1")),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin"),
+            ]
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def run_sync(self, fn, *args):
+        """Run blocking app code (database, weather lookups) in a worker thread"""
+
+        def call():
+            with self.flask_app.app_context():
+                return fn(*args)
+
+        return await asyncio.to_thread(call)
+
+    async def chat(self, data):
+        message = data.get("message")
+        if not message:
+            return {"error": "Please provide a message"}, 400
+
+        session = None
+        if data.get("session_id"):
+            session = await self.run_sync(chat_sessions.get_session, data["session_id"])
+            if session is None:
+                return {"error": "Chat session not found"}, 404
+
+        system_prompt, prompt, user_language, cache_key = await self.run_sync(
+            chat.build_chat_prompt, message, session
+        )
+        try:
+
+            def generate():
+                return chat.agenerate_chat_response(
+                    system_prompt, prompt, user_language
+                )
+
+            if chat.uses_response_cache(session):
+                formatted_response = await cached_response(
+                    "chat", cache_key, message, generate
+                )
+            else:
+                formatted_response = await generate()
+            await self.run_sync(chat.log_chat_activity, message, formatted_response)
+
+            saved = session is not None and await self.run_sync(
+                chat.remember_exchange, session, message, formatted_response
+            )
+            return {
+                "response": formatted_response,
+                **chat.session_fields(session, saved),
+            }, 200
+
+        except Exception as e:
+            print(f"Gemini API error: {str(e)}")
+            return {
+                "response": chat.get_fallback_response(message, user_language),
+                **chat.session_fields(session, False),
+            }, 200
+
+    async def quick_query(self, data):
+        query = data.get("query")
+        task_type = data.get("type", "general")
+        if not query:
+            return {"error": "Query is required"}, 400
+
+        try:
+            if task_type == "classify":
+                categories = data.get("categories", chat.QUICK_QUERY_CATEGORIES)
+                classification = await asyncio.to_thread(
+                    chat.get_groq_classification, query, categories
+                )
+                return {"classification": classification}, 200
+
+            answered_by = []
+
+            async def generate():
+                task, system_prompt = chat.quick_query_prompt(task_type)
+                reply = await llm_router.agenerate(
+                    task,
+                    chat.QUICK_QUERY_PROVIDERS,
+                    query,
+                    system=system_prompt,
+                    **chat.QUICK_QUERY_OPTIONS,
+                )
+                answered_by.append(llm_router.answered_by())
+                return chat.enhance_with_emojis(reply.strip(), "en")
+
+            enhanced_response = await cached_response(
+                "quick_query",
+                chat.quick_query_cache_key(query, task_type),
+                query,
+                generate,
+            )
+            return {
+                "response": enhanced_response,
+                "type": task_type,
+                "powered_by": answered_by[0] if answered_by else "cache",
+            }, 200
+
+        except Exception as e:
+            print(f"GROQ quick query error: {str(e)}")
+            return {
+                "error": "Unable to process quick query at this time",
+                "fallback": "Please try the main chat for detailed assistance",
+            }, 500
+
+
+def create_asgi_app():
+    return AsyncApp(create_app())
+
+
+app = create_asgi_app()
@@ -0,0 +1,222 @@
+"""
+Concurrent-request capacity: gunicorn sync workers vs the ASGI app
+
+Starts the API twice with the stub LLM backend (see services/llm.py):
+once under gunicorn (gunicorn.conf.py) with --sync-workers sync workers,
+once under uvicorn with a single asgi:app process. Each mode is then driven
+by closed-loop clients at increasing concurrency for --duration seconds per
+level. Every request asks a new question, so no cache answers it. Reports
+throughput and latency per level; with a fixed stub latency, throughput x
+latency is the number of LLM calls the server keeps in flight. Clients speak
+plain HTTP/1.1 over asyncio streams, since on a small machine a full HTTP
+client library would be the bottleneck. Run from the backend directory:
+
+    python benchmarks/async_capacity.py --levels 16 64 256 --latency-ms 800
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import json
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode, sync_workers):
+    if mode == "sync":
+        # gunicorn.conf.py with plain sync workers, one request each
+        return [sys.executable, "-m", "gunicorn", "wsgi:app"], {
+            "GUNICORN_WORKER_CLASS": "sync",
+            "GUNICORN_WORKERS": str(sync_workers),
+            "GUNICORN_THREADS": "1",
+        }
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "asgi:app",
+        "--port",
+        "{port}",
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ], {}
+
+
+def start_server(command, latency_ms, env=None):
+    """Start a server on a free port with the stub backend; returns (process, port)
+
+    "{port}" in the command is replaced with the port; gunicorn gets it
+    through GUNICORN_BIND.
+    """
+    port = free_port()
+    env = dict(
+        os.environ,
+        LLM_BACKEND="stub",
+        LLM_STUB_LATENCY_MS=str(latency_ms),
+        LLM_STUB_LATENCY_SIGMA="0",
+        # Measure serving capacity, not the Gemini quota
+        GEMINI_RPM="0",
+        GEMINI_TPM="0",
+        SEMANTIC_CACHE_ENABLED="false",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_ACCESS_LOG="",
+        GUNICORN_LOG_LEVEL="warning",
+        **(env or {}),
+    )
+    process = subprocess.Popen(
+        [part.format(port=port) for part in command],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{' '.join(command)} did not start")
+
+
+class Connection:
+    """Keep-alive HTTP/1.1 connection that reconnects when the server closes it"""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def post_json(self, path, payload):
+        """POST a JSON body; returns the response status"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                "127.0.0.1", self.port
+            )
+        body = json.dumps(payload).encode("utf-8")
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        lines = head.split("\r\n")
+        headers = dict(
+            line.lower().split(": ", 1) for line in lines[1:] if ": " in line
+        )
+        await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            self.close()
+        return int(lines[0].split()[1])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def run_level(port, clients, duration, endpoint):
+    """Closed-loop clients for `duration` seconds; returns timings and errors"""
+    timings, errors = [], 0
+    counter = iter(range(10**9))
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        connection = Connection(port)
+        while time.perf_counter() < stop_at:
+            question = f"How do I protect my crop from pests? (farm {next(counter)})"
+            if endpoint == "chat":
+                path, payload = "/api/chat", {"message": question}
+            else:
+                path, payload = "/api/quick-query", {"query": question}
+            started = time.perf_counter()
+            try:
+                failed = await connection.post_json(path, payload) >= 400
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                connection.close()
+                failed = True
+            timings.append((time.perf_counter() - started) * 1000)
+            errors += failed
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return timings, errors, time.perf_counter() - started
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async serving capacity")
+    parser.add_argument("--levels", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--sync-workers", type=int, default=4)
+    parser.add_argument(
+        "--endpoint", choices=["quick-query", "chat"], default="quick-query"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"🚜 {args.endpoint}, stub latency {args.latency_ms:.0f} ms, "
+        f"{args.duration:.0f} s per level, sync = gunicorn x{args.sync_workers} "
+        f"sync workers, async = 1 uvicorn process\n"
+    )
+    print(
+        f"{'mode':>6} {'clients':>8} {'req/s':>8} {'in flight':>10} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'errors':>7}"
+    )
+    best = {}
+    for mode in args.modes:
+        command, env = server_command(mode, args.sync_workers)
+        process, port = start_server(command, args.latency_ms, env)
+        try:
+            # Unreported round so every worker has booted and served a request
+            asyncio.run(run_level(port, args.sync_workers * 2, 2, args.endpoint))
+            for clients in args.levels:
+                timings, errors, elapsed = asyncio.run(
+                    run_level(port, clients, args.duration, args.endpoint)
+                )
+                throughput = len(timings) / elapsed
+                in_flight = throughput * args.latency_ms / 1000
+                best[mode] = max(best.get(mode, 0), throughput)
+                print(
+                    f"{mode:>6} {clients:>8} {throughput:8.1f} {in_flight:10.1f} "
+                    f"{statistics.median(timings):9.1f} "
+                    f"{percentile(timings, 0.95):9.1f} {errors:>7}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+    print()
+    for mode, throughput in best.items():
+        print(
+            f"📈 {mode}: up to {throughput:.1f} requests/s, "
+            f"~{throughput * args.latency_ms / 1000:.0f} LLM calls in flight"
+        )
+
+
+if __name__ == "__main__":
+    main()
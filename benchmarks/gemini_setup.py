@@ -0,0 +1,83 @@
+"""
+Per-request Gemini setup cost: genai.configure() + new GenerativeModel vs the model registry
+
+No requests are sent; this times only what each request did before calling
+generate_content(). Run from the backend directory:
+
+    python benchmarks/gemini_setup.py --iterations 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+from services.gemini import ModelRegistry
+
+API_KEYS = ["benchmark-key-1", "benchmark-key-2"]
+
+
+def per_request_setup(api_key):
+    """What every request did before: reconfigure the SDK and build a model"""
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    # configure() drops the SDK's clients, so generate_content() builds a new one
+    model._client = genai_client.get_default_generative_client()
+    return model
+
+
+def registry_setup(registry, api_key):
+    return registry.get(api_key)
+
+
+def measure(label, func, iterations):
+    timings = []
+    for i in range(iterations):
+        api_key = API_KEYS[i % len(API_KEYS)]
+        started = time.perf_counter()
+        func(api_key)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(
+        f"{label:<28} mean {statistics.mean(timings):8.3f} ms   "
+        f"p50 {timings[len(timings) // 2]:8.3f} ms   "
+        f"p95 {timings[int(len(timings) * 0.95)]:8.3f} ms"
+    )
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini client setup benchmark")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.iterations} simulated requests alternating between 2 API keys\n")
+    before = measure("configure + GenerativeModel", per_request_setup, args.iterations)
+
+    registry = ModelRegistry()
+    started = time.perf_counter()
+    for api_key in API_KEYS:
+        registry.get(api_key)
+    print(
+        f"{'registry warm-up (once)':<28} {(time.perf_counter() - started) * 1000:8.3f} ms"
+    )
+
+    after = measure(
+        "registry.get",
+        lambda api_key: registry_setup(registry, api_key),
+        args.iterations,
+    )
+    print(f"\n⚡ {before / after:,.0f}x less setup per request")
+
+
+if __name__ == "__main__":
+    main()
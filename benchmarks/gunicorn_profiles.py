@@ -0,0 +1,109 @@
+"""
+Throughput of gunicorn.conf.py under different worker profiles
+
+Starts `gunicorn wsgi:app` once per profile with the stub LLM backend (see
+services/llm.py), overriding the GUNICORN_* settings, and drives each with
+--clients closed-loop clients for --duration seconds. Reports boot time,
+throughput, latency and the memory of the master and workers (PSS, so
+pages shared copy-on-write after preloading are split between processes).
+Run from the backend directory:
+
+    python benchmarks/gunicorn_profiles.py --clients 64 --latency-ms 800
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from async_capacity import percentile, run_level, start_server
+
+GUNICORN = [sys.executable, "-m", "gunicorn", "wsgi:app"]
+
+PROFILES = {
+    "sync x4": {
+        "GUNICORN_WORKER_CLASS": "sync",
+        "GUNICORN_WORKERS": "4",
+        "GUNICORN_THREADS": "1",
+    },
+    "gthread x2x4": {"GUNICORN_WORKERS": "2", "GUNICORN_THREADS": "4"},
+    "gthread x2x16": {"GUNICORN_WORKERS": "2", "GUNICORN_THREADS": "16"},
+    # Sized by gunicorn.conf.py from the CPU count and upstream concurrency
+    "default": {},
+    "default, no preload": {"GUNICORN_PRELOAD": "false"},
+}
+
+
+def process_tree(pid):
+    """The process and its direct children (gunicorn's master and workers)"""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            pids += [int(child) for child in children.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def pss_mb(pids):
+    """Proportional set size of the processes in MB (Linux only)"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except OSError:
+            return None
+    return total / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn worker profiles")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument(
+        "--endpoint", choices=["quick-query", "chat"], default="quick-query"
+    )
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES)
+    )
+    args = parser.parse_args()
+
+    print(
+        f"🚜 {args.endpoint}, stub latency {args.latency_ms:.0f} ms, "
+        f"{args.clients} clients, {args.duration:.0f} s per profile, "
+        f"{os.cpu_count()} CPUs\n"
+    )
+    print(
+        f"{'profile':>20} {'boot s':>7} {'req/s':>8} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'errors':>7} {'PSS MB':>8}"
+    )
+    for name in args.profiles:
+        started = time.perf_counter()
+        process, port = start_server(GUNICORN, args.latency_ms, PROFILES[name])
+        boot = time.perf_counter() - started
+        try:
+            # Unreported round so every worker has booted and served a request
+            asyncio.run(run_level(port, args.clients, 2, args.endpoint))
+            timings, errors, elapsed = asyncio.run(
+                run_level(port, args.clients, args.duration, args.endpoint)
+            )
+            memory = pss_mb(process_tree(process.pid))
+            print(
+                f"{name:>20} {boot:7.1f} {len(timings) / elapsed:8.1f} "
+                f"{statistics.median(timings):9.1f} "
+                f"{percentile(timings, 0.95):9.1f} {errors:>7} "
+                + (f"{memory:8.0f}" if memory is not None else f"{'n/a':>8}")
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Import-time budget for the app and the CLI entry points
+
+Imports each module in a fresh interpreter under `python -X importtime`
+and reports the median cumulative import time over --runs runs, plus the
+slowest top-level imports. Fails (exit status 1) if a module takes longer
+than --max-ms, or if importing it loads one of the SDKs that should only be
+imported on first use (main.LAZY_SDKS), so it can guard startup in CI.
+Run from the backend directory:
+
+    python benchmarks/import_time.py --max-ms 1000
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BACKEND_DIR)
+
+from main import LAZY_SDKS
+
+
+def import_times(module):
+    """{imported module: (cumulative µs, nesting depth)} for one fresh import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(cumulative), depth)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget")
+    parser.add_argument("--modules", nargs="+", default=["main", "db_manager"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        # Unreported run so bytecode caches are written
+        import_times(module)
+        runs = [import_times(module) for _ in range(args.runs)]
+        total_ms = statistics.median(run[module][0] for run in runs) / 1000
+
+        status = "✅" if total_ms <= args.max_ms else "❌"
+        print(
+            f"{status} import {module}: {total_ms:.0f} ms (budget {args.max_ms:.0f} ms)"
+        )
+        failed |= total_ms > args.max_ms
+
+        top_level = sorted(
+            (
+                (cumulative, name)
+                for name, (cumulative, depth) in runs[-1].items()
+                if depth == 1
+            ),
+            reverse=True,
+        )
+        for cumulative, name in top_level[: args.top]:
+            print(f"   {cumulative / 1000:7.1f} ms  {name}")
+
+        # A package's own line can be missing, so submodules count too
+        eager = [
+            sdk
+            for sdk in LAZY_SDKS
+            if any(name == sdk or name.startswith(sdk + ".") for name in runs[-1])
+        ]
+        if eager:
+            print(f"❌ import {module} loads {', '.join(eager)} eagerly")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Offline load test: the API under concurrent clients with the stub LLM backend
+
+Starts the app on a local threaded server with LLM_BACKEND=stub, so every
+Gemini and GROQ call is answered by services.llm.StubProvider after a
+simulated latency, then drives a mix of AI endpoints from concurrent
+clients and reports throughput and latency percentiles per endpoint.
+No API keys or network access are needed. Run from the backend directory:
+
+    python benchmarks/load_test.py --concurrency 32 --requests 2000 --latency-ms 800
+
+--gemini-latency-ms / --groq-latency-ms give one backend its own latency,
+e.g. a slow Gemini to see latency-aware routing and hedging at work.
+--gemini-rpm / --gemini-tpm apply the client-side Gemini rate limits, to
+see calls spill onto the second key and GROQ.
+--unique sets the share of requests that ask a question nobody asked
+before; the rest repeat earlier questions and exercise the response caches
+and in-flight coalescing.
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTIONS = [
+    "How do I control {t} in {c}?",
+    "What is the best fertilizer schedule for {c}?",
+    "When should I harvest {c} to avoid {t}?",
+    "Which organic methods work against {t} on {c}?",
+]
+CROPS = ["rice", "banana", "coconut", "pepper", "cardamom", "ginger", "tapioca"]
+TOPICS = ["leaf spot", "stem borer", "root rot", "aphids", "wilt", "mealybugs"]
+
+
+def build_payload(endpoint, question):
+    if endpoint == "chat":
+        return "/api/chat", {"message": question}
+    if endpoint == "quick-query":
+        return "/api/quick-query", {"query": question}
+    if endpoint == "knowledge":
+        return "/api/knowledge/content", {"prompt": question, "category_id": 2}
+    return "/api/schemes/quick-match", {"query": question}
+
+
+ENDPOINTS = ["chat", "quick-query", "knowledge", "scheme-match"]
+
+
+def make_questions(count, unique, rng):
+    """Questions for `count` requests; a `unique` share are never repeated"""
+    repeated = [
+        q.format(t=t, c=c) for q in QUESTIONS for t in TOPICS[:2] for c in CROPS[:3]
+    ]
+    questions = []
+    for index in range(count):
+        if rng.random() < unique:
+            template = rng.choice(QUESTIONS)
+            crop, topic = rng.choice(CROPS), rng.choice(TOPICS)
+            questions.append(f"{template.format(t=topic, c=crop)} (farm {index})")
+        else:
+            questions.append(rng.choice(repeated))
+    return questions
+
+
+def start_server(app):
+    from werkzeug.serving import make_server
+
+    # Per-request access logs would swamp the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline API load test")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    # Per-backend overrides, e.g. a slow Gemini to see routing and hedging
+    parser.add_argument("--gemini-latency-ms", type=float)
+    parser.add_argument("--groq-latency-ms", type=float)
+    # Client-side Gemini quota per key; 0 leaves the stub unlimited
+    parser.add_argument("--gemini-rpm", type=float, default=0)
+    parser.add_argument("--gemini-tpm", type=float, default=0)
+    parser.add_argument("--unique", type=float, default=0.5)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # services.llm reads its settings at import time
+    os.environ.update(
+        {
+            "LLM_BACKEND": "stub",
+            "LLM_STUB_LATENCY_MS": str(args.latency_ms),
+            "LLM_STUB_LATENCY_SIGMA": str(args.latency_sigma),
+            "LLM_STUB_ERROR_RATE": str(args.error_rate),
+            "LLM_STUB_SEED": str(args.seed),
+            "GEMINI_RPM": str(args.gemini_rpm),
+            "GEMINI_TPM": str(args.gemini_tpm),
+        }
+    )
+    if args.gemini_latency_ms is not None:
+        os.environ["LLM_STUB_GEMINI_LATENCY_MS"] = str(args.gemini_latency_ms)
+    if args.groq_latency_ms is not None:
+        os.environ["LLM_STUB_GROQ_LATENCY_MS"] = str(args.groq_latency_ms)
+    import requests
+
+    from main import create_app
+    from services import llm, llm_router, rate_limiter, singleflight
+
+    server, base_url = start_server(create_app())
+    rng = random.Random(args.seed)
+    questions = make_questions(args.requests, args.unique, rng)
+    plan = [(rng.choice(args.endpoints), question) for question in questions]
+
+    local = threading.local()
+    timings = {endpoint: [] for endpoint in args.endpoints}
+    failures = {endpoint: 0 for endpoint in args.endpoints}
+
+    def send(item):
+        endpoint, question = item
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        path, payload = build_payload(endpoint, question)
+        started = time.perf_counter()
+        response = session.post(base_url + path, json=payload, timeout=120)
+        elapsed = (time.perf_counter() - started) * 1000
+        timings[endpoint].append(elapsed)
+        if response.status_code >= 400:
+            failures[endpoint] += 1
+
+    print(
+        f"🚜 {args.requests} requests, {args.concurrency} clients, stub latency "
+        f"{args.latency_ms:.0f} ms (sigma {args.latency_sigma}), "
+        f"error rate {args.error_rate:.0%}, unique {args.unique:.0%}\n"
+    )
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(send, plan))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    print(
+        f"{'endpoint':>14} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7}"
+    )
+    for endpoint, results in timings.items():
+        if not results:
+            continue
+        print(
+            f"{endpoint:>14} {len(results):>9} {statistics.median(results):9.1f} "
+            f"{percentile(results, 0.95):9.1f} {percentile(results, 0.99):9.1f} "
+            f"{failures[endpoint]:>7}"
+        )
+
+    stub = llm.get_stats()["stub"]
+    print(f"\n📈 Throughput: {args.requests / elapsed:.1f} requests/s")
+    print(f"🤖 Stub LLM calls: {stub['calls']} ({stub['errors']} simulated errors)")
+    print(f"🔗 Coalesced calls: {singleflight.get_flight().get_stats()['shared']}")
+    routing = llm_router.get_stats()
+    print(
+        f"🔀 Hedged requests: {routing['hedges']} ({routing['hedge_wins']} won), "
+        f"failovers: {routing['failovers']}"
+    )
+    limits = rate_limiter.get_stats()
+    print(
+        f"⏳ Gemini rate limits: {limits['granted']} granted, "
+        f"{limits['spilled']} spilled to the other key, "
+        f"{limits['rejected']} sent to GROQ or fallbacks"
+    )
+    for provider, metrics in routing["providers"].items():
+        for metric, stats in metrics.items():
+            print(
+                f"   {provider} {metric}: p50 {stats['p50_ms']} ms, "
+                f"p95 {stats['p95_ms']} ms, errors {stats['error_rate']:.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Input tokens per request that are the static system prompt
+
+Renders every registered prompt template (services/prompts.py) with sample
+requests and reports how many of each request's input tokens are the
+static prefix: the part sent as a Gemini system instruction, identical on
+every call. Gemini's implicit prompt caching bills such a prefix at the
+cached-input rate, but only once it reaches GEMINI_IMPLICIT_CACHE_MIN_TOKENS;
+the "cacheable" column shows which templates do. Counts are estimated at ~4 characters per
+token, which undercounts Malayalam; --count-tokens asks the Gemini API
+instead (needs GEMINI_API_KEY_1). Live savings are reported per template
+under "prompts" in /api/llm/stats. Run from the backend directory:
+
+    python benchmarks/prompt_prefix.py
+"""
+
+import argparse
+import os
+import sys
+import warnings
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blueprints import chat  # noqa: F401  registers the chat templates
+from services import gemini, prompts
+
+SAMPLE_FIELDS = {
+    "message": "My paddy leaves are turning yellow after the rains. What should I do?",
+    "weather_context": (
+        "Current Weather Data for Kochi:\n- Temperature: 29°C\n- Feels like: 33°C\n"
+        "- Condition: light rain\n- Humidity: 84%\n- Wind Speed: 3.1 m/s\n\n"
+        "Please use this real-time weather data to answer the user's question.\n\n"
+    ),
+    "text": "Apply neem oil in the evening and keep the field drained for two days.",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static prompt prefix per request")
+    parser.add_argument(
+        "--count-tokens",
+        action="store_true",
+        help="Count tokens with the Gemini API instead of estimating",
+    )
+    args = parser.parse_args()
+
+    if args.count_tokens:
+        model = gemini.get_model(os.environ["GEMINI_API_KEY_1"])
+
+        def count(text):
+            return model.count_tokens(text).total_tokens
+
+    else:
+        count = prompts.estimate_text_tokens
+
+    print(
+        f"🚜 Tokens per request ({'Gemini count_tokens' if args.count_tokens else 'estimated'})\n"
+    )
+    print(
+        f"{'template':>20} {'static':>8} {'dynamic':>8} {'static share':>13} "
+        f"{'cacheable':>10}"
+    )
+    cacheable = 0
+    for template in prompts.templates():
+        fields = {field: SAMPLE_FIELDS.get(field, "") for field in template.fields}
+        system, prompt = template.system, template.user.format(**fields)
+        static, dynamic = count(system), count(prompt)
+        eligible = static >= prompts.GEMINI_IMPLICIT_CACHE_MIN_TOKENS
+        cacheable += eligible
+        print(
+            f"{template.name:>20} {static:8d} {dynamic:8d} "
+            f"{static / (static + dynamic):12.0%} {'yes' if eligible else 'no':>10}"
+        )
+    if cacheable:
+        print(
+            "\n📉 On a cache hit the static tokens of cacheable templates are billed "
+            "as cached input; see cached_tokens_per_call in /api/llm/stats"
+        )
+    else:
+        print(
+            f"\n⚠️  No template reaches the {prompts.GEMINI_IMPLICIT_CACHE_MIN_TOKENS}-token "
+            "implicit caching minimum, so no input is billed at the cached rate"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Semantic cache lookup latency at 10k, 100k and 1M cached questions
+
+Fills a SemanticCache with synthetic farming questions (a vectorized pool of
+templated questions, jittered to reach the larger sizes) and times lookups
+with exact brute-force search and with the LSH index, plus the share of
+brute-force cache hits (similarity above the threshold) that LSH also
+finds. Run from the backend directory:
+
+    python benchmarks/semantic_cache.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.semantic_cache import HashingVectorizer, LSHIndex, SemanticCache
+
+CROPS = ["rice", "banana", "coconut", "pepper", "cardamom", "rubber", "ginger",
+         "turmeric", "tapioca", "mango", "cashew", "coffee", "tea", "arecanut"]  # fmt: skip
+TOPICS = ["pests", "fertilizer", "irrigation", "disease", "sowing time", "harvest",
+          "spacing", "pruning", "weeds", "yield", "market price", "storage"]  # fmt: skip
+FORMS = ["how to manage {t} in {c}", "best {t} for {c}", "{c} {t} advice",
+         "what about {t} for my {c} farm", "{t} problems in {c} plants",
+         "when should I check {t} on {c}"]  # fmt: skip
+PLACES = ["", " in kottayam", " in wayanad", " during monsoon", " in summer",
+          " on a small farm", " organically", " this season"]  # fmt: skip
+
+CONTEXT = ("en", "gemini-2.5-flash", None, None)
+
+
+def question_pool():
+    return [
+        form.format(t=topic, c=crop) + place
+        for form, topic, crop, place in itertools.product(FORMS, TOPICS, CROPS, PLACES)
+    ]
+
+
+def build_vectors(size, pool_vectors, rng):
+    """`size` unit vectors: pool questions plus small jitter for the extra rows"""
+    rows = pool_vectors[rng.integers(0, len(pool_vectors), size)]
+    rows = rows + rng.normal(0, 0.015, rows.shape).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[int(len(timings) * fraction)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic cache lookup benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    vectorizer = HashingVectorizer()
+    pool = question_pool()
+    started = time.perf_counter()
+    pool_vectors = np.stack([vectorizer.transform(q) for q in pool])
+    per_question = (time.perf_counter() - started) / len(pool) * 1000
+    print(f"🧮 Vectorized {len(pool)} questions ({per_question:.3f} ms each)\n")
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'entries':>10} {'search':>12} {'p50 ms':>9} {'p95 ms':>9} {'hit recall':>10}"
+    )
+    for size in args.sizes:
+        vectors = build_vectors(size, pool_vectors, rng)
+        cache = SemanticCache(
+            "benchmark", max_entries=size, brute_force_max=size, vectorizer=vectorizer
+        )
+        cache.add_vectors(vectors, CONTEXT, range(size))
+
+        started = time.perf_counter()
+        cache.lsh = LSHIndex(vectorizer.dim)
+        cache.lsh.index_all(cache.vectors[:size])
+        build_seconds = time.perf_counter() - started
+
+        queries = build_vectors(args.queries, pool_vectors, rng)
+        results = {}
+        for label, exact in (("brute-force", True), ("lsh", False)):
+            timings, top = [], []
+            for query in queries:
+                started = time.perf_counter()
+                matches = cache.search(query, CONTEXT, exact=exact)
+                timings.append((time.perf_counter() - started) * 1000)
+                top.append(matches[0][1] if matches else 0.0)
+            results[label] = (timings, top)
+
+        exact_hits = np.array(results["brute-force"][1]) >= cache.threshold
+        for label, (timings, top) in results.items():
+            # Share of exact-search cache hits that this search also finds
+            hits = np.array(top) >= cache.threshold
+            recall = (hits & exact_hits).sum() / max(exact_hits.sum(), 1)
+            print(
+                f"{size:>10,} {label:>12} {statistics.median(timings):9.3f} "
+                f"{percentile(timings, 0.95):9.3f} {recall:10.3f}"
+            )
+        print(f"{'':>10} {'lsh build':>12} {build_seconds * 1000:9.0f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
-import os
-
-import google.generativeai as genai
 from flask import Blueprint, jsonify
 
 from models import Activity, Crop, Farm, Farmer
+from services import llm
 
 advisory_bp = Blueprint("advisory", __name__)
 
@@ -45,15 +43,14 @@ def get_advisory(farmer_id):
                     prompt += f"- {activity.date.strftime('%Y-%m-%d')}: {activity.activity_type} - {activity.details}\n"
 
         # Use consistent API key naming (GEMINI_API_KEY_1 for main advisory)
-        api_key = os.environ.get("GEMINI_API_KEY_1")
-        if not api_key:
+        try:
+            model = llm.get_gemini("GEMINI_API_KEY_1")
+        except ValueError:
             return jsonify({"error": "Gemini API key not configured"}), 500
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        text = model.generate(prompt)
 
-        return jsonify({"advisory": response.text})
+        return jsonify({"advisory": text})
 
     except Exception as e:
         return jsonify({"error": f"Failed to generate advisory: {str(e)}"}), 500
@@ -1,52 +1,46 @@
 import json
-import os
 import re
+from contextlib import closing
 
-import google.generativeai as genai
-import PIL.Image
-import requests
 from flask import Blueprint, jsonify, request
-from groq import Groq
 
 from blueprints.activity import log_activity_from_chat
+from models import Farmer, db
+from services import (
+    chat_sessions,
+    gemini,
+    llm,
+    llm_router,
+    prompts,
+    response_cache,
+    semantic_cache,
+    singleflight,
+    weather,
+)
+from services.streaming import (
+    TextChunker,
+    sse_event,
+    sse_response,
+    wants_event_stream,
+)
 
 chat_bp = Blueprint("chat", __name__)
 
-# Initialize clients - will be initialized on first use
-groq_client = None
+GROQ_QUICK_QUERY_MODEL = "llama-3.1-8b-instant"
 
+# Generation settings for the shared chat and translation models
+CHAT_GENERATION_CONFIG = {"temperature": 0.7, "max_output_tokens": 1500, "top_p": 0.9}
+TRANSLATION_GENERATION_CONFIG = {"temperature": 0.1, "max_output_tokens": 2000}
 
-def get_groq_client():
-    """Get GROQ client with proper error handling"""
-    global groq_client
-    if groq_client is None:
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ API key not configured")
-        groq_client = Groq(api_key=api_key)
-    return groq_client
 
+def get_gemini_chat_client(generation_config=None):
+    """Get Gemini provider for main AI chat (uses API key 1 for heavy usage)"""
+    return llm.get_gemini("GEMINI_API_KEY_1", generation_config)
 
-def get_gemini_chat_client():
-    """Get Gemini client for main AI chat (uses API key 1 for heavy usage)"""
-    api_key = os.getenv("GEMINI_API_KEY_1")
-    if not api_key:
-        raise ValueError("Gemini API key 1 not configured for chat")
 
-    # Configure with first API key each time to ensure correct key is used
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-2.5-flash")
-
-
-def get_gemini_utils_client():
-    """Get Gemini client for translation and utilities (uses API key 2)"""
-    api_key = os.getenv("GEMINI_API_KEY_2")
-    if not api_key:
-        raise ValueError("Gemini API key 2 not configured for utilities")
-
-    # Configure with second API key each time to ensure correct key is used
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-2.5-flash")
+def get_gemini_utils_client(generation_config=None):
+    """Get Gemini provider for translation and utilities (uses API key 2)"""
+    return llm.get_gemini("GEMINI_API_KEY_2", generation_config)
 
 
 def get_gemini_client():
@@ -54,54 +48,72 @@ def get_gemini_client():
     return get_gemini_chat_client()
 
 
-def get_groq_summary(text, max_length=100):
-    """Use GROQ for lightweight text summarization tasks"""
+# Candidate providers per task, in order of preference. The router may pick a
+# later one when it is faster, or when an earlier one is failing.
+CHAT_PROVIDERS = [
+    lambda: get_gemini_chat_client(CHAT_GENERATION_CONFIG),
+    lambda: llm.get_groq(llm.GROQ_CHAT_MODEL),
+]
+TRANSLATION_PROVIDERS = [
+    lambda: get_gemini_utils_client(TRANSLATION_GENERATION_CONFIG),
+    lambda: llm.get_groq(llm.GROQ_CHAT_MODEL),
+]
+QUICK_QUERY_PROVIDERS = [
+    lambda: llm.get_groq(GROQ_QUICK_QUERY_MODEL),
+    get_gemini_utils_client,
+]
+
+
+def get_groq_summary(text, max_length=100, fallback=True):
+    """Use GROQ for lightweight text summarization tasks
+
+    If the LLM call fails, returns the text truncated to `max_length`, or
+    with fallback=False raises instead.
+    """
     try:
-        client = get_groq_client()
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"Summarize the following text in maximum {max_length} characters. Keep it concise and relevant for farmers.",
-                },
-                {"role": "user", "content": text},
-            ],
-            max_tokens=50,
+        reply = llm_router.generate(
+            "summarize",
+            QUICK_QUERY_PROVIDERS,
+            text,
+            system=f"Summarize the following text in maximum {max_length} characters. Keep it concise and relevant for farmers.",
+            # About 3 characters per token, never less than the old default
+            max_tokens=max(50, max_length // 3),
             temperature=0.3,
         )
-        return response.choices[0].message.content.strip()
+        return reply.strip()
     except Exception as e:
         print(f"GROQ summarization error: {e}")
+        if not fallback:
+            raise
         return text[:max_length] + "..." if len(text) > max_length else text
 
 
 def get_groq_classification(text, categories):
     """Use GROQ for lightweight text classification tasks"""
     try:
-        client = get_groq_client()
         categories_str = ", ".join(categories)
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"Classify the following text into one of these categories: {categories_str}. Respond with only the category name.",
-                },
-                {"role": "user", "content": text},
-            ],
+        reply = llm_router.generate(
+            "classify",
+            QUICK_QUERY_PROVIDERS,
+            text,
+            system=f"Classify the following text into one of these categories: {categories_str}. Respond with only the category name.",
             max_tokens=10,
             temperature=0.1,
         )
-        result = response.choices[0].message.content.strip()
+        result = reply.strip()
         return result if result in categories else categories[0]
     except Exception as e:
         print(f"GROQ classification error: {e}")
         return categories[0] if categories else "unknown"
 
 
-def enhance_with_emojis(text, language="en"):
-    """Add contextual emojis to AI responses"""
+def enhance_with_emojis(text, language="en", greeting=True, closing=True):
+    """Add contextual emojis to AI responses
+
+    Streamed responses are enhanced segment by segment, so the greeting emoji
+    is only added to the first segment and the closing emoji is left to the
+    caller once the whole response is known (see get_closing_emoji).
+    """
     import re
 
     # Define emoji mappings for different contexts
@@ -173,24 +185,35 @@ def enhance_with_emojis(text, language="en"):
         r"^(welcome|സ്വാഗതം)",
     ]
 
-    for pattern in greeting_patterns:
-        if re.search(pattern, enhanced_text, re.IGNORECASE):
-            enhanced_text = "🙏 " + enhanced_text
-            break
+    if greeting:
+        for pattern in greeting_patterns:
+            if re.search(pattern, enhanced_text, re.IGNORECASE):
+                enhanced_text = "🙏 " + enhanced_text
+                break
 
-    # Add farming context emoji at the end if it's farming advice
-    farming_keywords = ["crop", "farm", "cultivation", "agriculture", "കൃഷി", "കർഷക"]
-    if any(keyword in enhanced_text.lower() for keyword in farming_keywords):
-        if not enhanced_text.endswith("🌾") and not enhanced_text.endswith("🚜"):
-            enhanced_text += " 🌾"
+    if closing:
+        enhanced_text += get_closing_emoji(enhanced_text)
 
     return enhanced_text
 
 
-def format_ai_response(response):
-    """Format AI response for better readability"""
+def get_closing_emoji(text):
+    """Farming context emoji to append at the end if the text is farming advice"""
+    farming_keywords = ["crop", "farm", "cultivation", "agriculture", "കൃഷി", "കർഷക"]
+    if any(keyword in text.lower() for keyword in farming_keywords):
+        if not text.endswith("🌾") and not text.endswith("🚜"):
+            return " 🌾"
+    return ""
+
+
+def format_ai_response(response, strip=True):
+    """Format AI response for better readability
+
+    Pass strip=False for a streamed segment so the whitespace that separates
+    it from the previous segment is kept.
+    """
     # Clean up the response
-    formatted = response.strip()
+    formatted = response.strip() if strip else response
 
     # Remove excessive line breaks (more than 2 consecutive newlines)
     formatted = re.sub(r"\n{3,}", "\n\n", formatted)
@@ -204,7 +227,7 @@ def format_ai_response(response):
     # Clean up any remaining excessive whitespace
     formatted = re.sub(r"[ \t]+", " ", formatted)
 
-    return formatted.strip()
+    return formatted.strip() if strip else formatted
 
 
 def get_fallback_response(message, language):
@@ -235,50 +258,186 @@ Thank you for your question! I'm currently experiencing technical difficulties a
 Please try again later! 🤝"""
 
 
-@chat_bp.route("/chat", methods=["POST"])
-def chat():
-    message = request.json.get("message")
-    if not message:
-        return jsonify({"error": "Please provide a message"}), 400
-
-    # Check if message is asking about weather
-    weather_keywords = [
-        "weather",
-        "temperature",
-        "rain",
-        "forecast",
-        "കാലാവസ്ഥ",
-        "താപനില",
-        "മഴ",
+def detect_language(text):
+    # Simple language detection based on character patterns
+    malayalam_chars = set("അആഇഈഉഊഋഎഏഐഒഓഔകഖഗഘങചഛജഝഞടഠഡഢണതഥദധനപഫബഭമയരലവശഷസഹളഴറ")
+    text_chars = set(text)
+    if malayalam_chars.intersection(text_chars):
+        return "ml"
+    return "en"
+
+
+def log_chat_activity(message, response):
+    """Log activity if mentioned"""
+    activity_keywords = [
+        "sowing",
+        "irrigation",
+        "pest control",
+        "fertilizer",
+        "harvesting",
+        "planting",
+        "watering",
+        "വിതയൽ",
+        "ജലസേചനം",
     ]
-    is_weather_query = any(keyword in message.lower() for keyword in weather_keywords)
-
-    # Get weather data if it's a weather-related query
-    weather_context = ""
-    if is_weather_query:
+    if any(keyword in message.lower() for keyword in activity_keywords):
         try:
-            from blueprints.home import get_weather_data
+            log_activity_from_chat(message, response)
+        except Exception as log_error:
+            print(f"Activity logging failed: {log_error}")
 
-            weather_data = get_weather_data("Kochi")
-            if weather_data and "current" in weather_data:
-                current = weather_data["current"]
-                weather_context = f"\n\nCurrent Weather Data for Kochi:\n- Temperature: {current['main']['temp']}°C\n- Feels like: {current['main']['feels_like']}°C\n- Condition: {current['weather'][0]['description']}\n- Humidity: {current['main']['humidity']}%\n- Wind Speed: {current['wind']['speed']} m/s\n\nPlease use this real-time weather data to answer the user's question."
-        except Exception as e:
-            print(f"Error fetching weather data for chat: {e}")
 
-    # Detect language and create appropriate system prompt
-    def detect_language(text):
-        # Simple language detection based on character patterns
-        malayalam_chars = set("അആഇഈഉഊഋഎഏഐഒഓഔകഖഗഘങചഛജഝഞടഠഡഢണതഥദധനപഫബഭമയരലവശഷസഹളഴറ")
-        text_chars = set(text)
-        if malayalam_chars.intersection(text_chars):
-            return "ml"
-        return "en"
+def generate_chat_response(system_prompt, prompt, user_language):
+    """Generate, emoji-enhance and format a chat response"""
+    # Gemini (API key 1) unless GROQ is currently faster or Gemini is failing
+    ai_response = llm_router.generate(
+        "generate", CHAT_PROVIDERS, prompt, system=system_prompt
+    )
+
+    # Enhance response with contextual emojis
+    enhanced_response = enhance_with_emojis(ai_response, user_language)
+
+    # Format the response for better readability
+    return format_ai_response(enhanced_response)
+
+
+async def agenerate_chat_response(system_prompt, prompt, user_language):
+    """generate_chat_response() for the async app"""
+    ai_response = await llm_router.agenerate(
+        "generate", CHAT_PROVIDERS, prompt, system=system_prompt
+    )
+    return format_ai_response(enhance_with_emojis(ai_response, user_language))
 
-    user_language = detect_language(message)
 
-    if user_language == "ml":
-        system_prompt = """നിങ്ങൾ കൃഷി സഖി ആണ്, കൃഷി, വിള പരിപാലനം, കാർഷിക രീതികൾ എന്നിവയിൽ വിദഗ്ധനായ ഒരു AI കാർഷിക സഹായി. നിങ്ങൾ കർഷകർക്ക് സഹായകരവും കൃത്യവും പ്രായോഗികവുമായ ഉപദേശങ്ങൾ മലയാളത്തിൽ നൽകുന്നു. 
+def summarize_turns(text, max_length):
+    # A truncated transcript is no summary, so failures surface as fold errors
+    return get_groq_summary(text, max_length, fallback=False)
+
+
+def remember_exchange(session, message, response):
+    """Add a message and its reply to the chat session; returns whether it was saved"""
+    try:
+        return chat_sessions.record_exchange(
+            session, message, response, summarize_turns
+        )
+    except Exception as e:
+        print(f"Chat session update failed: {e}")
+        db.session.rollback()
+        return False
+
+
+def session_fields(session, saved):
+    """Response fields for a chat session: its id and whether the turn was saved"""
+    if session is None:
+        return {}
+    return {"session_id": session.id, "session_saved": saved}
+
+
+def uses_response_cache(session):
+    # Follow-ups are answered in the context of the conversation, so they
+    # cannot share cached answers; a session's first message still can
+    return session is None or not session.has_history
+
+
+def stream_chat_events(
+    system_prompt, prompt, message, user_language, cache_key, session=None
+):
+    """Stream a Gemini chat response as SSE events, post-processed per segment
+
+    Emits {"delta": ...} events as text arrives, then a "done" event with the
+    complete formatted response (the same text the JSON endpoint returns).
+    Cached responses are sent as a single delta.
+    """
+    cache = response_cache.get_cache("chat")
+    use_cache = uses_response_cache(session)
+    # The exact-match cache first, then answers to similarly worded questions
+    cached = use_cache and cache.lookup(cache_key)
+    if use_cache and not cached:
+        cached = semantic_cache.lookup("chat", message, cache_key[1:])
+        if cached:
+            # Exact hits keep their entry (and its expiry) as it is
+            cache.set(cache_key, cached)
+    if cached:
+        log_chat_activity(message, cached)
+        saved = session is not None and remember_exchange(session, message, cached)
+        yield sse_event({"delta": cached})
+        yield sse_event(
+            {"response": cached, **session_fields(session, saved)}, event="done"
+        )
+        return
+
+    chunker = TextChunker()
+    parts = []
+    completed = False
+
+    def process(segment):
+        if not parts:
+            segment = segment.lstrip()
+        enhanced = enhance_with_emojis(
+            segment, user_language, greeting=not parts, closing=False
+        )
+        return format_ai_response(enhanced, strip=False)
+
+    try:
+        chunks = llm_router.stream(
+            "generate", CHAT_PROVIDERS, prompt, system=system_prompt
+        )
+        with closing(chunks):
+            for chunk in chunks:
+                for segment in chunker.feed(chunk):
+                    text = process(segment)
+                    if text:
+                        parts.append(text)
+                        yield sse_event({"delta": text})
+
+        tail = process(chunker.flush()).rstrip()
+        tail += get_closing_emoji("".join(parts) + tail)
+        if tail:
+            parts.append(tail)
+            yield sse_event({"delta": tail})
+        completed = True
+    except Exception as e:
+        print(f"LLM streaming error: {str(e)}")
+        if parts:
+            yield sse_event({"error": "Response interrupted"}, event="error")
+        else:
+            # Nothing was sent yet, so stream the fallback response instead
+            parts.append(get_fallback_response(message, user_language))
+            yield sse_event({"delta": parts[0]})
+
+    formatted_response = "".join(parts)
+    saved = False
+    if completed and formatted_response:
+        if use_cache:
+            cache.set(cache_key, formatted_response)
+            semantic_cache.remember("chat", message, cache_key[1:], formatted_response)
+        if session is not None:
+            saved = remember_exchange(session, message, formatted_response)
+    log_chat_activity(message, formatted_response)
+    yield sse_event(
+        {"response": formatted_response, **session_fields(session, saved)},
+        event="done",
+    )
+
+
+@chat_bp.route("/chat", methods=["POST"])
+def chat():
+    # Clients that send Accept: text/event-stream get the streaming response
+    return handle_chat(stream=wants_event_stream(request))
+
+
+@chat_bp.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """Stream the chat response as Server-Sent Events"""
+    return handle_chat(stream=True)
+
+
+# Chat system prompts by reply language; the conversation so far (for a chat
+# session), the weather context and the message follow them in the user prompt
+CHAT_PROMPTS = {
+    "ml": prompts.register(
+        "chat.ml",
+        """നിങ്ങൾ കൃഷി സഖി ആണ്, കൃഷി, വിള പരിപാലനം, കാർഷിക രീതികൾ എന്നിവയിൽ വിദഗ്ധനായ ഒരു AI കാർഷിക സഹായി. നിങ്ങൾ കർഷകർക്ക് സഹായകരവും കൃത്യവും പ്രായോഗികവുമായ ഉപദേശങ്ങൾ മലയാളത്തിൽ നൽകുന്നു. 
 
 **IMPORTANT: Always include relevant emojis in your responses to make them more engaging and visual. Use farming, weather, plant, and food related emojis contextually throughout your message.**
 
@@ -304,9 +463,12 @@ def chat():
 - പ്രധാനപ്പെട്ട കാര്യങ്ങൾക്കായി **ബോൾഡ് ടെക്സ്റ്റ്** ഉപയോഗിക്കുക
 - ഉത്തരങ്ങൾ നന്നായി ക്രമീകരിച്ച് വായിക്കാൻ എളുപ്പമാക്കുക
 - പ്രധാനം: വാക്യങ്ങൾക്കിടയിൽ അധിക ലൈൻ ബ്രേക്കുകൾ ഉപയോഗിക്കരുത്
-- ഖണ്ഡികകൾ സംക്ഷിപ്തവും നന്നായി ബന്ധിപ്പിച്ചതുമായി നിലനിർത്തുക"""
-    else:
-        system_prompt = """You are Krishi Sakhi, an AI farming assistant specialized in agriculture, crop management, and farming practices. You provide helpful, accurate, and practical advice to farmers in English. 
+- ഖണ്ഡികകൾ സംക്ഷിപ്തവും നന്നായി ബന്ധിപ്പിച്ചതുമായി നിലനിർത്തുക""",
+        user="{history}{weather_context}User: {message}",
+    ),
+    "en": prompts.register(
+        "chat.en",
+        """You are Krishi Sakhi, an AI farming assistant specialized in agriculture, crop management, and farming practices. You provide helpful, accurate, and practical advice to farmers in English. 
 
 **IMPORTANT: Always include relevant emojis in your responses to make them more engaging and visual. Use farming, weather, plant, and food related emojis contextually throughout your message.**
 
@@ -333,76 +495,118 @@ Format your responses clearly with proper structure:
 - Keep responses well-organized and easy to read
 - Avoid using ### or ## markdown headers unnecessarily
 - IMPORTANT: Do not use excessive line breaks or blank lines between sentences
-- Keep paragraphs concise and well-connected"""
+- Keep paragraphs concise and well-connected""",
+        user="{history}{weather_context}User: {message}",
+    ),
+}
 
-    try:
-        # Use dedicated Gemini chat client for main AI conversations (API key 1)
-        model = get_gemini_chat_client()
-
-        # Create the conversation context with weather data if available
-        full_prompt = f"{system_prompt}{weather_context}\n\nUser: {message}"
-
-        # Generate response using Gemini
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=1500,
-                top_p=0.9,
-            ),
+
+def build_chat_prompt(message, session=None):
+    """System prompt, user prompt, detected language and response cache key"""
+    # Check if message is asking about weather
+    weather_keywords = [
+        "weather",
+        "temperature",
+        "rain",
+        "forecast",
+        "കാലാവസ്ഥ",
+        "താപനില",
+        "മഴ",
+    ]
+    is_weather_query = any(keyword in message.lower() for keyword in weather_keywords)
+
+    # Get weather data if it's a weather-related query
+    weather_context = ""
+    weather_bucket = None
+    if is_weather_query:
+        try:
+            report = weather.get_weather("Kochi")
+            if report:
+                current = report.current
+                weather_bucket = report.bucket()
+                weather_context = f"Current Weather Data for Kochi:\n- Temperature: {current.temperature}°C\n- Feels like: {current.feels_like}°C\n- Condition: {current.description}\n- Humidity: {current.humidity}%\n- Wind Speed: {current.wind_speed} m/s\n\nPlease use this real-time weather data to answer the user's question.\n\n"
+        except Exception as e:
+            print(f"Error fetching weather data for chat: {e}")
+
+    # Detect language and pick the matching system prompt
+    user_language = detect_language(message)
+    system_prompt, prompt = CHAT_PROMPTS[user_language].render(
+        history=session.history() if session is not None else "",
+        weather_context=weather_context,
+        message=message,
+    )
+
+    # Repeated questions are answered from the response cache
+    cache_key = response_cache.make_key(
+        message, user_language, llm.model_label(gemini.GEMINI_MODEL), weather_bucket
+    )
+    return system_prompt, prompt, user_language, cache_key
+
+
+def handle_chat(stream=False):
+    message = request.json.get("message")
+    if not message:
+        return jsonify({"error": "Please provide a message"}), 400
+
+    # Optional: continue a conversation started with POST /chat/sessions
+    session = None
+    session_id = request.json.get("session_id")
+    if session_id:
+        session = chat_sessions.get_session(session_id)
+        if session is None:
+            return jsonify({"error": "Chat session not found"}), 404
+
+    system_prompt, prompt, user_language, cache_key = build_chat_prompt(
+        message, session
+    )
+
+    if stream:
+        return sse_response(
+            stream_chat_events(
+                system_prompt, prompt, message, user_language, cache_key, session
+            )
         )
 
-        ai_response = response.text
+    try:
 
-        # Enhance response with contextual emojis
-        enhanced_response = enhance_with_emojis(ai_response, user_language)
+        def generate():
+            return generate_chat_response(system_prompt, prompt, user_language)
 
-        # Format the response for better readability
-        formatted_response = format_ai_response(enhanced_response)
+        if uses_response_cache(session):
+            # Exact-match cache first, then answers to similarly worded questions
+            formatted_response = response_cache.get_cache("chat").get_or_load(
+                cache_key,
+                lambda: semantic_cache.get_or_generate(
+                    "chat", message, cache_key[1:], generate
+                ),
+            )
+        else:
+            formatted_response = generate()
 
-        # Log activity if mentioned
-        activity_keywords = [
-            "sowing",
-            "irrigation",
-            "pest control",
-            "fertilizer",
-            "harvesting",
-            "planting",
-            "watering",
-            "വിതയൽ",
-            "ജലസേചനം",
-        ]
-        if any(keyword in message.lower() for keyword in activity_keywords):
-            try:
-                log_activity_from_chat(message, formatted_response)
-            except Exception as log_error:
-                print(f"Activity logging failed: {log_error}")
+        log_chat_activity(message, formatted_response)
 
-        return jsonify({"response": formatted_response})
+        saved = session is not None and remember_exchange(
+            session, message, formatted_response
+        )
+        return jsonify(
+            {"response": formatted_response, **session_fields(session, saved)}
+        )
 
     except Exception as e:
         print(f"Gemini API error: {str(e)}")
         # Fallback response with proper formatting
         fallback_response = get_fallback_response(message, user_language)
-        return jsonify({"response": fallback_response})
-
-
-@chat_bp.route("/chat/translate", methods=["POST"])
-@chat_bp.route("/translate", methods=["POST"])  # Backward compatibility
-def translate_text():
-    """Translate text between English and Malayalam"""
-    data = request.get_json()
-    text = data.get("text")
-    from_lang = data.get("from", "en")
-    to_lang = data.get("to", "ml")
+        # Canned answers are not part of the conversation
+        return jsonify(
+            {"response": fallback_response, **session_fields(session, False)}
+        )
 
-    if not text:
-        return jsonify({"error": "Text is required"}), 400
 
-    try:
-        # Use Gemini for high-quality translation with agricultural context
-        if to_lang == "ml":
-            system_prompt = """You are a professional agricultural translator specializing in farming terminology. Translate the following English text to Malayalam accurately while maintaining the meaning and context. 
+# Translation system prompts by target language
+TRANSLATION_PROMPTS = {
+    "ml": prompts.register(
+        "translate.en_ml",
+        """You are a professional agricultural translator specializing in farming terminology. Translate the following English text to Malayalam accurately while maintaining the meaning and context. 
 
 IMPORTANT AGRICULTURAL TERMS:
 - Paddy = നെൽ (not പരുത്തി which is cotton)
@@ -420,9 +624,12 @@ IMPORTANT AGRICULTURAL TERMS:
 - Harvest = വിളവെടുപ്പ്
 - Sowing = വിതയൽ
 
-Preserve all emojis, formatting, bullet points, and structure exactly as in the original. Provide only the translation without any additional text."""
-        else:
-            system_prompt = """You are a professional agricultural translator specializing in farming terminology. Translate the following Malayalam text to English accurately while maintaining the meaning and context. 
+Preserve all emojis, formatting, bullet points, and structure exactly as in the original. Provide only the translation without any additional text.""",
+        user="Text to translate:\n{text}",
+    ),
+    "en": prompts.register(
+        "translate.ml_en",
+        """You are a professional agricultural translator specializing in farming terminology. Translate the following Malayalam text to English accurately while maintaining the meaning and context. 
 
 IMPORTANT AGRICULTURAL TERMS:
 - നെൽ = Paddy/Rice
@@ -439,23 +646,34 @@ IMPORTANT AGRICULTURAL TERMS:
 - വിളവെടുപ്പ് = Harvest
 - വിതയൽ = Sowing
 
-Preserve all emojis, formatting, bullet points, and structure exactly as in the original. Provide only the translation without any additional text."""
+Preserve all emojis, formatting, bullet points, and structure exactly as in the original. Provide only the translation without any additional text.""",
+        user="Text to translate:\n{text}",
+    ),
+}
 
-        # Use dedicated Gemini utilities client for translation (API key 2)
-        model = get_gemini_utils_client()
 
-        # Create the full prompt
-        full_prompt = f"{system_prompt}\n\nText to translate:\n{text}"
+@chat_bp.route("/chat/translate", methods=["POST"])
+@chat_bp.route("/translate", methods=["POST"])  # Backward compatibility
+def translate_text():
+    """Translate text between English and Malayalam"""
+    data = request.get_json()
+    text = data.get("text")
+    from_lang = data.get("from", "en")
+    to_lang = data.get("to", "ml")
 
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.1,
-                max_output_tokens=2000,
-            ),
-        )
+    if not text:
+        return jsonify({"error": "Text is required"}), 400
 
-        translated_text = response.text.strip()
+    try:
+        # Gemini for high-quality translation with agricultural context
+        system_prompt, prompt = TRANSLATION_PROMPTS[
+            "ml" if to_lang == "ml" else "en"
+        ].render(text=text)
+
+        # Gemini utilities key (API key 2) first, GROQ as the alternative
+        translated_text = llm_router.generate(
+            "translate", TRANSLATION_PROVIDERS, prompt, system=system_prompt
+        ).strip()
 
         return jsonify({"translatedText": translated_text})
 
@@ -511,10 +729,9 @@ Please analyze the image and provide:
 Respond in a helpful, expert manner as if you're advising a fellow farmer. Be specific and practical in your recommendations."""
 
         # Generate response with image analysis
-        response = model.generate_content([vision_prompt, image])
+        ai_response = model.generate([vision_prompt, image])
 
         # Format and enhance the response
-        ai_response = response.text
         enhanced_response = enhance_with_emojis(ai_response, "en")
         formatted_response = format_ai_response(enhanced_response)
 
@@ -591,26 +808,55 @@ def test_api_keys():
     try:
         # Test API key 1 (chat)
         chat_model = get_gemini_chat_client()
-        chat_response = chat_model.generate_content(
+        results["api_key_1"] = chat_model.generate(
             "Hello, respond with 'API Key 1 working'"
-        )
-        results["api_key_1"] = chat_response.text.strip()
+        ).strip()
     except Exception as e:
         results["api_key_1"] = f"Error: {str(e)}"
 
     try:
         # Test API key 2 (utilities)
         utils_model = get_gemini_utils_client()
-        utils_response = utils_model.generate_content(
+        results["api_key_2"] = utils_model.generate(
             "Hello, respond with 'API Key 2 working'"
-        )
-        results["api_key_2"] = utils_response.text.strip()
+        ).strip()
     except Exception as e:
         results["api_key_2"] = f"Error: {str(e)}"
 
     return jsonify(results)
 
 
+# System prompt per quick query type; anything else gets "general"
+QUICK_QUERY_PROMPTS = {
+    "summary": prompts.register(
+        "quick_query.summary",
+        "You are a concise agricultural assistant. Provide brief, practical summaries for farmers. Keep responses under 150 words.",
+    ),
+    "general": prompts.register(
+        "quick_query.general",
+        "You are a helpful agricultural assistant. Provide quick, practical answers for farmers. Keep responses concise but helpful.",
+    ),
+}
+QUICK_QUERY_CATEGORIES = ["general", "pest", "disease", "weather", "fertilizer"]
+QUICK_QUERY_OPTIONS = {"max_tokens": 200, "temperature": 0.7}
+
+
+def quick_query_prompt(task_type):
+    """Router task class and system prompt for a quick query type"""
+    task = "summarize" if task_type == "summary" else "generate"
+    template = QUICK_QUERY_PROMPTS.get(task_type, QUICK_QUERY_PROMPTS["general"])
+    return task, template.system
+
+
+def quick_query_cache_key(query, task_type):
+    return response_cache.make_key(
+        query,
+        detect_language(query),
+        llm.model_label(GROQ_QUICK_QUERY_MODEL),
+        variant=task_type,
+    )
+
+
 @chat_bp.route("/quick-query", methods=["POST"])
 def quick_query():
     """Handle lightweight AI queries using GROQ for faster responses"""
@@ -622,39 +868,43 @@ def quick_query():
         if not query:
             return jsonify({"error": "Query is required"}), 400
 
-        # Use GROQ for lightweight, fast responses
-        client = get_groq_client()
-
-        # Customize system prompt based on task type
-        if task_type == "summary":
-            system_prompt = "You are a concise agricultural assistant. Provide brief, practical summaries for farmers. Keep responses under 150 words."
-        elif task_type == "classify":
-            categories = data.get(
-                "categories", ["general", "pest", "disease", "weather", "fertilizer"]
-            )
+        if task_type == "classify":
+            categories = data.get("categories", QUICK_QUERY_CATEGORIES)
             return jsonify(
                 {"classification": get_groq_classification(query, categories)}
             )
-        else:
-            system_prompt = "You are a helpful agricultural assistant. Provide quick, practical answers for farmers. Keep responses concise but helpful."
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query},
-            ],
-            max_tokens=200,
-            temperature=0.7,
-        )
 
-        ai_response = response.choices[0].message.content.strip()
-
-        # Add emojis for better user experience
-        enhanced_response = enhance_with_emojis(ai_response, "en")
+        # Backend that answered; stays empty when a cached answer is served
+        answered_by = []
+
+        def generate():
+            # GROQ for lightweight, fast responses, Gemini as the alternative
+            task, system_prompt = quick_query_prompt(task_type)
+            reply = llm_router.generate(
+                task,
+                QUICK_QUERY_PROVIDERS,
+                query,
+                system=system_prompt,
+                **QUICK_QUERY_OPTIONS,
+            )
+            answered_by.append(llm_router.answered_by())
+            # Add emojis for better user experience
+            return enhance_with_emojis(reply.strip(), "en")
+
+        cache_key = quick_query_cache_key(query, task_type)
+        enhanced_response = response_cache.get_cache("quick_query").get_or_load(
+            cache_key,
+            lambda: semantic_cache.get_or_generate(
+                "quick_query", query, cache_key[1:], generate
+            ),
+        )
 
         return jsonify(
-            {"response": enhanced_response, "type": task_type, "powered_by": "GROQ"}
+            {
+                "response": enhanced_response,
+                "type": task_type,
+                "powered_by": answered_by[0] if answered_by else "cache",
+            }
         )
 
     except Exception as e:
@@ -668,3 +918,46 @@ def quick_query():
             ),
             500,
         )
+
+
+@chat_bp.route("/chat/sessions", methods=["POST"])
+def create_chat_session():
+    """Start a conversation; send the returned session_id with each message"""
+    farmer_id = (request.get_json(silent=True) or {}).get("farmer_id")
+    if farmer_id is not None and db.session.get(Farmer, farmer_id) is None:
+        return jsonify({"error": "Farmer not found"}), 404
+
+    session = chat_sessions.create_session(farmer_id)
+    return jsonify({"success": True, "data": {"session_id": session.id}}), 201
+
+
+@chat_bp.route("/chat/sessions/<session_id>", methods=["GET"])
+def get_chat_session(session_id):
+    """A session's summary and the turns not folded into it yet"""
+    details = chat_sessions.get_session_details(session_id)
+    if details is None:
+        return jsonify({"success": False, "error": "Chat session not found"}), 404
+    return jsonify({"success": True, "data": details})
+
+
+@chat_bp.route("/chat/sessions/<session_id>", methods=["DELETE"])
+def delete_chat_session(session_id):
+    if not chat_sessions.delete_session(session_id):
+        return jsonify({"success": False, "error": "Chat session not found"}), 404
+    return jsonify({"success": True})
+
+
+@chat_bp.route("/chat/cache/stats", methods=["GET"])
+def chat_cache_stats():
+    """Hit rates of the response caches and how many LLM calls were coalesced"""
+    return jsonify(
+        {
+            "success": True,
+            "data": {
+                "exact": response_cache.get_stats(),
+                "semantic": semantic_cache.get_stats(),
+                "singleflight": singleflight.get_flight().get_stats(),
+                "sessions": chat_sessions.get_stats(),
+            },
+        }
+    )
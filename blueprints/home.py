@@ -2,112 +2,127 @@ import json
 import os
 import random
 import re
-from datetime import datetime, timedelta
-
-import google.generativeai as genai
-import requests
-from flask import Blueprint, jsonify, request
-from groq import Groq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import as_completed
+from datetime import date, datetime, timedelta
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
 from sqlalchemy import text
 
 from models import db
+from services import llm, llm_router, market_prices, weather
+from services.cache import MemoryBackend, SWRCache
+from services.weather_prewarm import get_prewarmer
 
 home_bp = Blueprint("home", __name__)
 
+# Upstream fetches run in parallel per batch request, up to this many at once
+WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+WEATHER_BATCH_MAX_CITIES = int(os.getenv("WEATHER_BATCH_MAX_CITIES", "100"))
+
+# Dashboard sections run concurrently on a shared pool, each with its own deadline (seconds)
+DASHBOARD_MAX_WORKERS = int(os.getenv("DASHBOARD_MAX_WORKERS", "16"))
+DASHBOARD_DEFAULT_DEADLINE = float(os.getenv("DASHBOARD_DEFAULT_TIMEOUT", "5"))
+DASHBOARD_DEADLINES = {
+    "weather": float(os.getenv("DASHBOARD_WEATHER_TIMEOUT", "8")),
+    "advisory": float(os.getenv("DASHBOARD_ADVISORY_TIMEOUT", "15")),
+    "stats": float(os.getenv("DASHBOARD_STATS_TIMEOUT", "3")),
+    "market_prices": float(os.getenv("DASHBOARD_MARKET_PRICES_TIMEOUT", "5")),
+    "seasonal_activities": float(os.getenv("DASHBOARD_SEASONAL_TIMEOUT", "1")),
+}
+_dashboard_executor = None
+_dashboard_lock = threading.Lock()
+
+# Generated advisories and insights, reused while the weather stays similar
+advisory_cache = SWRCache(
+    "advisory",
+    MemoryBackend(max_entries=int(os.getenv("ADVISORY_CACHE_MAX_ENTRIES", "512"))),
+    ttl=int(os.getenv("ADVISORY_CACHE_TTL", "3600")),
+    stale_ttl=0,
+)
+ADVISORY_TEMPERATURE_BAND = int(os.getenv("ADVISORY_TEMPERATURE_BAND", "2"))
+
 
 # Initialize Gemini client functions
 def get_gemini_advisory_client():
-    """Get Gemini client for AI advisory (uses API key 1)"""
-    api_key = os.getenv("GEMINI_API_KEY_1")
-    if not api_key:
-        raise ValueError("Gemini API key 1 not configured for advisory")
-
-    # Configure with first API key each time to ensure correct key is used
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-2.5-flash")
-
+    """Get Gemini provider for AI advisory (uses API key 1)"""
+    return llm.get_gemini("GEMINI_API_KEY_1")
 
-def get_openweather_api_key():
-    """Get OpenWeather API key"""
-    api_key = os.getenv("OPENWEATHER_API_KEY")
-    if not api_key:
-        raise ValueError("OpenWeather API key not configured")
-    return api_key
 
+# Gemini first; the router switches to GROQ when it is faster or Gemini fails
+ADVISORY_PROVIDERS = [
+    get_gemini_advisory_client,
+    lambda: llm.get_groq(llm.GROQ_CHAT_MODEL),
+]
 
-def get_weather_data(city="Kochi", country="IN"):
-    """Get weather data from OpenWeather API using API key from environment"""
-    try:
-        api_key = get_openweather_api_key()
-
-        # Current weather
-        current_url = f"http://api.openweathermap.org/data/2.5/weather?q={city},{country}&appid={api_key}&units=metric"
-        current_response = requests.get(current_url, timeout=10)
 
-        if current_response.status_code != 200:
-            return None
+def advisory_cache_key(kind, report, location, language):
+    """Cache key from location, language and quantized weather features"""
+    bucket = report.bucket(ADVISORY_TEMPERATURE_BAND) if report else ("no-weather",)
+    return (kind, location.strip().lower(), language) + bucket
 
-        current_data = current_response.json()
 
-        # 5-day forecast
-        forecast_url = f"http://api.openweathermap.org/data/2.5/forecast?q={city},{country}&appid={api_key}&units=metric"
-        forecast_response = requests.get(forecast_url, timeout=10)
+def generate_weather_forecast_insights(report, location="Kerala", refresh=False):
+    """Generate AI-powered weather insights, reusing cached text for similar weather"""
+    if not (report and report.forecast):
+        return "Weather forecast insights unavailable at this time."
 
-        if forecast_response.status_code == 200:
-            forecast_data = forecast_response.json()
-            return {"current": current_data, "forecast": forecast_data}
+    key = advisory_cache_key("insights", report, location, "en")
+    try:
+        if refresh:
+            insights = advisory_cache.refresh(
+                key, lambda: _generate_weather_forecast_insights(report, location)
+            )
         else:
-            # Return just current weather if forecast fails
-            return {"current": current_data, "forecast": None}
+            insights = advisory_cache.get_or_load(
+                key, lambda: _generate_weather_forecast_insights(report, location)
+            )
+        return insights or "Weather forecast insights unavailable at this time."
 
     except Exception as e:
-        print(f"Weather API error: {e}")
-        return None
+        print(f"Weather insights error: {e}")
+        return "Unable to generate weather insights at this time."
 
 
-def generate_weather_forecast_insights(weather_data, location="Kerala"):
-    """Generate AI-powered weather insights and forecast using Gemini API Key 1"""
-    try:
-        model = get_gemini_advisory_client()
-
-        if weather_data and "forecast" in weather_data:
-            forecast_list = weather_data["forecast"]["list"][
-                :8
-            ]  # Next 24 hours (3-hour intervals)
-
-            forecast_summary = []
-            for item in forecast_list:
-                forecast_summary.append(
-                    {
-                        "time": item["dt_txt"],
-                        "temp": item["main"]["temp"],
-                        "description": item["weather"][0]["description"],
-                        "humidity": item["main"]["humidity"],
-                    }
-                )
+def _generate_weather_forecast_insights(report, location):
+    """Generate AI-powered weather insights and forecast (Gemini API Key 1 or GROQ)"""
 
-            prompt = f"""
-            As a weather expert for farmers in {location}, India, provide a concise weather forecast analysis based on this data:
-            
-            Forecast Data: {json.dumps(forecast_summary)}
-            
-            Please provide:
-            1. A brief weather summary for the next 24 hours
-            2. Best farming time windows for today
-            3. Any weather warnings or recommendations
-            4. Irrigation advice based on expected conditions
-            
-            Keep the response concise and farmer-friendly, max 3-4 sentences.
-            """
-
-            response = model.generate_content(prompt)
-            return response.text
-        else:
-            return "Weather forecast insights unavailable at this time."
+    forecast_summary = []
+    for entry in report.next_hours():  # Next 24 hours (3-hour intervals)
+        forecast_summary.append(
+            {
+                "time": entry.time.strftime("%Y-%m-%d %H:%M:%S"),
+                "temp": entry.temperature,
+                "description": entry.description,
+                "humidity": entry.humidity,
+            }
+        )
 
-    except Exception as e:
-        print(f"Weather insights error: {e}")
-        return "Unable to generate weather insights at this time."
+    prompt = f"""
+    As a weather expert for farmers in {location}, India, provide a concise weather forecast analysis based on this data:
+    
+    Forecast Data: {json.dumps(forecast_summary)}
+    
+    Please provide:
+    1. A brief weather summary for the next 24 hours
+    2. Best farming time windows for today
+    3. Any weather warnings or recommendations
+    4. Irrigation advice based on expected conditions
+    
+    Keep the response concise and farmer-friendly, max 3-4 sentences.
+    """
+
+    return llm_router.generate("generate", ADVISORY_PROVIDERS, prompt)
 
 
 def clean_advisory_text(text):
@@ -130,78 +145,91 @@ def clean_advisory_text(text):
     return text.strip()
 
 
-def generate_farming_advisory(weather_data, location="Kerala"):
-    """Generate AI-powered farming advisory based on weather using Gemini API Key 1"""
+def generate_farming_advisory(report, location="Kerala", language="en", refresh=False):
+    """Generate a farming advisory, reusing cached text for similar weather
+
+    refresh=True always calls Gemini and replaces the cached entry.
+    """
+    key = advisory_cache_key("advisory", report, location, language)
     try:
-        model = get_gemini_advisory_client()
+        if refresh:
+            advisory_text = advisory_cache.refresh(
+                key, lambda: _generate_farming_advisory(report, location, language)
+            )
+        else:
+            advisory_text = advisory_cache.get_or_load(
+                key, lambda: _generate_farming_advisory(report, location, language)
+            )
+        return advisory_text or "Unable to generate advisory at this time."
 
-        if weather_data:
-            current = weather_data["current"]
-            temp = current["main"]["temp"]
-            humidity = current["main"]["humidity"]
-            weather_desc = current["weather"][0]["description"]
-            wind_speed = current["wind"]["speed"]
+    except Exception as e:
+        print(f"Gemini AI advisory error: {e}")
+        return "Unable to generate advisory at this time. Please check back later."
 
-            prompt = f"""
-            As an expert agricultural advisor for farmers in {location}, India, provide a brief daily farming advisory based on current weather conditions.
 
-            Current Weather: {temp}°C, {humidity}% humidity, {weather_desc}, wind {wind_speed} m/s
+def _generate_farming_advisory(report, location, language):
+    """Generate AI-powered farming advisory based on weather (Gemini API Key 1 or GROQ)"""
 
-            Provide EXACTLY 3-4 concise, practical farming tips. Each tip should be:
-            - One clear sentence (15-20 words maximum)
-            - Directly related to current weather conditions
-            - Actionable and practical for farmers
-            - Written in simple, direct language
+    if report:
+        current = report.current
+        temp = current.temperature
+        humidity = current.humidity
+        weather_desc = current.description
+        wind_speed = current.wind_speed
 
-            Format: Just provide 3-4 plain text lines, each on a new line. NO bullet points, NO numbers, NO markdown formatting.
+        prompt = f"""
+        As an expert agricultural advisor for farmers in {location}, India, provide a brief daily farming advisory based on current weather conditions.
 
-            Example format:
-            Today's moderate temperature is ideal for transplanting rice seedlings
-            Apply organic fertilizers in the morning when soil moisture is optimal
-            Monitor crops for fungal diseases due to high humidity levels
-            """
-        else:
-            prompt = f"""
-            As an expert agricultural advisor for farmers in {location}, India, provide a brief daily farming advisory for today's season.
-
-            Provide EXACTLY 3-4 concise, practical farming tips. Each tip should be:
-            - One clear sentence (15-20 words maximum)
-            - Relevant to current season and farming practices
-            - Actionable and practical for farmers
-            - Written in simple, direct language
-
-            Format: Just provide 3-4 plain text lines, each on a new line. NO bullet points, NO numbers, NO markdown formatting.
-
-            Example format:
-            Focus on land preparation for the upcoming monsoon season
-            Apply compost and organic matter to improve soil fertility
-            Check irrigation systems and repair any damages before rains
-            """
-
-        response = model.generate_content(prompt)
-        advisory_text = (
-            response.text
-            if response.text
-            else "Unable to generate advisory at this time."
-        )
+        Current Weather: {temp}°C, {humidity}% humidity, {weather_desc}, wind {wind_speed} m/s
 
-        # Clean up markdown formatting
-        return clean_advisory_text(advisory_text)
+        Provide EXACTLY 3-4 concise, practical farming tips. Each tip should be:
+        - One clear sentence (15-20 words maximum)
+        - Directly related to current weather conditions
+        - Actionable and practical for farmers
+        - Written in simple, direct language
 
-    except Exception as e:
-        print(f"Gemini AI advisory error: {e}")
-        return "Unable to generate advisory at this time. Please check back later."
+        Format: Just provide 3-4 plain text lines, each on a new line. NO bullet points, NO numbers, NO markdown formatting.
+
+        Example format:
+        Today's moderate temperature is ideal for transplanting rice seedlings
+        Apply organic fertilizers in the morning when soil moisture is optimal
+        Monitor crops for fungal diseases due to high humidity levels
+        """
+    else:
+        prompt = f"""
+        As an expert agricultural advisor for farmers in {location}, India, provide a brief daily farming advisory for today's season.
+
+        Provide EXACTLY 3-4 concise, practical farming tips. Each tip should be:
+        - One clear sentence (15-20 words maximum)
+        - Relevant to current season and farming practices
+        - Actionable and practical for farmers
+        - Written in simple, direct language
+
+        Format: Just provide 3-4 plain text lines, each on a new line. NO bullet points, NO numbers, NO markdown formatting.
+
+        Example format:
+        Focus on land preparation for the upcoming monsoon season
+        Apply compost and organic matter to improve soil fertility
+        Check irrigation systems and repair any damages before rains
+        """
+
+    if language == "ml":
+        prompt += "\nWrite the tips in Malayalam."
+
+    text = llm_router.generate("generate", ADVISORY_PROVIDERS, prompt)
+    if not text:
+        return None
+
+    # Clean up markdown formatting
+    return clean_advisory_text(text)
 
 
 def generate_quick_stats():
     """Generate quick farm statistics from database"""
     try:
-        from models import Activity, Crop, Farm, Farmer
+        from models import Activity, Crop
 
         # Get actual statistics from database
-        total_farmers = Farmer.query.filter_by(is_active=True).count()
-        total_farms = Farm.query.count()
-        total_crops = Crop.query.count()
         recent_activities = Activity.query.filter(
             Activity.date >= datetime.now() - timedelta(days=7)
         ).count()
@@ -232,58 +260,9 @@ def generate_quick_stats():
         }
 
 
-def get_groq_client():
-    """Get GROQ client for lightweight AI tasks"""
-    from groq import Groq
-
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise ValueError("GROQ API key not configured")
-    return Groq(api_key=api_key)
-
-
 def get_market_prices():
-    """Get current market prices for major crops in Kerala using GROQ for lightweight AI insights"""
-    try:
-        # Use GROQ for lightweight market price insights
-        client = get_groq_client()
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a market price advisor for Kerala farmers. Provide realistic current market prices for major crops in Kerala, India.",
-                },
-                {
-                    "role": "user",
-                    "content": "Provide current market price information for major crops in Kerala: Rice (per quintal), Coconut (per 100 nuts), Black Pepper (per kg), Cardamom (per kg). Format as realistic prices with change percentages.",
-                },
-            ],
-            max_tokens=150,
-            temperature=0.3,
-        )
-
-        # Parse response and provide fallback data
-        fallback_crops = [
-            {"name": "Rice", "price": 2200, "change": 2.5},
-            {"name": "Coconut", "price": 30, "change": -1.2},
-            {"name": "Pepper", "price": 500, "change": 8.3},
-            {"name": "Cardamom", "price": 1500, "change": -3.1},
-        ]
-
-        # For now, return fallback data (GROQ response can be parsed in production)
-        return fallback_crops
-
-    except Exception as e:
-        print(f"Market prices error: {e}")
-        # Return realistic fallback data
-        return [
-            {"name": "Rice", "price": 2200, "change": 2.5},
-            {"name": "Coconut", "price": 30, "change": -1.2},
-            {"name": "Pepper", "price": 500, "change": 8.3},
-            {"name": "Cardamom", "price": 1500, "change": -3.1},
-        ]
+    """Get current market prices for major crops in Kerala from the in-memory price snapshot"""
+    return market_prices.get_price_snapshot()
 
 
 def get_seasonal_activities():
@@ -316,49 +295,150 @@ def get_seasonal_activities():
     )
 
 
+def get_dashboard_executor():
+    """Get the bounded thread pool shared by all dashboard requests"""
+    global _dashboard_executor
+    if _dashboard_executor is None:
+        with _dashboard_lock:
+            if _dashboard_executor is None:
+                _dashboard_executor = ThreadPoolExecutor(
+                    max_workers=DASHBOARD_MAX_WORKERS, thread_name_prefix="dashboard"
+                )
+    return _dashboard_executor
+
+
+def run_dashboard_providers(providers):
+    """Run dashboard providers concurrently, each bounded by its own deadline
+
+    Returns (results, meta). Sections that miss their deadline are listed in
+    meta["timed_out"], sections that raised or came back empty in
+    meta["degraded"]; both are left out of results.
+    """
+    app = current_app._get_current_object()
+    started = time.monotonic()
+    timings = {}
+    timings_lock = threading.Lock()
+
+    def run(name, provider):
+        with app.app_context():
+            try:
+                return provider()
+            finally:
+                # Late providers still finish after the response is built
+                with timings_lock:
+                    timings[name] = round((time.monotonic() - started) * 1000)
+
+    executor = get_dashboard_executor()
+    futures = {
+        name: executor.submit(run, name, provider)
+        for name, provider in providers.items()
+    }
+
+    results = {}
+    meta = {"timed_out": [], "degraded": []}
+    for name, future in futures.items():
+        deadline = started + DASHBOARD_DEADLINES.get(name, DASHBOARD_DEFAULT_DEADLINE)
+        try:
+            result = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            future.cancel()
+            meta["timed_out"].append(name)
+            continue
+        except Exception as e:
+            print(f"Dashboard provider {name} error: {e}")
+            meta["degraded"].append(name)
+            continue
+
+        if result is None:
+            meta["degraded"].append(name)
+        else:
+            results[name] = result
+
+    with timings_lock:
+        meta["timings_ms"] = dict(timings)
+    return results, meta
+
+
+def format_current_weather(current, detailed=False):
+    """Format current conditions for the frontend"""
+    formatted = {
+        "temperature": round(current.temperature),
+        "description": current.description.title(),
+        "humidity": current.humidity,
+        "wind_speed": round(current.wind_speed, 1),
+        "icon": current.icon,
+        "feels_like": round(current.feels_like),
+        "location": current.location,
+    }
+    if detailed:
+        formatted["pressure"] = current.pressure
+        formatted["visibility"] = current.visibility_km
+    return formatted
+
+
+def format_forecast(report):
+    """Format the next 24 hours of forecast entries for the frontend"""
+    return [
+        {
+            "datetime": entry.time.strftime("%Y-%m-%d %H:%M:%S"),
+            "time": entry.time.strftime("%I:%M %p"),
+            "temperature": round(entry.temperature),
+            "description": entry.description.title(),
+            "icon": entry.icon,
+            "humidity": entry.humidity,
+            "feels_like": round(entry.feels_like),
+        }
+        for entry in report.next_hours()
+    ]
+
+
 @home_bp.route("/dashboard", methods=["GET"])
 def get_dashboard_data():
-    """Get comprehensive dashboard data for home page"""
+    """Get comprehensive dashboard data for home page
+
+    Each section comes from an independent provider. Providers run
+    concurrently, each with its own deadline, so a slow section is
+    reported in meta.timed_out instead of holding up the whole page.
+    """
     try:
         location = request.args.get("location", "Kochi")
-
-        # Get weather data
-        weather_data = get_weather_data(location)
+        language = request.args.get("language", "en")
 
         # Only generate advisory if explicitly requested
         generate_advisory = (
             request.args.get("generate_advisory", "false").lower() == "true"
         )
-        advisory = None
+
+        def weather_provider():
+            report = weather.get_weather(location)
+            # Format weather for frontend
+            return format_current_weather(report.current) if report else None
+
+        def advisory_provider():
+            # Shares the cached (or in-flight) weather fetch with weather_provider
+            report = weather.get_weather(location)
+            return generate_farming_advisory(report, location, language)
+
+        providers = {
+            "weather": weather_provider,
+            "stats": generate_quick_stats,
+            "market_prices": get_market_prices,
+            "seasonal_activities": get_seasonal_activities,
+        }
         if generate_advisory:
-            advisory = generate_farming_advisory(weather_data, location)
-
-        # Get other data
-        stats = generate_quick_stats()
-        market_prices = get_market_prices()
-        seasonal_activities = get_seasonal_activities()
-
-        # Format weather for frontend
-        formatted_weather = None
-        if weather_data:
-            current = weather_data["current"]
-            formatted_weather = {
-                "temperature": round(current["main"]["temp"]),
-                "description": current["weather"][0]["description"].title(),
-                "humidity": current["main"]["humidity"],
-                "wind_speed": round(current["wind"]["speed"], 1),
-                "icon": current["weather"][0]["icon"],
-                "feels_like": round(current["main"]["feels_like"]),
-                "location": current["name"],
-            }
+            providers["advisory"] = advisory_provider
+
+        results, meta = run_dashboard_providers(providers)
 
         dashboard_data = {
-            "weather": formatted_weather,
-            "advisory": advisory,
-            "stats": stats,
-            "market_prices": market_prices,
-            "seasonal_activities": seasonal_activities,
+            "weather": results.get("weather"),
+            "advisory": results.get("advisory"),
+            "stats": results.get("stats"),
+            "market_prices": results.get("market_prices"),
+            "seasonal_activities": results.get("seasonal_activities"),
+            "market_summary": market_prices.get_market_summary(),
             "last_updated": datetime.now().isoformat(),
+            "meta": meta,
         }
 
         return jsonify({"success": True, "data": dashboard_data})
@@ -375,48 +455,20 @@ def get_dashboard_data():
 def get_weather_forecast(city):
     """Get detailed weather forecast with AI insights using Gemini API Key 1 (for consistency with advisory)"""
     try:
-        weather_data = get_weather_data(city)
-
-        if weather_data:
-            current = weather_data["current"]
-            forecast_list = weather_data["forecast"]["list"][:8]  # Next 24 hours
+        report = weather.get_weather(city)
 
+        if report:
             # Get AI insights using Gemini API Key 1 (same as advisory for consistency)
-            weather_insights = generate_weather_forecast_insights(weather_data, city)
-
-            formatted_forecast = []
-            for item in forecast_list:
-                formatted_forecast.append(
-                    {
-                        "datetime": item["dt_txt"],
-                        "time": datetime.fromisoformat(
-                            item["dt_txt"].replace(" ", "T")
-                        ).strftime("%I:%M %p"),
-                        "temperature": round(item["main"]["temp"]),
-                        "description": item["weather"][0]["description"].title(),
-                        "icon": item["weather"][0]["icon"],
-                        "humidity": item["main"]["humidity"],
-                        "feels_like": round(item["main"]["feels_like"]),
-                    }
-                )
+            weather_insights = generate_weather_forecast_insights(report, city)
 
             return jsonify(
                 {
                     "success": True,
                     "data": {
-                        "current": {
-                            "temperature": round(current["main"]["temp"]),
-                            "description": current["weather"][0]["description"].title(),
-                            "humidity": current["main"]["humidity"],
-                            "wind_speed": round(current["wind"]["speed"], 1),
-                            "icon": current["weather"][0]["icon"],
-                            "feels_like": round(current["main"]["feels_like"]),
-                            "location": current["name"],
-                            "pressure": current["main"]["pressure"],
-                            "visibility": current.get("visibility", 0)
-                            / 1000,  # Convert to km
-                        },
-                        "forecast": formatted_forecast,
+                        "current": format_current_weather(
+                            report.current, detailed=True
+                        ),
+                        "forecast": format_forecast(report),
                         "insights": weather_insights,
                         "last_updated": datetime.now().isoformat(),
                     },
@@ -436,18 +488,166 @@ def get_weather_forecast(city):
         )
 
 
+@home_bp.route("/weather/batch", methods=["POST"])
+def get_weather_batch():
+    """Get weather for many cities at once, streamed as NDJSON as each city completes"""
+    data = request.get_json(silent=True) or {}
+    cities = data.get("cities")
+    if not isinstance(cities, list) or not cities:
+        return (
+            jsonify({"success": False, "error": "cities must be a non-empty list"}),
+            400,
+        )
+
+    # Dedupe on the normalized name so each city is fetched once
+    cities = list(
+        dict.fromkeys(
+            weather.normalize_city(city)
+            for city in cities
+            if isinstance(city, str) and city.strip()
+        )
+    )
+    if not cities:
+        return (
+            jsonify({"success": False, "error": "cities must contain city names"}),
+            400,
+        )
+    if len(cities) > WEATHER_BATCH_MAX_CITIES:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": f"At most {WEATHER_BATCH_MAX_CITIES} cities per request",
+                }
+            ),
+            400,
+        )
+
+    country = data.get("country", "IN")
+    include_insights = bool(data.get("insights", False))
+    app = current_app._get_current_object()
+
+    def load_city(city):
+        with app.app_context():
+            report = weather.get_weather(city, country)
+            if not report:
+                return {
+                    "city": city,
+                    "success": False,
+                    "error": "Weather data not available",
+                }
+
+            result = {
+                "city": city,
+                "success": True,
+                "data": {
+                    "current": format_current_weather(report.current, detailed=True),
+                    "forecast": format_forecast(report),
+                },
+            }
+            if include_insights:
+                result["data"]["insights"] = generate_weather_forecast_insights(
+                    report, city
+                )
+            return result
+
+    def generate():
+        executor = ThreadPoolExecutor(
+            max_workers=min(WEATHER_BATCH_CONCURRENCY, len(cities)),
+            thread_name_prefix="weather-batch",
+        )
+        try:
+            futures = {executor.submit(load_city, city): city for city in cities}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Weather batch error for {futures[future]}: {e}")
+                    result = {
+                        "city": futures[future],
+                        "success": False,
+                        "error": "Failed to fetch weather",
+                    }
+                yield json.dumps(result) + "\n"
+        finally:
+            # Stop queued cities if the client goes away mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@home_bp.route("/weather-history/<city>", methods=["GET"])
+def get_weather_history(city):
+    """Get stored daily weather for a city; never calls OpenWeather"""
+    try:
+        end = request.args.get("to")
+        end = date.fromisoformat(end) if end else weather.utc_today()
+        start = request.args.get("from")
+        start = date.fromisoformat(start) if start else end - timedelta(days=7)
+    except ValueError:
+        return (
+            jsonify({"success": False, "error": "Dates must be in YYYY-MM-DD format"}),
+            400,
+        )
+
+    try:
+        country = request.args.get("country", "IN")
+        logs = weather.get_weather_history(city, start, end, country)
+        return jsonify(
+            {
+                "success": True,
+                "data": {
+                    "location": weather.normalize_city(city),
+                    "country": country.strip().upper(),
+                    "from": start.isoformat(),
+                    "to": end.isoformat(),
+                    "days": [log.to_dict() for log in logs],
+                },
+            }
+        )
+
+    except Exception as e:
+        print(f"Weather history error: {e}")
+        return (
+            jsonify({"success": False, "error": "Failed to fetch weather history"}),
+            500,
+        )
+
+
+@home_bp.route("/weather/stats", methods=["GET"])
+def get_weather_stats():
+    """Get weather cache counters and pre-warm metrics for this worker"""
+    prewarmer = get_prewarmer()
+    return jsonify(
+        {
+            "success": True,
+            "data": {
+                "cache": weather.weather_cache.get_stats(),
+                "prewarm": prewarmer.get_stats() if prewarmer else None,
+            },
+        }
+    )
+
+
+@home_bp.route("/advisory/stats", methods=["GET"])
+def get_advisory_stats():
+    """Get advisory/insight cache counters for this worker"""
+    return jsonify({"success": True, "data": {"cache": advisory_cache.get_stats()}})
+
+
 @home_bp.route("/advisory/regenerate", methods=["POST"])
 def regenerate_advisory():
     """Regenerate farming advisory using Gemini API Key 1"""
     try:
         data = request.get_json()
         location = data.get("location", "Kerala")
+        language = data.get("language", "en")
 
         # Get fresh weather data
-        weather_data = get_weather_data(location)
+        report = weather.get_weather(location)
 
-        # Generate new advisory using API key 1
-        advisory = generate_farming_advisory(weather_data, location)
+        # Generate new advisory using API key 1, replacing the cached one
+        advisory = generate_farming_advisory(report, location, language, refresh=True)
 
         return jsonify(
             {
@@ -1,47 +1,69 @@
-import os
+from contextlib import closing
 from datetime import datetime
 
-import google.generativeai as genai
-import requests
 from flask import Blueprint, jsonify, request
-from groq import Groq
+
+from services import llm, llm_router, market_prices, weather
+from services.streaming import sse_event, sse_response, wants_event_stream
 
 knowledge_bp = Blueprint("knowledge", __name__)
 
 
 # Initialize API clients
 def get_gemini_knowledge_client():
-    """Get Gemini client for knowledge content using API key 2"""
-    api_key = os.getenv("GEMINI_API_KEY_2")
-    if not api_key:
-        raise ValueError("Gemini API key 2 not configured for knowledge")
-
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel("gemini-2.5-flash")
+    """Get Gemini provider for knowledge content using API key 2"""
+    return llm.get_gemini("GEMINI_API_KEY_2")
 
 
-def get_groq_client():
-    """Get GROQ client for lightweight AI tasks"""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise ValueError("GROQ API key not configured")
-    return Groq(api_key=api_key)
+# Candidate providers in order of preference; the router may pick a later
+# one when it is faster, or when an earlier one is failing
+KNOWLEDGE_PROVIDERS = [
+    get_gemini_knowledge_client,
+    lambda: llm.get_groq(llm.GROQ_CHAT_MODEL),
+]
+LIGHTWEIGHT_PROVIDERS = [llm.get_groq, get_gemini_knowledge_client]
 
 
-def get_openweather_api_key():
-    """Get OpenWeather API key from environment"""
-    api_key = os.getenv("OPENWEATHER_API_KEY")
-    if not api_key:
-        raise ValueError("OpenWeather API key not configured")
-    return api_key
+def stream_generation_events(providers, prompt, field, payload, fallback):
+    """Stream a generation as SSE "delta" events, then a "done" event
 
+    The "done" event carries the same body as the JSON endpoint, with the
+    full text under `field`; `fallback` stands in for an empty text and is
+    the error event's message. If the client disconnects, the upstream
+    generation is cancelled.
+    """
+    parts = []
+    try:
+        chunks = llm_router.stream("generate", providers, prompt)
+        with closing(chunks):
+            for text in chunks:
+                if text:
+                    parts.append(text)
+                    yield sse_event({"delta": text})
+    except Exception as e:
+        # Details stay in the server log; they can include SDK and quota errors
+        print(f"LLM streaming error: {str(e)}")
+        yield sse_event({"success": False, "error": fallback}, event="error")
+        return
 
-# OpenWeather API configuration
-OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
+    yield sse_event(
+        {"success": True, field: "".join(parts) or fallback, **payload}, event="done"
+    )
 
 
 @knowledge_bp.route("/content", methods=["POST"])
 def get_knowledge_content():
+    # Clients that send Accept: text/event-stream get the streaming response
+    return handle_knowledge_content(stream=wants_event_stream(request))
+
+
+@knowledge_bp.route("/content/stream", methods=["POST"])
+def stream_knowledge_content():
+    """Stream knowledge content as Server-Sent Events"""
+    return handle_knowledge_content(stream=True)
+
+
+def handle_knowledge_content(stream=False):
     try:
         data = request.get_json()
         prompt = data.get("prompt", "")
@@ -56,14 +78,11 @@ def get_knowledge_content():
             try:
                 weather_data = get_current_weather("Kochi")
                 if weather_data:
-                    weather_context = f"\n\nCurrent weather in Kerala: Temperature: {weather_data['temperature']}°C, Condition: {weather_data['description']}, Humidity: {weather_data['humidity']}%"
+                    weather_context = f"\n\nCurrent weather in Kerala: Temperature: {weather_data.temperature}°C, Condition: {weather_data.description}, Humidity: {weather_data.humidity}%"
                     enhanced_prompt += weather_context
             except:
                 pass  # Continue without weather data if API fails
 
-        # Generate content using Gemini API Key 2
-        model = get_gemini_knowledge_client()
-
         # Add context for better responses
         context = """You are an expert agricultural advisor for Kerala, India. Provide detailed, practical, and location-specific advice. 
         Format your response in a clear, readable manner with proper paragraphs and bullet points where appropriate. 
@@ -71,12 +90,23 @@ def get_knowledge_content():
 
         full_prompt = f"{context}\n\n{enhanced_prompt}"
 
-        response = model.generate_content(full_prompt)
-        content = (
-            response.text
-            if response.text
-            else "Unable to generate content at this moment."
-        )
+        if stream:
+            return sse_response(
+                stream_generation_events(
+                    KNOWLEDGE_PROVIDERS,
+                    full_prompt,
+                    "content",
+                    {
+                        "category_id": category_id,
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                    "Unable to generate content at this moment.",
+                )
+            )
+
+        # Gemini API key 2 unless GROQ is currently faster
+        text = llm_router.generate("generate", KNOWLEDGE_PROVIDERS, full_prompt)
+        content = text if text else "Unable to generate content at this moment."
 
         return jsonify(
             {
@@ -88,69 +118,28 @@ def get_knowledge_content():
         )
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        print(f"Knowledge content error: {str(e)}")
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Unable to generate content at this moment.",
+                }
+            ),
+            500,
+        )
 
 
 @knowledge_bp.route("/market-prices", methods=["GET"])
 def get_market_prices():
-    """Get current market prices for major crops in Kerala using GROQ for lightweight AI tasks"""
+    """Get current market prices and trends for major crops in Kerala from stored price history"""
     try:
-        # Use GROQ for lightweight market price generation
-        client = get_groq_client()
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a market price advisor for Kerala farmers. Generate realistic current market prices with trends.",
-                },
-                {
-                    "role": "user",
-                    "content": """Generate ONLY a JSON array of 6 major crop market prices in Kerala with this EXACT format:
-[
-  {"name": "Rice", "price": 45, "change": 2.5},
-  {"name": "Coconut", "price": 35, "change": -1.2}
-]
-
-Include: Rice, Coconut, Rubber, Black Pepper, Cardamom, Banana
-- price: current price per kg in rupees (realistic for Kerala)
-- change: percentage change from last week (can be positive or negative)
-
-Output ONLY the JSON array, no other text.""",
-                },
-            ],
-            max_tokens=400,
-            temperature=0.7,
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        # Extract JSON from response
-        import json
-        import re
-
-        # Try to find JSON array in response
-        json_match = re.search(r"\[.*\]", content, re.DOTALL)
-        if json_match:
-            market_data = json.loads(json_match.group())
-        else:
-            # Fallback data if parsing fails
-            market_data = [
-                {"name": "Rice", "price": 45, "change": 2.5},
-                {"name": "Coconut", "price": 35, "change": -1.2},
-                {"name": "Rubber", "price": 180, "change": 3.8},
-                {"name": "Black Pepper", "price": 650, "change": 5.2},
-                {"name": "Cardamom", "price": 1200, "change": -2.1},
-                {"name": "Banana", "price": 30, "change": 1.5},
-            ]
-
         return jsonify(
             {
                 "success": True,
-                "data": market_data,
+                "data": market_prices.get_price_snapshot(),
                 "timestamp": datetime.now().isoformat(),
-                "powered_by": "GROQ",
+                "powered_by": "Market price history",
             }
         )
 
@@ -160,20 +149,12 @@ Output ONLY the JSON array, no other text.""",
 
 @knowledge_bp.route("/crop-calendar", methods=["GET"])
 def get_crop_calendar():
-    """Get crop calendar data using GROQ for lightweight AI generation"""
+    """Get crop calendar data using GROQ (or Gemini) for lightweight AI generation"""
     try:
-        client = get_groq_client()
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an agricultural expert for Kerala, India. Generate crop calendar information.",
-                },
-                {
-                    "role": "user",
-                    "content": """Generate ONLY a JSON array of 12 months crop calendar data for Kerala with this EXACT format:
+        reply = llm_router.generate(
+            "generate",
+            LIGHTWEIGHT_PROVIDERS,
+            """Generate ONLY a JSON array of 12 months crop calendar data for Kerala with this EXACT format:
 [
   {
     "month": "January",
@@ -189,13 +170,13 @@ Include all 12 months (January to December) with:
 - One practical tip (max 100 characters)
 
 Output ONLY the JSON array, no other text.""",
-                },
-            ],
+            system="You are an agricultural expert for Kerala, India. Generate crop calendar information.",
             max_tokens=2000,
             temperature=0.7,
         )
 
-        content = response.choices[0].message.content.strip()
+        content = reply.strip()
+        powered_by = llm_router.answered_by()
 
         # Extract JSON from response
         import json
@@ -207,6 +188,7 @@ Output ONLY the JSON array, no other text.""",
             calendar_data = json.loads(json_match.group())
         else:
             # Fallback data
+            powered_by = "FALLBACK"
             calendar_data = [
                 {
                     "month": "January",
@@ -221,7 +203,7 @@ Output ONLY the JSON array, no other text.""",
                 "success": True,
                 "data": calendar_data,
                 "timestamp": datetime.now().isoformat(),
-                "powered_by": "GROQ",
+                "powered_by": powered_by,
             }
         )
 
@@ -231,26 +213,18 @@ Output ONLY the JSON array, no other text.""",
 
 @knowledge_bp.route("/farming-tips", methods=["GET"])
 def get_farming_tips():
-    """Get smart farming tips using GROQ for lightweight AI generation"""
+    """Get smart farming tips using GROQ (or Gemini) for lightweight AI generation"""
     try:
         # Get current weather for context
         weather_data = get_current_weather("Kochi")
         weather_context = ""
         if weather_data:
-            weather_context = f"Current weather: {weather_data['temperature']}°C, {weather_data['description']}, Humidity: {weather_data['humidity']}%"
-
-        client = get_groq_client()
+            weather_context = f"Current weather: {weather_data.temperature}°C, {weather_data.description}, Humidity: {weather_data.humidity}%"
 
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a smart farming advisor for Kerala farmers. Provide practical, actionable tips.",
-                },
-                {
-                    "role": "user",
-                    "content": f"""Generate exactly 3 practical farming tips for Kerala farmers.
+        reply = llm_router.generate(
+            "generate",
+            LIGHTWEIGHT_PROVIDERS,
+            f"""Generate exactly 3 practical farming tips for Kerala farmers.
 {weather_context}
 
 Requirements:
@@ -263,13 +237,13 @@ Output format (plain text, one tip per line):
 Use drip irrigation to save 30-50% water while improving crop yield.
 Test soil pH regularly and add organic matter to improve structure.
 Plan crop rotation based on seasonal weather for maximum yield.""",
-                },
-            ],
+            system="You are a smart farming advisor for Kerala farmers. Provide practical, actionable tips.",
             max_tokens=300,
             temperature=0.8,
         )
 
-        content = response.choices[0].message.content.strip()
+        content = reply.strip()
+        powered_by = llm_router.answered_by()
 
         # Split into individual tips
         tips = [
@@ -283,6 +257,7 @@ Plan crop rotation based on seasonal weather for maximum yield.""",
 
         # Fallback if not enough tips
         if len(tips) < 3:
+            powered_by = "FALLBACK"
             tips = [
                 "Use drip irrigation to save 30-50% water while improving crop yield.",
                 "Test soil pH regularly and add organic matter to improve soil structure.",
@@ -294,7 +269,7 @@ Plan crop rotation based on seasonal weather for maximum yield.""",
                 "success": True,
                 "tips": tips,
                 "timestamp": datetime.now().isoformat(),
-                "powered_by": "GROQ",
+                "powered_by": powered_by,
             }
         )
 
@@ -303,44 +278,34 @@ Plan crop rotation based on seasonal weather for maximum yield.""",
 
 
 def get_current_weather(city="Kochi"):
-    """Get current weather data from OpenWeatherMap API using environment API key"""
-    try:
-        api_key = get_openweather_api_key()
-
-        url = f"{OPENWEATHER_BASE_URL}/weather"
-        params = {"q": city, "appid": api_key, "units": "metric"}
-
-        response = requests.get(url, params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "temperature": data["main"]["temp"],
-                "description": data["weather"][0]["description"],
-                "humidity": data["main"]["humidity"],
-                "wind_speed": data["wind"]["speed"],
-            }
-        else:
-            return None
-    except Exception as e:
-        print(f"Weather API error: {e}")
-        return None
+    """Get current conditions from the shared weather service"""
+    report = weather.get_weather(city)
+    return report.current if report else None
 
 
 @knowledge_bp.route("/weather-analysis", methods=["GET"])
 def get_weather_analysis():
     """Get detailed weather analysis for farming using Gemini API Key 2"""
+    return handle_weather_analysis(stream=wants_event_stream(request))
+
+
+@knowledge_bp.route("/weather-analysis/stream", methods=["GET"])
+def stream_weather_analysis():
+    """Stream the weather analysis as Server-Sent Events"""
+    return handle_weather_analysis(stream=True)
+
+
+def handle_weather_analysis(stream=False):
     try:
         weather_data = get_current_weather("Kochi")
         if not weather_data:
             return jsonify({"success": False, "error": "Weather data unavailable"}), 500
 
-        model = get_gemini_knowledge_client()
         prompt = f"""Based on the current weather conditions in Kerala:
-        - Temperature: {weather_data['temperature']}°C
-        - Condition: {weather_data['description']}
-        - Humidity: {weather_data['humidity']}%
-        - Wind Speed: {weather_data['wind_speed']} m/s
+        - Temperature: {weather_data.temperature}°C
+        - Condition: {weather_data.description}
+        - Humidity: {weather_data.humidity}%
+        - Wind Speed: {weather_data.wind_speed} m/s
 
         Provide detailed analysis for farmers including:
         1. Impact on current crops
@@ -352,17 +317,32 @@ def get_weather_analysis():
 
         Format the response in clear sections with actionable advice."""
 
-        response = model.generate_content(prompt)
-        content = response.text if response.text else "Weather analysis unavailable"
+        if stream:
+            return sse_response(
+                stream_generation_events(
+                    KNOWLEDGE_PROVIDERS,
+                    prompt,
+                    "analysis",
+                    {
+                        "weather_data": weather_data.to_dict(),
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                    "Weather analysis unavailable",
+                )
+            )
+
+        text = llm_router.generate("generate", KNOWLEDGE_PROVIDERS, prompt)
+        content = text if text else "Weather analysis unavailable"
 
         return jsonify(
             {
                 "success": True,
-                "weather_data": weather_data,
+                "weather_data": weather_data.to_dict(),
                 "analysis": content,
                 "timestamp": datetime.now().isoformat(),
             }
         )
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        print(f"Weather analysis error: {str(e)}")
+        return jsonify({"success": False, "error": "Weather analysis unavailable"}), 500
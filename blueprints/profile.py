@@ -1,10 +1,9 @@
-import os
 from datetime import datetime
 
-import google.generativeai as genai
 from flask import Blueprint, jsonify, request
 
 from models import Activity, Crop, Farm, Farmer, Livestock, db
+from services import llm
 
 # Predefined valid crops and livestock for Kerala (matching frontend lists)
 KERALA_CROPS = [
@@ -41,9 +40,9 @@ KERALA_LIVESTOCK = [
 
 profile_bp = Blueprint("profile", __name__)
 
-# Configure Gemini AI
-genai.configure(api_key=os.environ.get("GEMINI_API_KEY_1"))
-model = genai.GenerativeModel("gemini-2.5-flash")
+def get_gemini_profile_client():
+    """Get Gemini provider for farmer insights (uses API key 1)"""
+    return llm.get_gemini("GEMINI_API_KEY_1")
 
 
 def validate_crops_livestock(crops, livestock):
@@ -268,12 +267,13 @@ def get_profile_analytics(farmer_id):
         Keep the response practical and actionable for an Indian farmer.
         """
 
-        response = model.generate_content(prompt)
+        model = get_gemini_profile_client()
+        text = model.generate(prompt)
 
         return jsonify(
             {
                 "farmer_name": farmer.name,
-                "analysis": response.text,
+                "analysis": text,
                 "generated_at": "2025-09-26",
             }
         )
@@ -1,27 +1,18 @@
 import json
-import os
 from datetime import datetime, timedelta
 
-import google.generativeai as genai
 from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
-from groq import Groq
+
+from services import llm
 
 load_dotenv()
 
 schemes_bp = Blueprint("schemes", __name__)
 
-# Configure Gemini API
-GEMINI_API_KEY_2 = os.getenv("GEMINI_API_KEY_2")
-genai.configure(api_key=GEMINI_API_KEY_2)
-
-# Initialize GROQ client for lightweight tasks
-def get_groq_client():
-    """Get GROQ client for lightweight scheme analysis"""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise ValueError("GROQ API key not configured")
-    return Groq(api_key=api_key)
+def get_gemini_schemes_client():
+    """Get Gemini provider for scheme recommendations (uses API key 2)"""
+    return llm.get_gemini("GEMINI_API_KEY_2")
 
 # Government schemes data
 SCHEMES_DATA = [
@@ -229,11 +220,12 @@ def generate_default_recommendations():
         }}
         """
 
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        model = get_gemini_schemes_client()
 
+        # Upstream errors (or an open circuit) get the same fallback as bad JSON
         try:
-            ai_response = json.loads(response.text)
+            text = model.generate(prompt)
+            ai_response = json.loads(text)
             return ai_response
         except:
             # Fallback recommendations
@@ -426,16 +418,18 @@ def recommend_schemes():
         """
 
         # Generate response using Gemini
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        model = get_gemini_schemes_client()
+        text = ""
 
         try:
+            text = model.generate(prompt)
+
             # Try to parse JSON response
             import json
 
-            ai_response = json.loads(response.text)
+            ai_response = json.loads(text)
         except:
-            # Fallback if JSON parsing fails
+            # Fallback if generation or JSON parsing fails
             ai_response = {
                 "recommendations": [
                     {
@@ -445,7 +439,7 @@ def recommend_schemes():
                         "potential_benefit": "₹6,000 per year",
                     }
                 ],
-                "additional_advice": response.text,
+                "additional_advice": text,
             }
 
         # Get full scheme details for recommended schemes
@@ -519,13 +513,14 @@ def check_eligibility():
         }}
         """
 
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        model = get_gemini_schemes_client()
 
         try:
+            text = model.generate(prompt)
+
             import json
 
-            eligibility_result = json.loads(response.text)
+            eligibility_result = json.loads(text)
         except:
             eligibility_result = {
                 "eligible": True,
@@ -610,9 +605,6 @@ def quick_scheme_match():
         if not farmer_query:
             return jsonify({"success": False, "error": "Query is required"}), 400
 
-        # Use GROQ for fast scheme matching
-        client = get_groq_client()
-        
         # Create a simplified scheme list for GROQ
         scheme_summary = []
         for scheme in SCHEMES_DATA:
@@ -620,25 +612,18 @@ def quick_scheme_match():
         
         schemes_text = "; ".join(scheme_summary)
         
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": f"You are a quick scheme matcher. Given farmer needs, return only the top 2 most relevant scheme IDs from this list: {schemes_text}. Respond with just comma-separated IDs, e.g., '1,3'"
-                },
-                {"role": "user", "content": f"Farmer needs: {farmer_query}"}
-            ],
-            max_tokens=20,
-            temperature=0.3
-        )
-
-        # Parse the response to get scheme IDs
+        # Use GROQ for fast scheme matching, and parse the response to get scheme IDs
         try:
-            suggested_ids = [int(id.strip()) for id in response.choices[0].message.content.strip().split(',')]
+            reply = llm.get_groq().generate(
+                f"Farmer needs: {farmer_query}",
+                system=f"You are a quick scheme matcher. Given farmer needs, return only the top 2 most relevant scheme IDs from this list: {schemes_text}. Respond with just comma-separated IDs, e.g., '1,3'",
+                max_tokens=20,
+                temperature=0.3
+            )
+            suggested_ids = [int(id.strip()) for id in reply.strip().split(',')]
             matched_schemes = [scheme for scheme in SCHEMES_DATA if scheme['id'] in suggested_ids]
         except:
-            # Fallback to first 2 schemes if parsing fails
+            # Fallback to first 2 schemes if GROQ or parsing fails
             matched_schemes = SCHEMES_DATA[:2]
 
         return jsonify({
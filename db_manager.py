@@ -9,7 +9,7 @@ import sys
 
 from dotenv import load_dotenv
 from flask import Flask
-from flask_migrate import Migrate, downgrade, init, migrate, upgrade
+from flask_migrate import Migrate, downgrade, init, migrate, stamp, upgrade
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -48,7 +48,8 @@ def create_app():
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
     db.init_app(app)
-    migrate_obj = Migrate(app, db)
+    # Batch mode rebuilds SQLite tables for ALTERs it does not support
+    migrate_obj = Migrate(app, db, render_as_batch=True)
     return app, migrate_obj
 
 
@@ -78,6 +79,14 @@ def apply_migrations():
         print("✅ All migrations applied")
 
 
+def stamp_database(revision=None):
+    """Mark the database as migrated to a revision without running it"""
+    app, migrate_obj = create_app()
+    with app.app_context():
+        stamp(revision=revision or "head")
+        print(f"✅ Database stamped at {revision or 'head'}")
+
+
 def rollback_migration():
     """Rollback the last migration"""
     app, migrate_obj = create_app()
@@ -138,10 +147,13 @@ def show_stats():
             from models import (
                 Activity,
                 Advisory,
+                ChatSession,
+                ChatTurn,
                 Crop,
                 Farm,
                 Farmer,
                 Livestock,
+                MarketPrice,
                 WeatherLog,
             )
 
@@ -153,6 +165,9 @@ def show_stats():
                 "Activities": Activity.query.count(),
                 "Advisories": Advisory.query.count(),
                 "Weather Logs": WeatherLog.query.count(),
+                "Market Prices": MarketPrice.query.count(),
+                "Chat Sessions": ChatSession.query.count(),
+                "Chat Turns": ChatTurn.query.count(),
             }
 
             print("📊 Database Statistics:")
@@ -163,14 +178,62 @@ def show_stats():
             print(f"❌ Failed to get statistics: {str(e)}")
 
 
+def load_market_prices(path=None):
+    """Load market prices from a CSV/JSON file or an HTTP(S) JSON feed"""
+    app, migrate_obj = create_app()
+    with app.app_context():
+        from services.market_prices import (
+            SAMPLE_PRICES_PATH,
+            load_prices_from_feed,
+            load_prices_from_file,
+        )
+
+        path = path or SAMPLE_PRICES_PATH
+        if path.startswith(("http://", "https://")):
+            count = load_prices_from_feed(path)
+        else:
+            count = load_prices_from_file(path)
+        print(f"✅ Loaded {count} market prices from {path}")
+
+
+def purge_chat_sessions(max_idle_days=None):
+    """Delete chat sessions idle for longer than CHAT_SESSION_MAX_IDLE_DAYS"""
+    app, migrate_obj = create_app()
+    with app.app_context():
+        from services import chat_sessions
+
+        if max_idle_days is None:
+            max_idle_days = chat_sessions.CHAT_SESSION_MAX_IDLE_DAYS
+        count = chat_sessions.purge_idle_sessions(max_idle_days)
+        print(f"✅ Purged {count} chat sessions idle for over {max_idle_days:g} days")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Krishi Sakhi Database Management")
     parser.add_argument(
         "command",
-        choices=["init", "migrate", "upgrade", "downgrade", "reset", "check", "stats"],
+        choices=[
+            "init",
+            "migrate",
+            "upgrade",
+            "downgrade",
+            "stamp",
+            "reset",
+            "check",
+            "stats",
+            "load-prices",
+            "purge-sessions",
+        ],
         help="Database command to execute",
     )
     parser.add_argument("-m", "--message", help="Migration message")
+    parser.add_argument("-r", "--revision", help="Revision to stamp (default: head)")
+    parser.add_argument(
+        "-f", "--file", help="Market price CSV/JSON file or feed URL (load-prices)"
+    )
+    parser.add_argument(
+        "--days", type=float, help="Idle days before a chat session is purged"
+    )
 
     args = parser.parse_args()
 
@@ -183,12 +246,18 @@ def main():
             apply_migrations()
         elif args.command == "downgrade":
             rollback_migration()
+        elif args.command == "stamp":
+            stamp_database(args.revision)
         elif args.command == "reset":
             reset_database()
         elif args.command == "check":
             check_database()
         elif args.command == "stats":
             show_stats()
+        elif args.command == "load-prices":
+            load_market_prices(args.file)
+        elif args.command == "purge-sessions":
+            purge_chat_sessions(args.days)
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
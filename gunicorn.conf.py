@@ -0,0 +1,88 @@
+"""
+Production gunicorn settings for wsgi:app
+
+Almost all request time is spent waiting on Gemini, GROQ and OpenWeather,
+so concurrency comes from threads (gthread) or greenlets (gevent) rather
+than processes: a few workers for CPU and fault isolation, each holding
+enough requests for its share of GUNICORN_UPSTREAM_CONCURRENCY, the number
+of upstream calls the deployment should keep in flight. Every setting can
+be overridden with its GUNICORN_* variable.
+"""
+
+import gc
+import math
+import multiprocessing
+import os
+
+_cpus = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Import Flask, the AI SDKs and numpy once in the master; workers share the
+# pages copy-on-write and boot faster
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")  # gthread, gevent or sync
+workers = int(os.getenv("GUNICORN_WORKERS", str(max(2, _cpus))))
+
+upstream_concurrency = int(os.getenv("GUNICORN_UPSTREAM_CONCURRENCY", "64"))
+# gthread: threads per worker; gevent: greenlets per worker
+threads = int(
+    os.getenv(
+        "GUNICORN_THREADS", str(max(4, math.ceil(upstream_concurrency / workers)))
+    )
+)
+worker_connections = int(
+    os.getenv("GUNICORN_WORKER_CONNECTIONS", str(max(100, threads * 4)))
+)
+
+# The slowest legitimate request is a Gemini call that times out and fails
+# over to GROQ, so allow both deadlines plus headroom before a worker counts
+# as hung, and let in-flight calls finish on restarts
+_llm_seconds = float(os.getenv("GEMINI_TIMEOUT", "30")) + float(
+    os.getenv("GROQ_TIMEOUT", "20")
+)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", str(int(_llm_seconds) + 15)))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", str(timeout)))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers to bound memory growth; jitter keeps them from all
+# restarting at once. In-memory caches start empty in a recycled worker
+# (the sqlite and tiered cache backends survive it)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# "-" logs to stdout; empty disables the access log
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    if preload_app:
+        # Keep the preloaded heap out of garbage collection so collections in
+        # the workers do not write to (and un-share) its pages
+        gc.freeze()
+
+    concurrency = threads if worker_class == "gthread" else worker_connections
+    if worker_class == "sync":
+        concurrency = 1
+    print(
+        f"🚀 gunicorn: {workers} {worker_class} workers x {concurrency} "
+        f"concurrent requests, preload {'on' if preload_app else 'off'}, "
+        f"timeout {timeout}s, recycle after ~{max_requests} requests"
+    )
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # gRPC (Gemini) must cooperate with gevent's monkey-patched sockets
+        import grpc.experimental.gevent
+
+        grpc.experimental.gevent.init_gevent()
+
+
+def post_worker_init(worker):
+    # Clients and background jobs belong to each worker, not the master
+    from main import start_worker_services
+
+    start_worker_services(worker.wsgi)
@@ -360,6 +360,12 @@ def init_database():
         db.session.commit()
         print(f"Created {len(advisories)} advisories")
 
+        # Load sample market price history
+        from services.market_prices import SAMPLE_PRICES_PATH, load_prices_from_file
+
+        prices_count = load_prices_from_file(SAMPLE_PRICES_PATH, source="sample")
+        print(f"Created {prices_count} market prices")
+
         print("\n✅ Database initialization completed successfully!")
         print(f"📊 Summary:")
         print(f"   - Farmers: {len(farmers)}")
@@ -368,6 +374,7 @@ def init_database():
         print(f"   - Livestock: {len(livestock)}")
         print(f"   - Activities: {len(activities)}")
         print(f"   - Advisories: {len(advisories)}")
+        print(f"   - Market Prices: {prices_count}")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
+import importlib
 import os
 
 from dotenv import load_dotenv
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from flask_migrate import Migrate
 
 from blueprints.activity import activity_bp
 from blueprints.advisory import advisory_bp
@@ -13,9 +13,28 @@ from blueprints.knowledge import knowledge_bp
 from blueprints.profile import profile_bp
 from blueprints.schemes import schemes_bp
 from models import db
+from services import circuit_breaker, gemini, llm, llm_router, prompts, rate_limiter
+from services.chat_sessions import (
+    CHAT_SESSION_PURGE_INTERVAL,
+    start_session_purge_job,
+)
+from services.market_prices import start_market_summary_job
+from services.weather_prewarm import start_prewarmer
 
+# Imported on first use by the services; warm_up_sdks() loads them up front
+LAZY_SDKS = ("google.generativeai", "groq", "PIL.Image", "requests")
+# Load SDKs and Gemini clients when a worker starts; false defers them to
+# first use, so the process starts serving sooner
+SDK_WARM_UP = os.getenv("SDK_WARM_UP", "true").lower() == "true"
 
-def create_app():
+
+def create_app(start_services=True, config=None):
+    """Build the Flask app
+
+    start_services=False leaves per-process clients and background jobs to
+    start_worker_services(), e.g. in each worker after gunicorn forks.
+    `config` overrides settings such as the database URI (e.g. for tests).
+    """
     app = Flask(__name__)
     load_dotenv()
 
@@ -24,13 +43,20 @@ def create_app():
 
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key")
+    if config:
+        app.config.update(config)
 
     # Enable CORS for React frontend
     allowed_origins = os.environ.get("ALLOWED_ORIGINS", "*").split(",")
     CORS(app, origins=allowed_origins, supports_credentials=True)
 
     db.init_app(app)
-    migrate = Migrate(app, db)
+    # `flask db ...` commands; Flask-Migrate pulls in Alembic, so servers and
+    # scripts that never migrate skip it
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+
+        Migrate(app, db, render_as_batch=True)
 
     # Register API blueprints with /api prefix
     app.register_blueprint(chat_bp, url_prefix="/api")
@@ -41,14 +67,77 @@ def create_app():
     app.register_blueprint(home_bp, url_prefix="/api/home")
     app.register_blueprint(knowledge_bp, url_prefix="/api/knowledge")
 
+    if start_services:
+        start_worker_services(app)
+
     # API Routes
     @app.route("/api/health")
     def health_check():
-        return {"status": "healthy", "message": "Krishi Sakhi API is running"}
+        # Open circuits mean degraded answers (fallbacks), not a down API
+        circuits = circuit_breaker.get_states()
+        degraded = any(state["state"] != "closed" for state in circuits.values())
+        return {
+            "status": "degraded" if degraded else "healthy",
+            "message": "Krishi Sakhi API is running",
+            "circuits": circuits,
+        }
+
+    @app.route("/api/llm/stats")
+    def llm_stats():
+        # Per-provider latency percentiles, error rates, hedging, rate limits
+        # and prompt-template token usage
+        return {
+            "success": True,
+            "data": {
+                **llm.get_stats(),
+                "router": llm_router.get_stats(),
+                "rate_limits": rate_limiter.get_stats(),
+                "prompts": prompts.get_stats(),
+            },
+        }
 
     return app
 
 
+def warm_up_sdks():
+    """Import the lazily loaded SDKs now instead of in the first request"""
+    for name in LAZY_SDKS:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"SDK warm-up skipped {name}: {e}")
+
+
+def start_worker_services(app):
+    """Start this process's upstream clients and background jobs
+
+    Run once per serving process: threads and gRPC channels do not survive
+    a fork, and jobs started in a preloading master would update the
+    master's memory instead of the workers'.
+    """
+    # Connections inherited from a parent process belong to the parent
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    if SDK_WARM_UP:
+        warm_up_sdks()
+        # Build the shared Gemini clients once per worker instead of per request
+        if llm.LLM_BACKEND != "stub":
+            gemini.warm_up()
+
+    # Optionally keep weather warm for active farm locations in this process
+    if os.environ.get("WEATHER_PREWARM", "false").lower() == "true":
+        start_prewarmer(app)
+
+    # Optionally refresh the AI market price summary in the background
+    if os.environ.get("MARKET_SUMMARY_JOB", "false").lower() == "true":
+        start_market_summary_job(app)
+
+    # Delete chat sessions idle for CHAT_SESSION_MAX_IDLE_DAYS
+    if CHAT_SESSION_PURGE_INTERVAL > 0:
+        start_session_purge_job(app)
+
+
 if __name__ == "__main__":
     app = create_app()
     app.run(debug=True, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
@@ -0,0 +1,43 @@
+"""weather_logs: one snapshot row per location, country and day
+
+Revision ID: 3b7e52a91d04
+Revises: cc4c215f7b3d
+Create Date: 2026-10-18 00:40:12.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e52a91d04'
+down_revision = 'cc4c215f7b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weather_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('country', sa.String(length=2), server_default='IN', nullable=False))
+        batch_op.add_column(sa.Column('payload', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('date_updated', sa.DateTime(), nullable=True))
+
+    # Existing rows were last updated when they were written, and only the
+    # newest row of a day survives the new unique constraint
+    op.execute('UPDATE weather_logs SET date_updated = date_created')
+    op.execute(
+        'DELETE FROM weather_logs WHERE id NOT IN ('
+        'SELECT MAX(id) FROM weather_logs GROUP BY location, country, date)'
+    )
+
+    with op.batch_alter_table('weather_logs', schema=None) as batch_op:
+        batch_op.alter_column('date_updated', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_unique_constraint('uq_weather_logs_location_country_date', ['location', 'country', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('weather_logs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_weather_logs_location_country_date', type_='unique')
+        batch_op.drop_column('date_updated')
+        batch_op.drop_column('payload')
+        batch_op.drop_column('country')
@@ -0,0 +1,44 @@
+"""market_prices table
+
+Revision ID: 8d41c0e6f2a9
+Revises: 3b7e52a91d04
+Create Date: 2026-10-18 00:41:05.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41c0e6f2a9'
+down_revision = '3b7e52a91d04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('market_prices',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('commodity', sa.String(length=100), nullable=False),
+    sa.Column('market', sa.String(length=100), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(length=30), nullable=True),
+    sa.Column('source', sa.String(length=50), nullable=True),
+    sa.Column('date_created', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('commodity', 'market', 'date', name='uq_market_prices_commodity_market_date')
+    )
+    with op.batch_alter_table('market_prices', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_market_prices_commodity'), ['commodity'], unique=False)
+        batch_op.create_index(batch_op.f('ix_market_prices_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_market_prices_market'), ['market'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('market_prices', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_market_prices_market'))
+        batch_op.drop_index(batch_op.f('ix_market_prices_date'))
+        batch_op.drop_index(batch_op.f('ix_market_prices_commodity'))
+
+    op.drop_table('market_prices')
@@ -0,0 +1,59 @@
+"""chat_sessions and chat_turns tables
+
+Revision ID: f1c27a9d4b86
+Revises: 8d41c0e6f2a9
+Create Date: 2026-10-18 09:12:37.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c27a9d4b86'
+down_revision = '8d41c0e6f2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_sessions',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('farmer_id', sa.Integer(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_turns', sa.Integer(), nullable=False),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.DateTime(), nullable=False),
+    sa.Column('last_active', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['farmer_id'], ['farmers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chat_sessions_farmer_id'), ['farmer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_chat_sessions_last_active'), ['last_active'], unique=False)
+
+    op.create_table('chat_turns',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('session_id', sa.String(length=32), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=10), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('date_created', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'position', name='uq_chat_turns_session_position')
+    )
+    with op.batch_alter_table('chat_turns', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chat_turns_session_id'), ['session_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_turns', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_turns_session_id'))
+
+    op.drop_table('chat_turns')
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_sessions_last_active'))
+        batch_op.drop_index(batch_op.f('ix_chat_sessions_farmer_id'))
+
+    op.drop_table('chat_sessions')
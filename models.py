@@ -227,9 +227,16 @@ class Activity(db.Model):
 # Additional models for enhanced functionality
 class WeatherLog(db.Model):
     __tablename__ = "weather_logs"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "location", "country", "date", name="uq_weather_logs_location_country_date"
+        ),
+    )
 
     id = db.Column(Integer, primary_key=True, autoincrement=True)
     location = db.Column(String(100), nullable=False, index=True)
+    # ISO country code: the same city name can exist in several countries
+    country = db.Column(String(2), nullable=False, default="IN", server_default="IN")
     date = db.Column(Date, nullable=False, index=True)
     temperature_max = db.Column(Float, nullable=True)
     temperature_min = db.Column(Float, nullable=True)
@@ -237,12 +244,15 @@ class WeatherLog(db.Model):
     rainfall = db.Column(Float, nullable=True)
     wind_speed = db.Column(Float, nullable=True)
     weather_condition = db.Column(String(50), nullable=True)
+    payload = db.Column(Text, nullable=True)  # latest OpenWeather JSON snapshot
     date_created = db.Column(DateTime, nullable=False, default=datetime.utcnow)
+    date_updated = db.Column(DateTime, nullable=False, default=datetime.utcnow)
 
     def to_dict(self):
         return {
             "id": self.id,
             "location": self.location,
+            "country": self.country,
             "date": self.date.isoformat() if self.date else None,
             "temperature_max": self.temperature_max,
             "temperature_min": self.temperature_min,
@@ -253,6 +263,46 @@ class WeatherLog(db.Model):
             "date_created": (
                 self.date_created.isoformat() if self.date_created else None
             ),
+            "date_updated": (
+                self.date_updated.isoformat() if self.date_updated else None
+            ),
+        }
+
+
+class MarketPrice(db.Model):
+    __tablename__ = "market_prices"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "commodity", "market", "date", name="uq_market_prices_commodity_market_date"
+        ),
+    )
+
+    id = db.Column(Integer, primary_key=True, autoincrement=True)
+    commodity = db.Column(String(100), nullable=False, index=True)
+    market = db.Column(String(100), nullable=False, index=True)
+    date = db.Column(Date, nullable=False, index=True)
+    price = db.Column(Float, nullable=False)  # in rupees per unit
+    unit = db.Column(String(30), default="kg")
+    source = db.Column(String(50), nullable=True)
+    date_created = db.Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<MarketPrice {self.commodity} @ {self.market} {self.date}: {self.price}>"
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "commodity": self.commodity,
+            "market": self.market,
+            "date": self.date.isoformat() if self.date else None,
+            "price": self.price,
+            "unit": self.unit,
+            "source": self.source,
+            "date_created": (
+                self.date_created.isoformat() if self.date_created else None
+            ),
         }
 
 
@@ -293,3 +343,71 @@ class Advisory(db.Model):
             ),
             "created_by": self.created_by,
         }
+
+
+class ChatSession(db.Model):
+    __tablename__ = "chat_sessions"
+
+    id = db.Column(String(32), primary_key=True)  # uuid4 hex, given to the client
+    farmer_id = db.Column(
+        Integer, db.ForeignKey("farmers.id"), nullable=True, index=True
+    )
+    summary = db.Column(Text, nullable=True)  # of turns before summarized_turns
+    summarized_turns = db.Column(Integer, nullable=False, default=0)
+    turn_count = db.Column(Integer, nullable=False, default=0)
+    date_created = db.Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_active = db.Column(
+        DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+
+    turns = db.relationship(
+        "ChatTurn",
+        backref="session",
+        lazy=True,
+        cascade="all, delete-orphan",
+        order_by="ChatTurn.position",
+    )
+
+    def __repr__(self):
+        return f"<ChatSession {self.id} - {self.turn_count} turns>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "farmer_id": self.farmer_id,
+            "summary": self.summary,
+            "summarized_turns": self.summarized_turns,
+            "turn_count": self.turn_count,
+            "date_created": (
+                self.date_created.isoformat() if self.date_created else None
+            ),
+            "last_active": self.last_active.isoformat() if self.last_active else None,
+        }
+
+
+class ChatTurn(db.Model):
+    __tablename__ = "chat_turns"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "session_id", "position", name="uq_chat_turns_session_position"
+        ),
+    )
+
+    id = db.Column(Integer, primary_key=True, autoincrement=True)
+    session_id = db.Column(
+        String(32), db.ForeignKey("chat_sessions.id"), nullable=False, index=True
+    )
+    position = db.Column(Integer, nullable=False)  # 0-based order in the session
+    role = db.Column(String(10), nullable=False)  # user, assistant
+    content = db.Column(Text, nullable=False)
+    date_created = db.Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "position": self.position,
+            "role": self.role,
+            "content": self.content,
+            "date_created": (
+                self.date_created.isoformat() if self.date_created else None
+            ),
+        }
@@ -0,0 +1,343 @@
+"""
+Caching primitives shared by the API blueprints
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from services import rate_limiter
+from services.singleflight import SingleFlight
+
+DEFAULT_SQLITE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "cache.db"
+)
+
+
+class MemoryBackend:
+    """In-process LRU store of (value, stored_at) pairs"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def try_claim(self, key, seconds):
+        """Claims are only needed across processes; one process always wins"""
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk store shared by every worker process on the same host"""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, namespace="default", max_entries=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = self._connect()
+        connection.execute("""CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                claimed_until REAL,
+                PRIMARY KEY (namespace, key)
+            )""")
+        connection.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads, or with
+        # the parent of a forked worker
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(key, ensure_ascii=False)
+
+    def get(self, key):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, self._encode_key(key)),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at):
+        connection = self._connect()
+        connection.execute(
+            """INSERT INTO cache_entries (namespace, key, value, stored_at, claimed_until)
+            VALUES (?, ?, ?, ?, NULL)
+            ON CONFLICT (namespace, key) DO UPDATE SET
+                value = excluded.value,
+                stored_at = excluded.stored_at,
+                claimed_until = NULL""",
+            (self.namespace, self._encode_key(key), json.dumps(value), stored_at),
+        )
+        if self.max_entries:
+            # Drop the oldest entries beyond the configured size
+            connection.execute(
+                """DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY stored_at DESC LIMIT ?
+                )""",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+        connection.commit()
+
+    def delete(self, key):
+        connection = self._connect()
+        connection.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._encode_key(key)),
+        )
+        connection.commit()
+
+    def try_claim(self, key, seconds):
+        """Let only one worker process refresh a stale entry at a time"""
+        now = time.time()
+        connection = self._connect()
+        cursor = connection.execute(
+            """UPDATE cache_entries SET claimed_until = ?
+            WHERE namespace = ? AND key = ?
+            AND (claimed_until IS NULL OR claimed_until < ?)""",
+            (now + seconds, self.namespace, self._encode_key(key), now),
+        )
+        connection.commit()
+        return cursor.rowcount == 1
+
+    def __len__(self):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,),
+            )
+            .fetchone()
+        )
+        return row[0]
+
+
+class TieredBackend:
+    """Memory LRU in front of a persistent backend that survives restarts"""
+
+    def __init__(self, memory, persistent):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.persistent.get(key)
+            if entry is not None:
+                # Promote so repeat lookups stay in memory
+                self.memory.set(key, *entry)
+        return entry
+
+    def set(self, key, value, stored_at):
+        self.memory.set(key, value, stored_at)
+        self.persistent.set(key, value, stored_at)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        self.persistent.delete(key)
+
+    def try_claim(self, key, seconds):
+        return self.persistent.try_claim(key, seconds)
+
+    def __len__(self):
+        return len(self.persistent)
+
+
+# A loaded value with the time it was observed, for loaders that can return
+# data older than now (e.g. a stored snapshot), so it ages from that time
+Stamped = namedtuple("Stamped", ["value", "stored_at"])
+
+
+class SWRCache:
+    """TTL cache that keeps serving stale entries while one background refresh runs
+
+    Entries younger than `ttl` are fresh. Entries older than that but within
+    `stale_ttl` more seconds are returned immediately and refreshed in the
+    background. Anything older is treated as a miss and loaded inline.
+    Loaders returning None are never cached; loaders may return a Stamped
+    value to have it cached as of an earlier time.
+    """
+
+    def __init__(self, name, backend, ttl=600, stale_ttl=1800):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        self._lock = threading.Lock()
+        # Coalesces concurrent loads of the same key
+        self._flight = SingleFlight()
+        self._refreshing = set()
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, key):
+        """Return a cached value regardless of age, or None"""
+        entry = self.backend.get(key)
+        return entry[0] if entry else None
+
+    def lookup(self, key):
+        """Return a fresh cached value, or None, counting the hit or miss"""
+        entry = self.backend.get(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            self._count("hits")
+            return entry[0]
+        self._count("misses")
+        return None
+
+    def get_or_load(self, key, loader):
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self._count("hits")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_in_background(key, loader)
+                return value
+
+        self._count("misses")
+        # Concurrent misses for the same key wait for a single load
+        return self._flight.do(key, lambda: self._load_if_stale(key, loader))
+
+    def refresh(self, key, loader):
+        """Load a fresh value now and store it, bypassing the TTL"""
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def set(self, key, value):
+        self.backend.set(key, value, time.time())
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def _load_if_stale(self, key, loader):
+        # A load that finished just before this flight started already stored it
+        entry = self.backend.get(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return self._load(key, loader)
+
+    def _load(self, key, loader):
+        value, stored_at = loader(), time.time()
+        if isinstance(value, Stamped):
+            value, stored_at = value
+        if value is not None:
+            self.backend.set(key, value, stored_at)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        if not self.backend.try_claim(key, self.ttl):
+            # Another worker process is already refreshing this entry
+            with self._lock:
+                self._refreshing.discard(key)
+            return
+
+        def run():
+            try:
+                self._count("refreshes")
+                # Users are being served the stale value, so yield LLM quota to them
+                with rate_limiter.priority(rate_limiter.BACKGROUND):
+                    loaded = self._flight.do(key, lambda: self._load(key, loader))
+                if loaded is None:
+                    self._count("refresh_errors")
+            except Exception as e:
+                self._count("refresh_errors")
+                print(f"{self.name} cache refresh error: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(
+            target=run, name=f"{self.name}-cache-refresh", daemon=True
+        ).start()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            round((stats["hits"] + stats["stale_hits"]) / lookups, 3)
+            if lookups
+            else 0.0
+        )
+        stats["entries"] = len(self.backend)
+        stats["backend"] = type(self.backend).__name__
+        stats["ttl"] = self.ttl
+        stats["stale_ttl"] = self.stale_ttl
+        return stats
+
+
+def create_backend(kind, namespace, max_entries=256, persistent_max_entries=None):
+    """Build a cache backend by name ("memory", "sqlite" or "tiered")
+
+    "tiered" keeps `max_entries` in memory in front of a SQLite store of up
+    to `persistent_max_entries` (default: unbounded).
+    """
+    path = os.getenv("CACHE_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+    if kind == "sqlite":
+        return SQLiteBackend(path, namespace=namespace, max_entries=max_entries)
+    if kind == "tiered":
+        return TieredBackend(
+            MemoryBackend(max_entries=max_entries),
+            SQLiteBackend(
+                path, namespace=namespace, max_entries=persistent_max_entries
+            ),
+        )
+    return MemoryBackend(max_entries=max_entries)
@@ -0,0 +1,386 @@
+"""
+Multi-turn chat sessions with a bounded prompt
+
+Every turn of a session is stored in chat_turns, but a prompt only carries
+the last CHAT_SESSION_WINDOW turns verbatim (each clipped to
+CHAT_SESSION_TURN_CHARS) plus a summary of everything before them. When the
+unsummarized turns outgrow the window, the oldest are folded into the
+summary in a background thread. Until a fold catches up, the prompt
+carries every turn not yet in the summary, up to CHAT_SESSION_MAX_TURNS, so
+the history in a prompt stays under about CHAT_SESSION_SUMMARY_CHARS +
+CHAT_SESSION_MAX_TURNS * CHAT_SESSION_TURN_CHARS characters however long
+the conversation runs.
+
+Session state (summary and window) is cached per process and checked
+against the session row's turn counters, so a follow-up message costs one
+primary-key lookup instead of loading turns. Cached states idle for
+CHAT_SESSION_CACHE_IDLE seconds are dropped, and a background job deletes
+sessions idle for CHAT_SESSION_MAX_IDLE_DAYS from the database.
+"""
+
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from models import ChatSession, ChatTurn, db
+from services import rate_limiter
+from services.cache import MemoryBackend
+
+# Recent turns (user and assistant messages) sent verbatim with each message
+CHAT_SESSION_WINDOW = int(os.getenv("CHAT_SESSION_WINDOW", "8"))
+# Hard cap on the unsummarized turns in a prompt while folds lag behind
+CHAT_SESSION_MAX_TURNS = int(
+    os.getenv("CHAT_SESSION_MAX_TURNS", str(CHAT_SESSION_WINDOW * 2))
+)
+CHAT_SESSION_TURN_CHARS = int(os.getenv("CHAT_SESSION_TURN_CHARS", "1500"))
+CHAT_SESSION_SUMMARY_CHARS = int(os.getenv("CHAT_SESSION_SUMMARY_CHARS", "800"))
+CHAT_SESSION_CACHE_SIZE = int(os.getenv("CHAT_SESSION_CACHE_SIZE", "1000"))
+CHAT_SESSION_CACHE_IDLE = int(os.getenv("CHAT_SESSION_CACHE_IDLE", "1800"))
+CHAT_SESSION_MAX_IDLE_DAYS = float(os.getenv("CHAT_SESSION_MAX_IDLE_DAYS", "30"))
+# Seconds between idle-session purges in each process; 0 disables the job
+CHAT_SESSION_PURGE_INTERVAL = int(os.getenv("CHAT_SESSION_PURGE_INTERVAL", "3600"))
+
+ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+
+_cache = MemoryBackend(max_entries=CHAT_SESSION_CACHE_SIZE)
+_lock = threading.Lock()
+_folding = set()
+_purge_job = None
+stats = {
+    "cache_hits": 0,
+    "cache_misses": 0,
+    "created": 0,
+    "exchanges": 0,
+    "save_errors": 0,
+    "folds": 0,
+    "fold_errors": 0,
+    "purged": 0,
+}
+
+
+def _count(stat, amount=1):
+    with _lock:
+        stats[stat] += amount
+
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+@dataclass
+class SessionState:
+    """What a prompt needs from a session: the summary and the recent turns"""
+
+    id: str
+    summary: str = ""
+    summarized_turns: int = 0
+    turn_count: int = 0
+    # (role, content) of the turns not folded into the summary, at most
+    # CHAT_SESSION_MAX_TURNS
+    turns: list = field(default_factory=list)
+
+    @property
+    def version(self):
+        return self.turn_count, self.summarized_turns
+
+    @property
+    def has_history(self):
+        return bool(self.summary or self.turns)
+
+    def history(self):
+        """Conversation context for the user prompt ("" for a new session)"""
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation:\n{self.summary}")
+        if self.turns:
+            lines = [
+                f"{ROLE_LABELS[role]}: {_clip(content, CHAT_SESSION_TURN_CHARS)}"
+                for role, content in self.turns
+            ]
+            parts.append("Recent conversation:\n" + "\n".join(lines))
+        return "\n\n".join(parts) + "\n\n" if parts else ""
+
+
+def _load_state(row):
+    # Every turn the summary does not cover yet, capped in case folds keep failing
+    first = max(row.summarized_turns, row.turn_count - CHAT_SESSION_MAX_TURNS)
+    turns = (
+        ChatTurn.query.filter(ChatTurn.session_id == row.id, ChatTurn.position >= first)
+        .order_by(ChatTurn.position)
+        .all()
+    )
+    return SessionState(
+        id=row.id,
+        summary=row.summary or "",
+        summarized_turns=row.summarized_turns,
+        turn_count=row.turn_count,
+        turns=[(turn.role, turn.content) for turn in turns],
+    )
+
+
+def _cache_get(session_id):
+    entry = _cache.get(session_id)
+    if entry is None:
+        return None
+    state, stored_at = entry
+    if time.time() - stored_at > CHAT_SESSION_CACHE_IDLE:
+        _cache.delete(session_id)
+        return None
+    return state
+
+
+def create_session(farmer_id=None):
+    """Start a session; returns its SessionState"""
+    row = ChatSession(id=uuid.uuid4().hex, farmer_id=farmer_id)
+    db.session.add(row)
+    db.session.commit()
+    _count("created")
+    state = SessionState(id=row.id)
+    _cache.set(row.id, state, time.time())
+    return state
+
+
+def get_session(session_id):
+    """SessionState of a session, or None if it does not exist"""
+    row = db.session.get(ChatSession, session_id)
+    if row is None:
+        _cache.delete(session_id)
+        return None
+
+    state = _cache_get(session_id)
+    if state is not None and state.version == (row.turn_count, row.summarized_turns):
+        _count("cache_hits")
+        return state
+
+    _count("cache_misses")
+    state = _load_state(row)
+    _cache.set(session_id, state, time.time())
+    return state
+
+
+def get_session_details(session_id):
+    """The session row with the turns not yet folded into its summary"""
+    row = db.session.get(ChatSession, session_id)
+    if row is None:
+        return None
+    turns = (
+        ChatTurn.query.filter(
+            ChatTurn.session_id == session_id,
+            ChatTurn.position >= row.summarized_turns,
+        )
+        .order_by(ChatTurn.position)
+        .all()
+    )
+    return {**row.to_dict(), "turns": [turn.to_dict() for turn in turns]}
+
+
+def record_exchange(state, message, reply, summarize):
+    """Store a user message and its reply, folding old turns if needed
+
+    Returns whether the exchange was saved. `summarize(text, max_length)`
+    condenses turns into the summary and should raise when it cannot (e.g.
+    get_groq_summary with fallback=False); it runs in a background thread.
+    """
+    for _ in range(2):
+        row = db.session.get(ChatSession, state.id)
+        if row is None:
+            _count("save_errors")
+            print(f"Chat session {state.id} was deleted; exchange not saved")
+            return False
+        position = row.turn_count
+        summary, summarized_turns = row.summary or "", row.summarized_turns
+        db.session.add_all(
+            [
+                ChatTurn(
+                    session_id=row.id, position=position, role="user", content=message
+                ),
+                ChatTurn(
+                    session_id=row.id,
+                    position=position + 1,
+                    role="assistant",
+                    content=reply,
+                ),
+            ]
+        )
+        row.turn_count = position + 2
+        row.last_active = datetime.utcnow()
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            # Another request of this session took these positions
+            db.session.rollback()
+            db.session.expire_all()
+    else:
+        _count("save_errors")
+        print(f"Chat session {state.id}: turn positions kept conflicting; not saved")
+        return False
+    _count("exchanges")
+
+    if state.version == (position, summarized_turns):
+        # Extend the cached turns instead of reloading them
+        turns = state.turns + [("user", message), ("assistant", reply)]
+        state = SessionState(
+            id=state.id,
+            summary=summary,
+            summarized_turns=summarized_turns,
+            turn_count=position + 2,
+            turns=turns[-CHAT_SESSION_MAX_TURNS:],
+        )
+        _cache.set(state.id, state, time.time())
+    else:
+        _cache.delete(state.id)
+
+    if position + 2 - summarized_turns > CHAT_SESSION_WINDOW:
+        _fold_in_background(state.id, summarize)
+    return True
+
+
+def _fold_in_background(session_id, summarize):
+    with _lock:
+        if session_id in _folding:
+            return
+        _folding.add(session_id)
+    app = current_app._get_current_object()
+
+    def run():
+        try:
+            # Users are waiting on chat replies, so yield LLM quota to them
+            with app.app_context(), rate_limiter.priority(rate_limiter.BACKGROUND):
+                fold_session(session_id, summarize)
+        except Exception as e:
+            _count("fold_errors")
+            print(f"Chat session summary error: {e}")
+            with app.app_context():
+                db.session.rollback()
+        finally:
+            with _lock:
+                _folding.discard(session_id)
+
+    threading.Thread(target=run, name="chat-session-fold", daemon=True).start()
+
+
+def fold_session(session_id, summarize):
+    """Fold turns older than half the window into the session summary"""
+    row = db.session.get(ChatSession, session_id)
+    if row is None:
+        return False
+    # Keep half the window verbatim, so folds happen every few exchanges
+    upto = row.turn_count - CHAT_SESSION_WINDOW // 2
+    start = row.summarized_turns
+    if upto <= start:
+        return False
+
+    turns = (
+        ChatTurn.query.filter(
+            ChatTurn.session_id == session_id,
+            ChatTurn.position >= start,
+            ChatTurn.position < upto,
+        )
+        .order_by(ChatTurn.position)
+        .all()
+    )
+    lines = [
+        f"{ROLE_LABELS[turn.role]}: {_clip(turn.content, CHAT_SESSION_TURN_CHARS)}"
+        for turn in turns
+    ]
+    text = "\n".join(lines)
+    if row.summary:
+        text = f"Earlier summary: {row.summary}\n\n{text}"
+    summary = summarize(text, CHAT_SESSION_SUMMARY_CHARS)
+    if not summary:
+        raise ValueError("Summarizer returned an empty summary")
+    summary = _clip(summary, CHAT_SESSION_SUMMARY_CHARS)
+
+    # Only if no other fold moved the summary on in the meantime
+    updated = ChatSession.query.filter_by(id=session_id, summarized_turns=start).update(
+        {"summary": summary, "summarized_turns": upto}
+    )
+    db.session.commit()
+    if updated:
+        _count("folds")
+        _cache.delete(session_id)
+    return bool(updated)
+
+
+def delete_session(session_id):
+    """Delete a session and its turns; returns whether it existed"""
+    row = db.session.get(ChatSession, session_id)
+    _cache.delete(session_id)
+    if row is None:
+        return False
+    db.session.delete(row)
+    db.session.commit()
+    return True
+
+
+def purge_idle_sessions(max_idle_days=CHAT_SESSION_MAX_IDLE_DAYS):
+    """Delete sessions idle for more than `max_idle_days`; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(days=max_idle_days)
+    idle = db.session.query(ChatSession.id).filter(ChatSession.last_active < cutoff)
+    ChatTurn.query.filter(ChatTurn.session_id.in_(idle.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+    purged = ChatSession.query.filter(ChatSession.last_active < cutoff).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    _count("purged", purged)
+    return purged
+
+
+class SessionPurgeJob:
+    """Background job that deletes idle sessions off the request path"""
+
+    def __init__(self, app, interval=CHAT_SESSION_PURGE_INTERVAL):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                return purge_idle_sessions()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Chat session purge error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="chat-session-purge", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_session_purge_job(app):
+    """Start the idle-session purge job for this worker"""
+    global _purge_job
+    if _purge_job is None:
+        _purge_job = SessionPurgeJob(app)
+        _purge_job.start()
+    return _purge_job
+
+
+def get_stats():
+    with _lock:
+        return {**stats, "cached": len(_cache), "folding": len(_folding)}
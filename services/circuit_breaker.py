@@ -0,0 +1,157 @@
+"""
+Circuit breakers for upstream services (Gemini, GROQ, OpenWeather)
+
+After CIRCUIT_FAILURE_THRESHOLD consecutive failures a breaker opens and
+calls fail immediately with CircuitOpenError, so endpoints serve their
+fallbacks instead of waiting on a degraded upstream. After
+CIRCUIT_RECOVERY_SECONDS it lets a trial call through (half-open): success
+closes it, failure opens it again. Each setting can be overridden per
+upstream, e.g. CIRCUIT_GEMINI_RECOVERY_SECONDS.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+UPSTREAMS = ("gemini", "groq", "openweather")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+def _setting(upstream, name, default):
+    value = os.getenv(f"CIRCUIT_{upstream.upper()}_{name}") or os.getenv(
+        f"CIRCUIT_{name}", default
+    )
+    return float(value)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name,
+        failure_threshold=5,
+        recovery_seconds=30,
+        half_open_max_calls=1,
+        excluded=(ValueError,),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        # Errors that say nothing about the upstream's health (bad input,
+        # blocked content, missing keys)
+        self.excluded = excluded
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trials = 0
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    def _reject(self):
+        self.stats["rejected"] += 1
+        raise CircuitOpenError(f"{self.name} circuit open")
+
+    def _retry_in(self):
+        return self.opened_at + self.recovery_seconds - time.monotonic()
+
+    def raise_if_open(self):
+        """Fail fast while open, without taking a half-open trial slot"""
+        with self._lock:
+            if self.state == OPEN and self._retry_in() > 0:
+                self._reject()
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; pair with record_*/release"""
+        with self._lock:
+            if self.state == OPEN:
+                if self._retry_in() > 0:
+                    self._reject()
+                self.state, self._trials = HALF_OPEN, 0
+                print(f"Circuit {self.name}: half-open, sending a trial call")
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_max_calls:
+                    self._reject()
+                self._trials += 1
+            self.stats["calls"] += 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                print(f"Circuit {self.name}: closed")
+            self.state, self.failures, self._trials = CLOSED, 0, 0
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats["trips"] += 1
+                    print(f"Circuit {self.name}: open after {self.failures} failures")
+                self.state, self.opened_at, self._trials = OPEN, time.monotonic(), 0
+
+    def release(self):
+        """End a call that neither succeeded nor failed (e.g. an abandoned stream)"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    @contextmanager
+    def guard(self):
+        """Run the block as one call through the breaker"""
+        self.before_call()
+        try:
+            yield
+        except self.excluded:
+            self.release()
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            # Abandoned: a closed stream or a cancelled async call
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+    def is_open(self):
+        with self._lock:
+            return self.state == OPEN and self._retry_in() > 0
+
+    def get_state(self):
+        with self._lock:
+            retry_in = self._retry_in() if self.state == OPEN else None
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_seconds": (
+                    round(max(retry_in, 0), 1) if retry_in is not None else None
+                ),
+                **self.stats,
+            }
+
+
+breakers = {
+    name: CircuitBreaker(
+        name,
+        failure_threshold=int(_setting(name, "FAILURE_THRESHOLD", "5")),
+        recovery_seconds=_setting(name, "RECOVERY_SECONDS", "30"),
+        half_open_max_calls=int(_setting(name, "HALF_OPEN_MAX_CALLS", "1")),
+    )
+    for name in UPSTREAMS
+}
+
+
+def get_breaker(name):
+    return breakers[name]
+
+
+def get_states():
+    return {name: breaker.get_state() for name, breaker in breakers.items()}
@@ -0,0 +1,237 @@
+"""
+Process-wide Gemini model registry
+
+genai.configure() swaps a module-global API key and throws away the SDK's
+clients, so calling it per request both rebuilds a gRPC client every time and
+lets one request change the key under another in flight. The registry instead
+keeps one client manager per API key and one GenerativeModel per
+(api key, model, generation config, system instruction), each bound to its
+own key's client.
+Async calls use the same models with the key's grpc_asyncio client, bound
+on first use inside the serving event loop. The SDK itself is imported
+when the first model is built, so importing this module stays cheap.
+
+The SDK has no public way to bind a model to a key, so this relies on its
+internals (_ClientManager, GenerativeModel._client and _async_client):
+requirements.txt pins google-generativeai, and tests/test_gemini_registry.py
+fails if an upgrade moves them.
+"""
+
+import json
+import os
+import threading
+
+from services import circuit_breaker, prompts, singleflight
+
+GEMINI_MODEL = "gemini-2.5-flash"
+# Seconds before a Gemini call is abandoned, so a degraded API fails fast
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+
+# Keys used by the blueprints, built at startup by warm_up()
+GEMINI_KEY_NAMES = ("GEMINI_API_KEY_1", "GEMINI_API_KEY_2")
+
+
+class ModelRegistry:
+    """Thread-safe cache of GenerativeModel instances bound to per-key clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._managers = {}
+        self._models = {}
+        self.builds = 0
+
+    @staticmethod
+    def _config_key(generation_config):
+        if not generation_config:
+            return None
+        return json.dumps(generation_config, sort_keys=True)
+
+    def _client_for(self, api_key):
+        # Called with the lock held
+        manager = self._managers.get(api_key)
+        if manager is None:
+            from google.generativeai.client import _ClientManager
+
+            manager = _ClientManager()
+            manager.configure(api_key=api_key)
+            self._managers[api_key] = manager
+        return manager.get_default_client("generative")
+
+    def get(
+        self,
+        api_key,
+        model_name=GEMINI_MODEL,
+        generation_config=None,
+        system_instruction=None,
+    ):
+        """Get the shared model for this key, model name, config and system prompt
+
+        System instructions should come from a small fixed set (see
+        services/prompts.py): each one gets its own model.
+        """
+        key = (
+            api_key,
+            model_name,
+            self._config_key(generation_config),
+            system_instruction,
+        )
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                import google.generativeai as genai
+
+                model = genai.GenerativeModel(
+                    model_name,
+                    generation_config=generation_config,
+                    system_instruction=system_instruction,
+                )
+                # Bind to this key's client instead of the SDK's global default
+                model._client = self._client_for(api_key)
+                self._models[key] = model
+                self.builds += 1
+            return model
+
+    def get_async(
+        self,
+        api_key,
+        model_name=GEMINI_MODEL,
+        generation_config=None,
+        system_instruction=None,
+    ):
+        """The shared model, also bound to this key's async client
+
+        Call from the event loop that will await it: the async client's
+        channel belongs to the loop it was created on.
+        """
+        model = self.get(api_key, model_name, generation_config, system_instruction)
+        if model._async_client is None:
+            with self._lock:
+                if model._async_client is None:
+                    manager = self._managers[api_key]
+                    model._async_client = manager.get_default_client("generative_async")
+        return model
+
+    def clear(self):
+        """Drop every client and model (e.g. after forking a worker)"""
+        with self._lock:
+            self._managers.clear()
+            self._models.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "builds": self.builds,
+                "keys": len(self._managers),
+                "models": len(self._models),
+            }
+
+
+registry = ModelRegistry()
+# gRPC channels are not fork-safe: a forked worker builds its own clients
+os.register_at_fork(after_in_child=registry.clear)
+
+
+def get_model(
+    api_key, model_name=GEMINI_MODEL, generation_config=None, system_instruction=None
+):
+    """Get a cached GenerativeModel for an API key"""
+    return registry.get(api_key, model_name, generation_config, system_instruction)
+
+
+def get_async_model(
+    api_key, model_name=GEMINI_MODEL, generation_config=None, system_instruction=None
+):
+    """Get a cached GenerativeModel with its async client bound"""
+    return registry.get_async(
+        api_key, model_name, generation_config, system_instruction
+    )
+
+
+def warm_up():
+    """Build the default model for every configured Gemini key"""
+    warmed = 0
+    for key_name in GEMINI_KEY_NAMES:
+        api_key = os.getenv(key_name)
+        if not api_key:
+            continue
+        try:
+            get_model(api_key)
+            warmed += 1
+        except Exception as e:
+            print(f"Gemini warm-up failed for {key_name}: {e}")
+    return warmed
+
+
+def record_usage(system, response):
+    """Report a response's prompt and cached token counts to its prompt template"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        prompts.record_usage(
+            system,
+            getattr(usage, "prompt_token_count", 0),
+            getattr(usage, "cached_content_token_count", 0),
+        )
+
+
+def _generate_text(model, prompt, kwargs, pick_model=None, system=None):
+    if pick_model is not None:
+        # Inside the coalesced call, so shared requests reserve quota once
+        model = pick_model()
+    kwargs.setdefault("request_options", {"timeout": GEMINI_TIMEOUT})
+    with circuit_breaker.get_breaker("gemini").guard():
+        response = model.generate_content(prompt, **kwargs)
+        text = response.text
+    record_usage(system, response)
+    return text
+
+
+def generate_text(model, prompt, pick_model=None, system=None, **kwargs):
+    """Return model.generate_content(prompt).text
+
+    Concurrent calls with the same model settings and text prompt share one
+    upstream request. Multimodal prompts (e.g. images) are sent as they are.
+    Calls go through the "gemini" circuit breaker and give up after
+    GEMINI_TIMEOUT seconds. `pick_model`, if given, returns the model to
+    actually send the call with (e.g. the same model on a key that still has
+    rate budget). `system` is the model's system instruction, if any.
+    """
+    if not isinstance(prompt, str):
+        return _generate_text(model, prompt, kwargs, pick_model, system)
+
+    key = singleflight.make_key(
+        "gemini", model.model_name, model._generation_config, system, prompt, kwargs
+    )
+    return singleflight.coalesce(
+        key, lambda: _generate_text(model, prompt, kwargs, pick_model, system)
+    )
+
+
+async def _agenerate_text(model, prompt, kwargs, pick_model=None, system=None):
+    if pick_model is not None:
+        model = await pick_model()
+    kwargs.setdefault("request_options", {"timeout": GEMINI_TIMEOUT})
+    with circuit_breaker.get_breaker("gemini").guard():
+        response = await model.generate_content_async(prompt, **kwargs)
+        text = response.text
+    record_usage(system, response)
+    return text
+
+
+async def agenerate_text(model, prompt, pick_model=None, system=None, **kwargs):
+    """generate_text() for coroutines, through the model's async client
+
+    `pick_model` here is an async callable.
+    """
+    if not isinstance(prompt, str):
+        return await _agenerate_text(model, prompt, kwargs, pick_model, system)
+
+    key = singleflight.make_key(
+        "gemini", model.model_name, model._generation_config, system, prompt, kwargs
+    )
+    return await singleflight.acoalesce(
+        key, lambda: _agenerate_text(model, prompt, kwargs, pick_model, system)
+    )
@@ -0,0 +1,49 @@
+"""
+GROQ chat completions shared by concurrent identical requests
+"""
+
+from services import circuit_breaker, prompts, singleflight
+
+
+def record_usage(kwargs, response):
+    """Report a completion's prompt token counts to its prompt template"""
+    messages = kwargs.get("messages") or [{}]
+    usage = getattr(response, "usage", None)
+    if messages[0].get("role") != "system" or usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    prompts.record_usage(
+        messages[0].get("content"),
+        getattr(usage, "prompt_tokens", 0),
+        getattr(details, "cached_tokens", 0),
+    )
+
+
+def complete(client, **kwargs):
+    """Return the message content of client.chat.completions.create(**kwargs)
+
+    Concurrent calls with the same model, messages and sampling settings
+    share one upstream request, made through the "groq" circuit breaker.
+    """
+
+    def create():
+        with circuit_breaker.get_breaker("groq").guard():
+            response = client.chat.completions.create(**kwargs)
+        record_usage(kwargs, response)
+        return response.choices[0].message.content
+
+    key = singleflight.make_key("groq", kwargs)
+    return singleflight.coalesce(key, create)
+
+
+async def acomplete(client, **kwargs):
+    """complete() for coroutines, with an AsyncGroq client"""
+
+    async def create():
+        with circuit_breaker.get_breaker("groq").guard():
+            response = await client.chat.completions.create(**kwargs)
+        record_usage(kwargs, response)
+        return response.choices[0].message.content
+
+    key = singleflight.make_key("groq", kwargs)
+    return await singleflight.acoalesce(key, create)
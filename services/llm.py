@@ -0,0 +1,435 @@
+"""
+LLM providers: one interface over Gemini, GROQ and a local stub
+
+Blueprints ask for a provider (get_gemini / get_groq) and call generate() or
+stream() on it. With LLM_BACKEND=stub every provider is a StubProvider that
+answers locally with templated text after a simulated latency, and fails at
+a configurable rate, so throughput can be measured offline without
+spending API quota.
+"""
+
+import asyncio
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from services import circuit_breaker, gemini, groq_chat, rate_limiter, singleflight
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "live")  # live or stub
+GROQ_MODEL = "llama-3.1-8b-instant"
+# Seconds before a GROQ call is abandoned, so a degraded API fails fast
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "20"))
+# Larger GROQ model used as the alternative to Gemini for full answers
+GROQ_CHAT_MODEL = "llama-3.3-70b-versatile"
+
+# Stub latency is log-normal: median LLM_STUB_LATENCY_MS, spread set by SIGMA
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "800"))
+LLM_STUB_LATENCY_SIGMA = float(os.getenv("LLM_STUB_LATENCY_SIGMA", "0.5"))
+LLM_STUB_ERROR_RATE = float(os.getenv("LLM_STUB_ERROR_RATE", "0"))
+LLM_STUB_RESPONSE_WORDS = int(os.getenv("LLM_STUB_RESPONSE_WORDS", "120"))
+# Optional canned reply; "{prompt}" is replaced with the end of the prompt
+LLM_STUB_RESPONSE = os.getenv("LLM_STUB_RESPONSE")
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+
+class LLMProvider:
+    """Text generation backend
+
+    generate() returns the full reply; stream() yields it in pieces and stops
+    the upstream generation if the consumer closes it early. agenerate() is
+    generate() for coroutines; providers without an async client run
+    generate() in a worker thread.
+    """
+
+    name = "llm"
+    model_name = None
+    # Circuit breaker of the upstream this provider calls
+    breaker = None
+
+    def generate(self, prompt, system=None, max_tokens=None, temperature=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, system=None, max_tokens=None, temperature=None):
+        yield self.generate(prompt, system, max_tokens, temperature)
+
+    async def agenerate(self, prompt, system=None, max_tokens=None, temperature=None):
+        return await asyncio.to_thread(
+            self.generate, prompt, system, max_tokens, temperature
+        )
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini model from the shared registry; identical calls are coalesced
+
+    Calls are paced by the per-key rate limiter and move to the other Gemini
+    key while this provider's key is out of budget. A system prompt is sent
+    as the system instruction of a model built for it, not pasted in front
+    of every prompt.
+    """
+
+    name = "gemini"
+    breaker = "gemini"
+
+    def __init__(self, key_name, generation_config=None, model_name=None):
+        self.key_name = key_name
+        self.generation_config = generation_config
+        self.model_name = model_name or gemini.GEMINI_MODEL
+        self.model = self._model_for(key_name)
+
+    def _model_for(self, key_name, system=None):
+        return gemini.get_model(
+            os.getenv(key_name), self.model_name, self.generation_config, system
+        )
+
+    def _request(self, max_tokens, temperature):
+        overrides = {"max_output_tokens": max_tokens, "temperature": temperature}
+        overrides = {k: v for k, v in overrides.items() if v is not None}
+        return {"generation_config": overrides} if overrides else {}
+
+    def _budget(self, prompt, system, kwargs):
+        """Keys to try and estimated tokens of a call, for the rate limiter"""
+        max_tokens = kwargs.get("generation_config", {}).get("max_output_tokens")
+        if max_tokens is None:
+            max_tokens = (self.generation_config or {}).get("max_output_tokens")
+        parts = [prompt] if isinstance(prompt, str) else list(prompt)
+        if system:
+            parts.insert(0, system)
+        return gemini_keys(self.key_name), rate_limiter.estimate_tokens(
+            parts, max_tokens
+        )
+
+    def _reserve(self, prompt, system, kwargs):
+        """Model on a key with rate budget for this call (RateLimitExceeded if none)"""
+        key_name = rate_limiter.acquire(*self._budget(prompt, system, kwargs))
+        if key_name == self.key_name and not system:
+            return self.model
+        return self._model_for(key_name, system)
+
+    async def _areserve(self, prompt, system, kwargs):
+        key_name = await rate_limiter.acquire_async(
+            *self._budget(prompt, system, kwargs)
+        )
+        return gemini.get_async_model(
+            os.getenv(key_name), self.model_name, self.generation_config, system
+        )
+
+    def generate(self, prompt, system=None, max_tokens=None, temperature=None):
+        kwargs = self._request(max_tokens, temperature)
+        return gemini.generate_text(
+            self.model,
+            prompt,
+            pick_model=lambda: self._reserve(prompt, system, kwargs),
+            system=system,
+            **kwargs,
+        )
+
+    def stream(self, prompt, system=None, max_tokens=None, temperature=None):
+        # Imported here so non-web callers don't need Flask
+        from services.streaming import iter_text
+
+        kwargs = self._request(max_tokens, temperature)
+        model = self._reserve(prompt, system, kwargs)
+        with circuit_breaker.get_breaker(self.breaker).guard():
+            response = model.generate_content(
+                prompt,
+                stream=True,
+                request_options={"timeout": gemini.GEMINI_TIMEOUT},
+                **kwargs,
+            )
+            # Closing this generator closes iter_text, which cancels the stream
+            yield from iter_text(response)
+        gemini.record_usage(system, response)
+
+    async def agenerate(self, prompt, system=None, max_tokens=None, temperature=None):
+        kwargs = self._request(max_tokens, temperature)
+        return await gemini.agenerate_text(
+            self.model,
+            prompt,
+            pick_model=lambda: self._areserve(prompt, system, kwargs),
+            system=system,
+            **kwargs,
+        )
+
+
+class GroqProvider(LLMProvider):
+    """GROQ chat completion with an optional system message"""
+
+    name = "groq"
+    breaker = "groq"
+
+    def __init__(self, client, model_name=GROQ_MODEL):
+        self.client = client
+        self.model_name = model_name
+
+    def _request(self, prompt, system, max_tokens, temperature):
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        options = {"max_tokens": max_tokens, "temperature": temperature}
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            **{k: v for k, v in options.items() if v is not None},
+        }
+
+    def generate(self, prompt, system=None, max_tokens=None, temperature=None):
+        return groq_chat.complete(
+            self.client, **self._request(prompt, system, max_tokens, temperature)
+        )
+
+    async def agenerate(self, prompt, system=None, max_tokens=None, temperature=None):
+        return await groq_chat.acomplete(
+            _get_async_groq_client(),
+            **self._request(prompt, system, max_tokens, temperature),
+        )
+
+
+class StubProviderError(RuntimeError):
+    """Simulated upstream failure from the stub backend"""
+
+
+# Sentences the stub strings together into farming-flavoured replies
+STUB_SENTENCES = [
+    "Water the plants early in the morning to reduce evaporation.",
+    "Mulch around the base keeps the soil moist and suppresses weeds.",
+    "Check the underside of leaves for pests at least twice a week.",
+    "Apply well-rotted compost before the monsoon rains begin.",
+    "Test the soil pH and add lime if it falls below 5.5.",
+    "Ensure proper drainage so water does not stand around the roots.",
+    "Remove and destroy infected leaves to stop the disease spreading.",
+    "Neem oil spray is a safe first step against sucking pests.",
+    "Split the fertilizer dose and apply it in two or three rounds.",
+    "Harvest in dry weather and store the produce in a cool, airy place.",
+    "Intercropping with legumes improves soil nitrogen naturally.",
+    "Contact your local Krishi Bhavan for subsidised inputs and advice.",
+]
+
+
+class StubProvider(LLMProvider):
+    """Local stand-in for an LLM with configurable latency and error rate
+
+    The reply text depends only on the prompt, so repeated runs produce the
+    same responses; latencies and failures come from one seeded generator
+    shared by all stub providers.
+    """
+
+    _rng = random.Random(LLM_STUB_SEED)
+    _rng_lock = threading.Lock()
+    stats = {"calls": 0, "errors": 0}
+
+    def __init__(
+        self,
+        name,
+        model_name="stub",
+        latency_ms=LLM_STUB_LATENCY_MS,
+        latency_sigma=LLM_STUB_LATENCY_SIGMA,
+        error_rate=LLM_STUB_ERROR_RATE,
+        response_words=LLM_STUB_RESPONSE_WORDS,
+        response=LLM_STUB_RESPONSE,
+        breaker=None,
+        rate_keys=None,
+    ):
+        self.name = name
+        self.breaker = breaker
+        # Gemini keys whose rate limits this stub is paced by, if any
+        self.rate_keys = rate_keys
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.response_words = response_words
+        self.response = response
+
+    @classmethod
+    def reseed(cls, seed):
+        with cls._rng_lock:
+            cls._rng.seed(seed)
+
+    def _draw(self):
+        """Latency in seconds for the next call, and whether it fails"""
+        with self._rng_lock:
+            latency = self.latency_ms * math.exp(self._rng.gauss(0, self.latency_sigma))
+            failed = self._rng.random() < self.error_rate
+            self.stats["calls"] += 1
+            if failed:
+                self.stats["errors"] += 1
+        return latency / 1000, failed
+
+    def reply(self, prompt, max_tokens=None):
+        """Deterministic reply text for a prompt"""
+        if not isinstance(prompt, str):
+            # Multimodal prompts: only the text parts matter to the stub
+            prompt = " ".join(part for part in prompt if isinstance(part, str))
+        lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+        excerpt = lines[-1][-80:] if lines else ""
+        if self.response:
+            return self.response.replace("{prompt}", excerpt)
+
+        words = min(self.response_words, max_tokens or self.response_words)
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+        sentences = [f"({self.name}) Reply to: {excerpt}"]
+        count = len(sentences[0].split())
+        while count < words:
+            sentence = rng.choice(STUB_SENTENCES)
+            sentences.append(sentence)
+            count += len(sentence.split())
+        return " ".join(sentences)
+
+    def _reserve(self, prompt, max_tokens):
+        if self.rate_keys:
+            rate_limiter.acquire(
+                self.rate_keys, rate_limiter.estimate_tokens(prompt, max_tokens)
+            )
+
+    async def _areserve(self, prompt, max_tokens):
+        if self.rate_keys:
+            await rate_limiter.acquire_async(
+                self.rate_keys, rate_limiter.estimate_tokens(prompt, max_tokens)
+            )
+
+    @contextmanager
+    def _guard(self):
+        """The breaker of the upstream this stub stands in for, if any"""
+        if self.breaker is None:
+            yield
+        else:
+            with circuit_breaker.get_breaker(self.breaker).guard():
+                yield
+
+    def _generate(self, prompt, max_tokens):
+        self._reserve(prompt, max_tokens)
+        with self._guard():
+            latency, failed = self._draw()
+            time.sleep(latency)
+            if failed:
+                raise StubProviderError(f"Simulated {self.name} failure")
+        return self.reply(prompt, max_tokens)
+
+    def generate(self, prompt, system=None, max_tokens=None, temperature=None):
+        if not isinstance(prompt, str):
+            return self._generate(prompt, max_tokens)
+        # Coalesced like the real providers, so load tests see the same sharing
+        key = singleflight.make_key("stub", self.name, system, prompt, max_tokens)
+        return singleflight.coalesce(key, lambda: self._generate(prompt, max_tokens))
+
+    async def _agenerate(self, prompt, max_tokens):
+        await self._areserve(prompt, max_tokens)
+        with self._guard():
+            latency, failed = self._draw()
+            await asyncio.sleep(latency)
+            if failed:
+                raise StubProviderError(f"Simulated {self.name} failure")
+        return self.reply(prompt, max_tokens)
+
+    async def agenerate(self, prompt, system=None, max_tokens=None, temperature=None):
+        if not isinstance(prompt, str):
+            return await self._agenerate(prompt, max_tokens)
+        key = singleflight.make_key("stub", self.name, system, prompt, max_tokens)
+        return await singleflight.acoalesce(
+            key, lambda: self._agenerate(prompt, max_tokens)
+        )
+
+    def stream(self, prompt, system=None, max_tokens=None, temperature=None):
+        self._reserve(prompt, max_tokens)
+        with self._guard():
+            latency, failed = self._draw()
+            words = self.reply(prompt, max_tokens).split(" ")
+            chunks = [" ".join(words[i : i + 8]) for i in range(0, len(words), 8)]
+            # A third of the latency before the first chunk, the rest spread out
+            time.sleep(latency / 3)
+            if failed:
+                raise StubProviderError(f"Simulated {self.name} failure")
+            for index, chunk in enumerate(chunks):
+                if index:
+                    time.sleep(latency * 2 / 3 / len(chunks))
+                yield chunk if index == 0 else " " + chunk
+
+
+_groq_client = None
+_groq_lock = threading.Lock()
+
+
+def _get_groq_client():
+    global _groq_client
+    if _groq_client is None:
+        with _groq_lock:
+            if _groq_client is None:
+                from groq import Groq
+
+                api_key = os.getenv("GROQ_API_KEY")
+                if not api_key:
+                    raise ValueError("GROQ API key not configured")
+                _groq_client = Groq(api_key=api_key, timeout=GROQ_TIMEOUT)
+    return _groq_client
+
+
+_async_groq_client = None
+
+
+def _get_async_groq_client():
+    """AsyncGroq client; like the Gemini async clients, bound to one event loop"""
+    global _async_groq_client
+    if _async_groq_client is None:
+        with _groq_lock:
+            if _async_groq_client is None:
+                from groq import AsyncGroq
+
+                api_key = os.getenv("GROQ_API_KEY")
+                if not api_key:
+                    raise ValueError("GROQ API key not configured")
+                _async_groq_client = AsyncGroq(api_key=api_key, timeout=GROQ_TIMEOUT)
+    return _async_groq_client
+
+
+def _get_stub(name, backend, rate_keys=None):
+    """Stub provider; LLM_STUB_GEMINI_* / LLM_STUB_GROQ_* override the shared settings"""
+    prefix = f"LLM_STUB_{backend.upper()}_"
+    return StubProvider(
+        name,
+        latency_ms=float(os.getenv(prefix + "LATENCY_MS", LLM_STUB_LATENCY_MS)),
+        latency_sigma=float(
+            os.getenv(prefix + "LATENCY_SIGMA", LLM_STUB_LATENCY_SIGMA)
+        ),
+        error_rate=float(os.getenv(prefix + "ERROR_RATE", LLM_STUB_ERROR_RATE)),
+        breaker=backend,
+        rate_keys=rate_keys,
+    )
+
+
+def gemini_keys(key_name):
+    """`key_name` followed by the other configured Gemini keys it may spill onto"""
+    others = [
+        name
+        for name in gemini.GEMINI_KEY_NAMES
+        if name != key_name and (LLM_BACKEND == "stub" or os.getenv(name))
+    ]
+    return [key_name] + others
+
+
+def get_gemini(key_name, generation_config=None, model_name=None):
+    """Provider for the Gemini key in env var `key_name`"""
+    if LLM_BACKEND == "stub":
+        return _get_stub(f"gemini:{key_name}", "gemini", gemini_keys(key_name))
+    api_key = os.getenv(key_name)
+    if not api_key:
+        raise ValueError(f"Gemini API key {key_name} not configured")
+    return GeminiProvider(key_name, generation_config, model_name)
+
+
+def get_groq(model_name=GROQ_MODEL):
+    """Provider for a GROQ model"""
+    if LLM_BACKEND == "stub":
+        return _get_stub(f"groq:{model_name}", "groq")
+    return GroqProvider(_get_groq_client(), model_name)
+
+
+def model_label(model_name):
+    """Model name for cache keys, so stub replies never mix with real ones"""
+    return "stub" if LLM_BACKEND == "stub" else model_name
+
+
+def get_stats():
+    return {"backend": LLM_BACKEND, "stub": dict(StubProvider.stats)}
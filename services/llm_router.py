@@ -0,0 +1,426 @@
+"""
+Latency-aware routing between LLM providers, with hedged requests
+
+Callers pass a task class (summarize, classify, generate, translate) and
+their candidate providers in order of preference. The router keeps rolling
+latency percentiles and error rates per provider, model and task class (a
+150-token summary and a 1500-token answer take very different times), tries the
+fastest healthy candidate first and fails over to the next on errors. For
+hedged task classes, if the first call is still running after that
+provider's observed p95, a second request goes to the next candidate and
+whichever answers first wins; the loser's stream is closed (which cancels
+a Gemini generation) and a losing non-streaming call is abandoned.
+Providers whose circuit breaker is open are tried last. agenerate() does the
+same for coroutines, cancelling the losing call outright.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from services import circuit_breaker
+from services.circuit_breaker import CircuitOpenError
+from services.rate_limiter import RateLimitExceeded
+
+LLM_ROUTING = os.getenv("LLM_ROUTING", "true").lower() == "true"
+# Task classes that send a hedged second request, e.g. "generate"; off by
+# default, since a hedge can double a request's LLM spend and rate budget.
+# A losing stream or coroutine is cancelled, but a losing blocking call
+# cannot be interrupted: it runs to completion in its thread and is billed
+# and counted against the rate limits in full.
+LLM_HEDGE_TASKS = {
+    task.strip() for task in os.getenv("LLM_HEDGE_TASKS", "").split(",") if task.strip()
+}
+LLM_HEDGE_MIN_MS = float(os.getenv("LLM_HEDGE_MIN_MS", "500"))
+# Samples older than the window are forgotten, so a provider that had a bad
+# spell is retried once its errors age out
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "200"))
+LLM_ROUTER_WINDOW_SECONDS = float(os.getenv("LLM_ROUTER_WINDOW_SECONDS", "300"))
+LLM_ROUTER_MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "10"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_MAX_WORKERS = int(os.getenv("LLM_ROUTER_MAX_WORKERS", "64"))
+
+
+class LatencyTracker:
+    """Rolling latencies and outcomes of recent calls to one provider"""
+
+    def __init__(self, size=LLM_ROUTER_WINDOW, max_age=LLM_ROUTER_WINDOW_SECONDS):
+        self.max_age = max_age
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self._samples.append((time.time(), seconds, ok))
+
+    def snapshot(self):
+        """(sorted successful latencies, number of samples, error rate)"""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            samples = list(self._samples)
+        if not samples:
+            return [], 0, 0.0
+        latencies = sorted(seconds for _, seconds, ok in samples if ok)
+        errors = len(samples) - len(latencies)
+        return latencies, len(samples), errors / len(samples)
+
+
+def _percentile(latencies, fraction):
+    if not latencies:
+        return None
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+def provider_key(provider):
+    return f"{provider.name}:{provider.model_name}"
+
+
+# Backend ("GEMINI", "GROQ") of the last reply the router returned in this context
+_answered_by = contextvars.ContextVar("llm_answered_by", default=None)
+
+
+def answered_by():
+    """Backend that produced the last reply returned in this thread or task
+
+    Read it right after the call: a thread serves many requests in turn.
+    """
+    return _answered_by.get()
+
+
+def _answered(provider, result):
+    _answered_by.set(provider.name.split(":")[0].upper())
+    return result
+
+
+class LLMRouter:
+    def __init__(self):
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self.stats = {"calls": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0}
+
+    def _tracker(self, provider, task, metric):
+        key = (provider_key(provider), task, metric)
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker()
+            return tracker
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=LLM_ROUTER_MAX_WORKERS,
+                    thread_name_prefix="llm-hedge",
+                )
+            return self._pool
+
+    def rank(self, providers, task, metric):
+        """Healthy providers by p50, then those without enough data, then unhealthy"""
+        if not LLM_ROUTING:
+            return list(providers)
+
+        def sort_key(item):
+            index, provider = item
+            latencies, samples, error_rate = self._tracker(
+                provider, task, metric
+            ).snapshot()
+            known = samples >= LLM_ROUTER_MIN_SAMPLES
+            unhealthy = known and error_rate > LLM_ROUTER_MAX_ERROR_RATE
+            if (
+                provider.breaker
+                and circuit_breaker.get_breaker(provider.breaker).is_open()
+            ):
+                unhealthy = True
+            p50 = _percentile(latencies, 0.5) if known else None
+            return (unhealthy, p50 is None, p50 or 0, index)
+
+        return [provider for _, provider in sorted(enumerate(providers), key=sort_key)]
+
+    def hedge_delay(self, provider, task, metric):
+        """Seconds to wait before hedging: the provider's p95, or None without data"""
+        latencies, samples, _ = self._tracker(provider, task, metric).snapshot()
+        if samples < LLM_ROUTER_MIN_SAMPLES or not latencies:
+            return None
+        return max(_percentile(latencies, 0.95), LLM_HEDGE_MIN_MS / 1000)
+
+    def _timed(self, provider, task, metric, call):
+        started = time.perf_counter()
+        try:
+            result = call(provider)
+        except (CircuitOpenError, RateLimitExceeded):
+            # Rejected without reaching the upstream, so nothing to measure
+            raise
+        except Exception:
+            self._tracker(provider, task, metric).record(
+                time.perf_counter() - started, False
+            )
+            raise
+        self._tracker(provider, task, metric).record(
+            time.perf_counter() - started, True
+        )
+        return result
+
+    def _submit(self, *args):
+        # Hedged calls keep the caller's context, e.g. its rate-limit priority
+        return self._executor().submit(contextvars.copy_context().run, *args)
+
+    def _run(self, task, providers, metric, call, discard=None):
+        """Return call(provider) from the first provider that succeeds
+
+        `discard` releases the result of a hedged call that lost the race.
+        """
+        self._count("calls")
+        queue = self.rank(providers, task, metric)
+        if not queue:
+            raise ValueError("No LLM provider configured")
+        last_error = None
+
+        if task not in LLM_HEDGE_TASKS or len(queue) < 2:
+            for attempt, provider in enumerate(queue):
+                if attempt:
+                    self._count("failovers")
+                try:
+                    return _answered(
+                        provider, self._timed(provider, task, metric, call)
+                    )
+                except Exception as e:
+                    print(f"LLM router: {provider_key(provider)} failed: {e}")
+                    last_error = e
+            raise last_error
+
+        pending = {}
+        hedged = False
+        while queue or pending:
+            if not pending:
+                if last_error is not None:
+                    self._count("failovers")
+                provider = queue.pop(0)
+                future = self._submit(self._timed, provider, task, metric, call)
+                pending[future] = (provider, False)
+
+            delay = None
+            if queue and not hedged:
+                newest = list(pending.values())[-1][0]
+                delay = self.hedge_delay(newest, task, metric)
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # The call is slower than its usual p95: race a second provider
+                hedged = True
+                self._count("hedges")
+                provider = queue.pop(0)
+                future = self._submit(self._timed, provider, task, metric, call)
+                pending[future] = (provider, True)
+                continue
+
+            for future in done:
+                provider, is_hedge = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"LLM router: {provider_key(provider)} failed: {e}")
+                    last_error = e
+                    continue
+                if is_hedge:
+                    self._count("hedge_wins")
+                # Blocking losers can't be stopped; they finish in the background
+                for loser in pending:
+                    if discard is not None:
+                        loser.add_done_callback(
+                            lambda f: f.exception() is None and discard(f.result())
+                        )
+                return _answered(provider, result)
+        raise last_error
+
+    async def _atimed(self, provider, task, metric, call):
+        started = time.perf_counter()
+        try:
+            result = await call(provider)
+        except (CircuitOpenError, RateLimitExceeded):
+            raise
+        except Exception:
+            self._tracker(provider, task, metric).record(
+                time.perf_counter() - started, False
+            )
+            raise
+        self._tracker(provider, task, metric).record(
+            time.perf_counter() - started, True
+        )
+        return result
+
+    async def _arun(self, task, providers, metric, call):
+        """_run() for coroutines; hedged calls that lose are cancelled"""
+        self._count("calls")
+        queue = self.rank(providers, task, metric)
+        if not queue:
+            raise ValueError("No LLM provider configured")
+        last_error = None
+
+        if task not in LLM_HEDGE_TASKS or len(queue) < 2:
+            for attempt, provider in enumerate(queue):
+                if attempt:
+                    self._count("failovers")
+                try:
+                    return _answered(
+                        provider, await self._atimed(provider, task, metric, call)
+                    )
+                except Exception as e:
+                    print(f"LLM router: {provider_key(provider)} failed: {e}")
+                    last_error = e
+            raise last_error
+
+        pending = {}
+        hedged = False
+        try:
+            while queue or pending:
+                if not pending:
+                    if last_error is not None:
+                        self._count("failovers")
+                    provider = queue.pop(0)
+                    future = asyncio.ensure_future(
+                        self._atimed(provider, task, metric, call)
+                    )
+                    pending[future] = (provider, False)
+
+                delay = None
+                if queue and not hedged:
+                    newest = list(pending.values())[-1][0]
+                    delay = self.hedge_delay(newest, task, metric)
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedged = True
+                    self._count("hedges")
+                    provider = queue.pop(0)
+                    future = asyncio.ensure_future(
+                        self._atimed(provider, task, metric, call)
+                    )
+                    pending[future] = (provider, True)
+                    continue
+
+                for future in done:
+                    provider, is_hedge = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"LLM router: {provider_key(provider)} failed: {e}")
+                        last_error = e
+                        continue
+                    if is_hedge:
+                        self._count("hedge_wins")
+                    return _answered(provider, result)
+            raise last_error
+        finally:
+            for loser in pending:
+                loser.cancel()
+
+    def generate(self, task, providers, prompt, **options):
+        """Full reply text from the best available provider"""
+        return self._run(
+            task,
+            providers,
+            "reply",
+            lambda provider: provider.generate(prompt, **options),
+        )
+
+    async def agenerate(self, task, providers, prompt, **options):
+        """generate() for coroutines"""
+        return await self._arun(
+            task,
+            providers,
+            "reply",
+            lambda provider: provider.agenerate(prompt, **options),
+        )
+
+    def stream(self, task, providers, prompt, **options):
+        """Stream text from the provider that produces the first chunk soonest
+
+        Hedging and failover apply until the first chunk arrives; after that
+        the winning stream is followed to the end.
+        """
+
+        def first_chunk(provider):
+            chunks = provider.stream(prompt, **options)
+            try:
+                return chunks, next(chunks)
+            except StopIteration:
+                return chunks, None
+            except Exception:
+                chunks.close()
+                raise
+
+        chunks, first = self._run(
+            task,
+            providers,
+            "first_chunk",
+            first_chunk,
+            discard=lambda result: result[0].close(),
+        )
+        try:
+            if first is not None:
+                yield first
+            yield from chunks
+        finally:
+            chunks.close()
+
+    def get_stats(self):
+        with self._lock:
+            trackers = dict(self._trackers)
+            stats = dict(self.stats)
+        providers = {}
+        for (key, task, metric), tracker in sorted(trackers.items()):
+            latencies, samples, error_rate = tracker.snapshot()
+            p50, p95 = _percentile(latencies, 0.5), _percentile(latencies, 0.95)
+            providers.setdefault(key, {}).setdefault(task, {})[metric] = {
+                "samples": samples,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "error_rate": round(error_rate, 3),
+            }
+        return {**stats, "providers": providers}
+
+
+router = LLMRouter()
+
+
+def resolve(factories):
+    """Build the configured providers, skipping ones whose keys are missing"""
+    providers, missing = [], None
+    for factory in factories:
+        try:
+            providers.append(factory())
+        except ValueError as e:
+            missing = e
+    if not providers and missing is not None:
+        raise missing
+    return providers
+
+
+def generate(task, factories, prompt, **options):
+    return router.generate(task, resolve(factories), prompt, **options)
+
+
+async def agenerate(task, factories, prompt, **options):
+    return await router.agenerate(task, resolve(factories), prompt, **options)
+
+
+def stream(task, factories, prompt, **options):
+    return router.stream(task, resolve(factories), prompt, **options)
+
+
+def get_stats():
+    return router.get_stats()
@@ -0,0 +1,360 @@
+"""
+Market prices: file/feed loader, columnar price history with trends, and optional AI summary
+"""
+
+import csv
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from flask import current_app, has_app_context
+
+from models import MarketPrice, db
+from services import llm, llm_router, rate_limiter
+from services.cache import MemoryBackend, SWRCache
+
+SAMPLE_PRICES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "market_prices_sample.csv",
+)
+
+# Served until any prices have been loaded
+DEFAULT_PRICES = [
+    {"name": "Rice", "price": 45, "change": 2.5},
+    {"name": "Coconut", "price": 35, "change": -1.2},
+    {"name": "Rubber", "price": 180, "change": 3.8},
+    {"name": "Black Pepper", "price": 650, "change": 5.2},
+    {"name": "Cardamom", "price": 1200, "change": -2.1},
+    {"name": "Banana", "price": 30, "change": 1.5},
+]
+
+SNAPSHOT_TTL = int(os.getenv("MARKET_PRICE_SNAPSHOT_TTL", "300"))
+# Must cover the 30-day statistics plus a day of margin
+SNAPSHOT_WINDOW_DAYS = max(int(os.getenv("MARKET_PRICE_WINDOW_DAYS", "45")), 31)
+SUMMARY_INTERVAL = int(os.getenv("MARKET_SUMMARY_INTERVAL", "3600"))
+
+# Computed trends kept in memory; rebuilt in the background once stale
+snapshot_cache = SWRCache(
+    "market-prices", MemoryBackend(max_entries=4), ttl=SNAPSHOT_TTL, stale_ttl=3600
+)
+
+_summary = {"text": None, "generated_at": None}
+_summary_job = None
+
+
+def _read_rows(path):
+    """Read price rows from a CSV (with a header row) or a JSON array file"""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            return json.load(f)
+        return list(csv.DictReader(f))
+
+
+def load_prices(rows, source="file"):
+    """Upsert price rows keyed by (commodity, market, date); returns rows written
+
+    Each row needs commodity, market, date (YYYY-MM-DD) and price; unit is
+    optional and defaults to kg.
+    """
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append(
+                {
+                    "commodity": row["commodity"].strip(),
+                    "market": row["market"].strip(),
+                    "date": date.fromisoformat(str(row["date"]).strip()),
+                    "price": float(row["price"]),
+                    "unit": (row.get("unit") or "kg").strip(),
+                }
+            )
+        except (KeyError, ValueError, AttributeError) as e:
+            print(f"Skipping invalid price row {row}: {e}")
+
+    if not parsed:
+        return 0
+
+    # Fetch existing rows for the date range once instead of per row
+    existing = {
+        (price.commodity, price.market, price.date): price
+        for price in MarketPrice.query.filter(
+            MarketPrice.date >= min(row["date"] for row in parsed),
+            MarketPrice.date <= max(row["date"] for row in parsed),
+        )
+    }
+
+    for row in parsed:
+        price = existing.get((row["commodity"], row["market"], row["date"]))
+        if price is None:
+            price = MarketPrice(**row, source=source)
+            db.session.add(price)
+            existing[(row["commodity"], row["market"], row["date"])] = price
+        else:
+            price.price = row["price"]
+            price.unit = row["unit"]
+            price.source = source
+
+    db.session.commit()
+    snapshot_cache.invalidate("snapshot")
+    return len(parsed)
+
+
+def load_prices_from_file(path, source=None):
+    """Load a CSV or JSON price file into market_prices"""
+    return load_prices(_read_rows(path), source=source or os.path.basename(path))
+
+
+def load_prices_from_feed(url, timeout=30):
+    """Load a JSON array of price rows from an HTTP feed into market_prices"""
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return load_prices(response.json(), source=url[:50])
+
+
+class PriceHistoryView:
+    """Columnar view of daily prices: one float64 row per commodity
+
+    `prices[i]` is the price series of `commodities[i]` over the shared daily
+    `dates` axis (mean across markets), forward-filled over missing days and
+    NaN before a commodity's first observation.
+    """
+
+    def __init__(self, commodities, units, dates, prices):
+        self.commodities = commodities
+        self.units = units
+        self.dates = dates
+        self.prices = prices
+        self._index = {name: i for i, name in enumerate(commodities)}
+
+    def __len__(self):
+        return len(self.commodities)
+
+    def series(self, commodity):
+        """(dates, prices) arrays for one commodity"""
+        return self.dates, self.prices[self._index[commodity]]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build the view from (commodity, date, price, unit) rows"""
+        commodities = sorted({row[0] for row in rows})
+        if not commodities:
+            return cls([], [], np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+
+        days = np.array([row[1] for row in rows], dtype="datetime64[D]")
+        start = days.min()
+        dates = np.arange(start, days.max() + 1)
+        index = {name: i for i, name in enumerate(commodities)}
+
+        prices = np.full((len(commodities), len(dates)), np.nan)
+        rows_idx = np.array([index[row[0]] for row in rows])
+        cols_idx = (days - start).astype(int)
+        prices[rows_idx, cols_idx] = [row[2] for row in rows]
+
+        units = {}
+        for row in rows:
+            units[row[0]] = row[3]
+
+        return cls(
+            commodities,
+            [units[name] for name in commodities],
+            dates,
+            _forward_fill(prices),
+        )
+
+
+def _forward_fill(prices):
+    """Carry each row's last observed price across missing days"""
+    positions = np.where(~np.isnan(prices), np.arange(prices.shape[1]), -1)
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    filled = prices[np.arange(prices.shape[0])[:, None], np.maximum(positions, 0)]
+    # Days before the first observation stay NaN
+    filled[positions < 0] = np.nan
+    return filled
+
+
+def build_price_view():
+    """Load the recent price window from market_prices into a PriceHistoryView"""
+    latest_date = db.session.query(db.func.max(MarketPrice.date)).scalar()
+    if latest_date is None:
+        return PriceHistoryView.from_rows([])
+
+    rows = (
+        db.session.query(
+            MarketPrice.commodity,
+            MarketPrice.date,
+            db.func.avg(MarketPrice.price),
+            db.func.max(MarketPrice.unit),
+        )
+        .filter(MarketPrice.date >= latest_date - timedelta(days=SNAPSHOT_WINDOW_DAYS))
+        .group_by(MarketPrice.commodity, MarketPrice.date)
+        .all()
+    )
+    return PriceHistoryView.from_rows(rows)
+
+
+def _percent_change(prices, days):
+    """Percent change of every row's last price versus `days` days earlier"""
+    if prices.shape[1] <= days:
+        return np.full(prices.shape[0], np.nan)
+    previous = prices[:, -1 - days]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (prices[:, -1] - previous) / previous * 100
+
+
+def _trailing_mean(prices, days):
+    window = prices[:, -days:]
+    # Rows without a full window of history have no moving average
+    complete = ~np.isnan(window).any(axis=1) & (prices.shape[1] >= days)
+    return np.where(complete, window.mean(axis=1) if window.size else np.nan, np.nan)
+
+
+def _volatility(prices, days):
+    """Standard deviation of daily percent returns over the trailing window"""
+    window = prices[:, -(days + 1) :]
+    if window.shape[1] < 3:
+        return np.full(prices.shape[0], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(window, axis=1) / window[:, :-1] * 100
+    valid = (~np.isnan(returns)).sum(axis=1) >= 2
+    with np.errstate(invalid="ignore"):
+        std = np.nanstd(np.where(valid[:, None], returns, 0.0), axis=1, ddof=1)
+    return np.where(valid, std, np.nan)
+
+
+def _round(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def compute_trends(view):
+    """Day-over-day, 7- and 30-day change, moving averages and volatility per commodity
+
+    Every statistic is computed for all commodities at once over the view's
+    price matrix. `change` is the 7-day change (0.0 without a week of history).
+    """
+    if not len(view):
+        return None
+
+    prices = view.prices
+    latest = prices[:, -1]
+    change_1d = _percent_change(prices, 1)
+    change_7d = _percent_change(prices, 7)
+    change_30d = _percent_change(prices, 30)
+    ma_7 = _trailing_mean(prices, 7)
+    ma_30 = _trailing_mean(prices, 30)
+    volatility = _volatility(prices, 30)
+    as_of = str(view.dates[-1])
+
+    trends = []
+    for i, commodity in enumerate(view.commodities):
+        if np.isnan(latest[i]):
+            continue
+        trends.append(
+            {
+                "name": commodity,
+                "price": _round(latest[i], 2),
+                "change": _round(change_7d[i], 1) or 0.0,
+                "unit": view.units[i],
+                "date": as_of,
+                "change_1d": _round(change_1d[i], 1),
+                "change_7d": _round(change_7d[i], 1),
+                "change_30d": _round(change_30d[i], 1),
+                "ma_7": _round(ma_7[i], 2),
+                "ma_30": _round(ma_30[i], 2),
+                "volatility_30d": _round(volatility[i], 2),
+            }
+        )
+    return trends or None
+
+
+def build_snapshot():
+    """Current price and trend statistics per commodity, or None without data"""
+    return compute_trends(build_price_view())
+
+
+def _load_snapshot(app):
+    if app is None:
+        return build_snapshot()
+    # Background refreshes run outside the request, so push the app context here
+    with app.app_context():
+        return build_snapshot()
+
+
+def get_price_snapshot():
+    """Get the cached price snapshot, or the default prices if none are loaded"""
+    app = current_app._get_current_object() if has_app_context() else None
+    try:
+        snapshot = snapshot_cache.get_or_load("snapshot", lambda: _load_snapshot(app))
+    except Exception as e:
+        print(f"Market price snapshot error: {e}")
+        snapshot = None
+    return snapshot or DEFAULT_PRICES
+
+
+def generate_market_summary(snapshot):
+    """Summarize the price snapshot for farmers using GROQ (or Gemini if faster)"""
+    reply = llm_router.generate(
+        "summarize",
+        [llm.get_groq, lambda: llm.get_gemini("GEMINI_API_KEY_2")],
+        json.dumps(snapshot),
+        system="You are a market price advisor for Kerala farmers. Summarize price movements in 2-3 short, practical sentences.",
+        max_tokens=150,
+        temperature=0.3,
+    )
+    return reply.strip()
+
+
+def get_market_summary():
+    """Latest AI market summary, or None if the summary job has not produced one"""
+    if not _summary["text"]:
+        return None
+    return dict(_summary)
+
+
+class MarketSummaryJob:
+    """Background job that refreshes the AI market summary off the request path"""
+
+    def __init__(self, app, interval=SUMMARY_INTERVAL):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        with self.app.app_context():
+            snapshot = get_price_snapshot()
+        with rate_limiter.priority(rate_limiter.BACKGROUND):
+            _summary["text"] = generate_market_summary(snapshot)
+        _summary["generated_at"] = datetime.now().isoformat()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Market summary job error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="market-summary", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_market_summary_job(app):
+    """Start the background market summary job for this worker"""
+    global _summary_job
+    if _summary_job is None:
+        _summary_job = MarketSummaryJob(app)
+        _summary_job.start()
+    return _summary_job
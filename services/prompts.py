@@ -0,0 +1,131 @@
+"""
+Prompt template registry
+
+Each template pairs a static system prompt with a short format string for
+the per-request part (weather context, the user's message, ...). Templates
+are registered once at import, so a request only formats its small dynamic
+part and hands the system prompt to the provider unchanged: Gemini gets it
+as a system instruction on a model built once per prompt, GROQ as the
+system message. With the static prefix always first and byte-identical,
+Gemini's implicit prompt caching can bill it as cached input; the token
+counts providers report per call are collected here, per template.
+
+Implicit caching only applies to requests of at least
+GEMINI_IMPLICIT_CACHE_MIN_TOKENS. The system prompts here are about 400
+tokens at most, so none of them reaches it: today no call is billed at the
+cached rate, and the registry saves only the per-request prompt building.
+A template counts as cache-eligible in get_stats() once its static part
+alone is past the minimum.
+"""
+
+import os
+import string
+import threading
+
+# Smallest request Gemini's implicit caching applies to (1024 tokens for
+# gemini-2.5-flash)
+GEMINI_IMPLICIT_CACHE_MIN_TOKENS = int(
+    os.getenv("GEMINI_IMPLICIT_CACHE_MIN_TOKENS", "1024")
+)
+
+_templates = {}
+_by_system = {}
+_lock = threading.Lock()
+
+
+def estimate_text_tokens(text):
+    # Same rule of thumb as the rate limiter: about 4 characters per token
+    return len(text) // 4
+
+
+class PromptTemplate:
+    """A static system prompt and the format string of the per-request prompt"""
+
+    def __init__(self, name, system, user="{message}"):
+        self.name = name
+        self.system = system
+        self.user = user
+        # Parsed once, so a template with a typo fails at import, not per request
+        self.fields = {
+            field for _, field, _, _ in string.Formatter().parse(user) if field
+        }
+        self.static_tokens = estimate_text_tokens(system)
+        self.stats = {
+            "rendered": 0,
+            "measured_calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+        }
+
+    def render(self, **fields):
+        """(system prompt, user prompt) for one request"""
+        missing = self.fields - fields.keys()
+        if missing:
+            raise KeyError(f"Prompt {self.name} needs {', '.join(sorted(missing))}")
+        with _lock:
+            self.stats["rendered"] += 1
+        return self.system, self.user.format(**fields)
+
+    def cache_eligible(self):
+        """Whether the static prefix is long enough for implicit caching"""
+        return self.static_tokens >= GEMINI_IMPLICIT_CACHE_MIN_TOKENS
+
+    def record_usage(self, prompt_tokens, cached_tokens):
+        with _lock:
+            self.stats["measured_calls"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["cached_tokens"] += cached_tokens
+
+    def get_stats(self):
+        with _lock:
+            stats = dict(self.stats)
+        calls = stats["measured_calls"]
+        return {
+            "static_tokens_estimate": self.static_tokens,
+            "implicit_cache_eligible": self.cache_eligible(),
+            **stats,
+            # Input tokens per call billed as cached, as reported by the provider
+            "cached_tokens_per_call": (
+                round(stats["cached_tokens"] / calls, 1) if calls else None
+            ),
+            "cached_ratio": (
+                round(stats["cached_tokens"] / stats["prompt_tokens"], 3)
+                if stats["prompt_tokens"]
+                else None
+            ),
+        }
+
+
+def register(name, system, user="{message}"):
+    """Add a template; returns it"""
+    template = PromptTemplate(name, system, user)
+    with _lock:
+        if name in _templates:
+            raise ValueError(f"Prompt {name} is already registered")
+        _templates[name] = template
+        _by_system[system] = template
+    return template
+
+
+def get(name):
+    return _templates[name]
+
+
+def templates():
+    return list(_templates.values())
+
+
+def for_system(system):
+    """The template whose system prompt this is, or None"""
+    return _by_system.get(system) if system else None
+
+
+def record_usage(system, prompt_tokens, cached_tokens=0):
+    """Count a provider-reported call under the template of its system prompt"""
+    template = for_system(system)
+    if template is not None and prompt_tokens:
+        template.record_usage(prompt_tokens, cached_tokens or 0)
+
+
+def get_stats():
+    return {name: template.get_stats() for name, template in _templates.items()}
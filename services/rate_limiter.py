@@ -0,0 +1,267 @@
+"""
+Client-side rate limits for the Gemini API keys
+
+Each key gets two token buckets, one for requests per minute (GEMINI_RPM)
+and one for tokens per minute (GEMINI_TPM), so calls are paced to the
+key's quota instead of bouncing off 429s. A call asks for a list of keys in
+order of preference and takes budget from the first that has it, which
+spills traffic onto the other key when one is exhausted. When none has
+budget the call queues by priority: interactive requests are always served
+before background jobs (cache refreshes, the market summary), and give up
+after GEMINI_RATE_MAX_WAIT seconds with RateLimitExceeded so the router can
+fall back to GROQ. Limits can be set per key, e.g. GEMINI_API_KEY_2_RPM;
+0 disables a limit.
+
+Both limits are off by default: a quota that is too low for the key sends
+chat traffic to GROQ, changing which model answers. Deployments opt in
+with their key's quota (the free tier of gemini-2.5-flash is GEMINI_RPM=10,
+GEMINI_TPM=250000).
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-key quota; 0 (the default) is unlimited
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "0"))
+# Longest an interactive / background call waits for budget
+GEMINI_RATE_MAX_WAIT = float(os.getenv("GEMINI_RATE_MAX_WAIT", "2"))
+GEMINI_RATE_BACKGROUND_MAX_WAIT = float(
+    os.getenv("GEMINI_RATE_BACKGROUND_MAX_WAIT", "60")
+)
+# Reply length assumed when a call does not set max_output_tokens
+GEMINI_RATE_OUTPUT_TOKENS = int(os.getenv("GEMINI_RATE_OUTPUT_TOKENS", "512"))
+# Tokens Gemini bills for an image part
+IMAGE_TOKENS = 258
+
+# Lower values are served first
+INTERACTIVE, BACKGROUND = 0, 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class RateLimitExceeded(RuntimeError):
+    """No Gemini key had budget for the call within the allowed wait"""
+
+
+@contextmanager
+def priority(level):
+    """Run the block's LLM calls at this priority"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def estimate_tokens(prompt, max_output_tokens=None):
+    """Rough token count of a call: about 4 characters per token plus the reply"""
+    if isinstance(prompt, str):
+        parts = [prompt]
+    else:
+        parts = list(prompt)
+    text = sum(len(part) for part in parts if isinstance(part, str))
+    images = sum(1 for part in parts if not isinstance(part, str))
+    return (
+        text // 4
+        + images * IMAGE_TOKENS
+        + (max_output_tokens or GEMINI_RATE_OUTPUT_TOKENS)
+    )
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute, holding at most a minute's worth
+
+    Not thread-safe; the scheduler calls it with its lock held.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` units are available (0 when unlimited)"""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        # A call larger than the bucket only has to wait for a full one
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def available(self):
+        """Units available now, or None when unlimited"""
+        if not self.capacity:
+            return None
+        self._refill()
+        return self.level
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+
+class KeyBudget:
+    """Request and token buckets of one API key"""
+
+    def __init__(self, name, rpm=GEMINI_RPM, tpm=GEMINI_TPM):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.stats = {"granted": 0, "tokens": 0, "spilled_in": 0}
+
+    def wait_time(self, tokens):
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def take(self, tokens):
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.stats["granted"] += 1
+        self.stats["tokens"] += tokens
+
+    def get_state(self):
+        requests, tokens = self.requests.available(), self.tokens.available()
+        return {
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+            "requests_available": round(requests, 2) if requests is not None else None,
+            "tokens_available": round(tokens) if tokens is not None else None,
+            **self.stats,
+        }
+
+
+class RateScheduler:
+    """Hands out per-key budget to queued calls in priority order"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._budgets = {}
+        self._queue = []
+        self._tickets = itertools.count()
+        self.stats = {"granted": 0, "spilled": 0, "waited": 0, "rejected": 0}
+
+    def _budget(self, name):
+        # Called with the lock held
+        budget = self._budgets.get(name)
+        if budget is None:
+            budget = self._budgets[name] = KeyBudget(
+                name,
+                rpm=float(os.getenv(f"{name}_RPM", GEMINI_RPM)),
+                tpm=float(os.getenv(f"{name}_TPM", GEMINI_TPM)),
+            )
+        return budget
+
+    def acquire(self, key_names, tokens, level=None, max_wait=None):
+        """Reserve one request and `tokens` tokens; returns the key that had budget
+
+        Keys are tried in order, so the first is used while it has budget and
+        the rest take the overflow. Raises RateLimitExceeded if no key frees
+        up within `max_wait` seconds.
+        """
+        level = current_priority() if level is None else level
+        if max_wait is None:
+            max_wait = (
+                GEMINI_RATE_BACKGROUND_MAX_WAIT
+                if level >= BACKGROUND
+                else GEMINI_RATE_MAX_WAIT
+            )
+        deadline = time.monotonic() + max_wait
+        ticket = (level, next(self._tickets))
+
+        with self._cond:
+            budgets = [self._budget(name) for name in key_names]
+            heapq.heappush(self._queue, ticket)
+            waited = False
+            try:
+                while True:
+                    retry = None
+                    if self._queue[0] == ticket:
+                        name = self._take(budgets, tokens, waited)
+                        if name is not None:
+                            return name
+                        retry = min(budget.wait_time(tokens) for budget in budgets)
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or (retry is not None and retry > remaining):
+                        self.stats["rejected"] += 1
+                        raise RateLimitExceeded(
+                            f"Gemini rate limit reached for {', '.join(key_names)}"
+                        )
+                    # Queued behind a higher-priority call: woken when it leaves
+                    waited = True
+                    self._cond.wait(remaining if retry is None else retry)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def try_acquire(self, key_names, tokens):
+        """Like acquire(), but returns None instead of waiting or queueing"""
+        with self._cond:
+            if self._queue:
+                return None
+            return self._take([self._budget(name) for name in key_names], tokens)
+
+    def _take(self, budgets, tokens, waited=False):
+        # Called with the lock held
+        for index, budget in enumerate(budgets):
+            if budget.wait_time(tokens) == 0:
+                budget.take(tokens)
+                self.stats["granted"] += 1
+                if index:
+                    budget.stats["spilled_in"] += 1
+                    self.stats["spilled"] += 1
+                if waited:
+                    self.stats["waited"] += 1
+                return budget.name
+        return None
+
+    def get_stats(self):
+        with self._cond:
+            queued = {}
+            for level, _ in self._queue:
+                name = PRIORITY_NAMES.get(level, str(level))
+                queued[name] = queued.get(name, 0) + 1
+            return {
+                **self.stats,
+                "queued": queued,
+                "keys": {
+                    name: budget.get_state() for name, budget in self._budgets.items()
+                },
+            }
+
+
+scheduler = RateScheduler()
+
+
+def acquire(key_names, tokens, level=None, max_wait=None):
+    return scheduler.acquire(key_names, tokens, level, max_wait)
+
+
+async def acquire_async(key_names, tokens, level=None, max_wait=None):
+    """acquire() for coroutines: only waits for budget in a worker thread"""
+    name = scheduler.try_acquire(key_names, tokens)
+    if name is not None:
+        return name
+    return await asyncio.to_thread(acquire, key_names, tokens, level, max_wait)
+
+
+def get_stats():
+    return scheduler.get_stats()
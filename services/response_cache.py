@@ -0,0 +1,75 @@
+"""
+Response cache for repeated chat and quick-query questions
+"""
+
+import os
+import unicodedata
+
+from services.cache import SWRCache, create_backend
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "21600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_SQLITE_MAX_ENTRIES = int(
+    os.getenv("RESPONSE_CACHE_SQLITE_MAX_ENTRIES", "20000")
+)
+
+# Zero-width (non-)joiners are part of Malayalam spelling, not punctuation
+JOINERS = {"‌", "‍"}
+
+
+def normalize_prompt(text):
+    """Casefold and collapse punctuation and whitespace so equivalent questions match"""
+    text = unicodedata.normalize("NFC", text).casefold()
+    # Keep letters, digits and combining marks (Malayalam vowel signs)
+    text = "".join(
+        ch if unicodedata.category(ch)[0] in "LMN" or ch in JOINERS else " "
+        for ch in text
+    )
+    return " ".join(text.split())
+
+
+def make_key(message, language, model, weather_bucket=None, variant=None):
+    """Cache key for a response to `message`
+
+    `weather_bucket` is the quantized weather the prompt included (see
+    WeatherReport.bucket), so answers are reused only under similar weather.
+    """
+    return (
+        normalize_prompt(message),
+        language,
+        model,
+        tuple(weather_bucket) if weather_bucket else None,
+        variant,
+    )
+
+
+def _create_cache(name):
+    return SWRCache(
+        name,
+        create_backend(
+            RESPONSE_CACHE_BACKEND,
+            namespace=name,
+            max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+            persistent_max_entries=RESPONSE_CACHE_SQLITE_MAX_ENTRIES,
+        ),
+        ttl=RESPONSE_CACHE_TTL,
+        # Never regenerate answers in the background
+        stale_ttl=0,
+    )
+
+
+# One cache per endpoint so hit rates are reported separately
+endpoint_caches = {
+    "chat": _create_cache("chat-responses"),
+    "quick_query": _create_cache("quick-query-responses"),
+}
+
+
+def get_cache(endpoint):
+    return endpoint_caches[endpoint]
+
+
+def get_stats():
+    """Per-endpoint hit/miss counts and hit rates"""
+    return {name: cache.get_stats() for name, cache in endpoint_caches.items()}
@@ -0,0 +1,382 @@
+"""
+Semantic answer cache: reuse answers to paraphrased questions
+
+Questions are embedded offline with a hashed word + character n-gram
+vectorizer and kept in a float32 matrix. Lookups are an exact top-k cosine
+search until the matrix outgrows SEMANTIC_CACHE_BRUTE_FORCE_MAX rows, after
+which a random-hyperplane LSH index narrows the search to a few candidates.
+
+Bag-of-words similarity cannot tell "2 acres" from "20 acres", or "spray"
+from "do not spray", so the numbers and negations of a question are part
+of its exact-match context: questions only match when they agree on both.
+The similarity threshold is not calibrated on real traffic yet, so the
+cache is off unless SEMANTIC_CACHE_ENABLED=true.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from services.response_cache import normalize_prompt
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+SEMANTIC_CACHE_TTL = int(
+    os.getenv("SEMANTIC_CACHE_TTL", os.getenv("RESPONSE_CACHE_TTL", "21600"))
+)
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "50000"))
+SEMANTIC_CACHE_BRUTE_FORCE_MAX = int(
+    os.getenv("SEMANTIC_CACHE_BRUTE_FORCE_MAX", "5000")
+)
+SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "256"))
+
+# Words that carry no meaning for matching farming questions
+STOPWORDS = {
+    "a", "an", "and", "are", "best", "can", "do", "does", "for", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "please", "should", "tell",
+    "the", "to", "what", "when", "which", "with",
+}  # fmt: skip
+
+# Words that flip a question's meaning; "t" is what is left of "n't" after
+# normalize_prompt splits "don't" at the apostrophe
+NEGATIONS = {
+    "no", "not", "never", "cannot", "without", "dont", "doesnt", "shouldnt",
+    "t", "ഇല്ല", "അല്ല", "വേണ്ട",
+}  # fmt: skip
+# Malayalam negative verb endings: ചെയ്യില്ല (will not), ചെയ്യരുത് (must not)
+NEGATION_SUFFIXES = ("ില്ല", "രുത്")
+NUMBER_RE = re.compile(r"\d+")
+
+
+def exact_terms(text):
+    """Numbers and negation of a question, which similarity must not blur
+
+    Part of the context a semantic match must agree on exactly.
+    """
+    words = normalize_prompt(text).split()
+    numbers = tuple(
+        str(int(number)) for word in words for number in NUMBER_RE.findall(word)
+    )
+    negated = any(
+        word in NEGATIONS or word.endswith(NEGATION_SUFFIXES) for word in words
+    )
+    return numbers, negated
+
+
+class HashingVectorizer:
+    """Unit-length hashed bag of words and character trigrams
+
+    Word features match exact terms; trigrams within each word make
+    inflections ("pest" / "pests") and Malayalam suffixes overlap. CRC32
+    hashing keeps vectors identical across processes and restarts.
+    """
+
+    def __init__(self, dim=SEMANTIC_CACHE_DIM, trigram_weight=0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def _features(self, text):
+        words = [w for w in normalize_prompt(text).split() if w not in STOPWORDS]
+        for word in words:
+            yield "w:" + word, 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                yield "c:" + padded[i : i + 3], self.trigram_weight
+
+    def transform(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            # The top hash bit picks the sign so collisions tend to cancel out
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class LSHIndex:
+    """Random-hyperplane LSH over the rows of the cache matrix
+
+    Each of `tables` hash tables keeps every row's 16 hyperplane sign bits as
+    a uint16 code; lookups use the first `bits` of them, chosen at rebuild time
+    so buckets stay small. Buckets live in sorted arrays (searchsorted per
+    probe, plus one-bit-flip probes). Rows written since the last rebuild are
+    kept in a small dirty list and checked directly until the next rebuild.
+    """
+
+    MAX_BITS = 16
+
+    def __init__(self, dim, tables=8, bucket_size=32, seed=0):
+        rng = np.random.default_rng(seed)
+        self.tables = tables
+        self.bucket_size = bucket_size
+        self.planes = rng.standard_normal((tables * self.MAX_BITS, dim)).astype(
+            np.float32
+        )
+        self.weights = (1 << np.arange(self.MAX_BITS - 1, -1, -1)).astype(np.uint32)
+        self.codes = np.zeros((0, tables), dtype=np.uint16)
+        self.bits = 8
+        self._sorted = []
+        self._dirty = []
+        self.rebuilds = 0
+
+    def hash(self, vectors):
+        """uint16 code per table for each row of `vectors`"""
+        signs = (vectors @ self.planes.T) > 0
+        signs = signs.reshape(len(vectors), self.tables, self.MAX_BITS)
+        return (signs * self.weights).sum(axis=2).astype(np.uint16)
+
+    def update(self, slots, vectors, size):
+        """Record new codes for overwritten or appended rows"""
+        if len(self.codes) < size:
+            grown = np.zeros((max(size, len(self.codes) * 2), self.tables), np.uint16)
+            grown[: len(self.codes)] = self.codes
+            self.codes = grown
+        self.codes[slots] = self.hash(vectors)
+        self._dirty.extend(int(slot) for slot in np.atleast_1d(slots))
+        if len(self._dirty) > max(1024, size // 10):
+            self.rebuild(size)
+
+    def index_all(self, vectors):
+        """Hash every row and build the sorted tables from scratch"""
+        self.codes = self.hash(vectors)
+        self.rebuild(len(vectors))
+
+    def rebuild(self, size):
+        self.bits = int(
+            np.clip(
+                np.round(np.log2(max(size, 1) / self.bucket_size)), 4, self.MAX_BITS
+            )
+        )
+        prefixes = self.codes[:size] >> (self.MAX_BITS - self.bits)
+        self._sorted = []
+        for table in range(self.tables):
+            order = np.argsort(prefixes[:, table], kind="stable")
+            self._sorted.append((prefixes[order, table], order))
+        self._dirty = []
+        self.rebuilds += 1
+
+    def candidates(self, vector):
+        """Rows sharing a bucket (or a one-bit-neighbour bucket) with `vector`"""
+        shift = self.MAX_BITS - self.bits
+        query = self.hash(vector[None, :])[0] >> shift
+        flips = np.concatenate(([0], 1 << np.arange(self.bits))).astype(np.uint16)
+
+        found = []
+        for table, (sorted_prefixes, order) in enumerate(self._sorted):
+            probes = query[table] ^ flips
+            starts = np.searchsorted(sorted_prefixes, probes, side="left")
+            ends = np.searchsorted(sorted_prefixes, probes, side="right")
+            for start, end in zip(starts, ends):
+                if end > start:
+                    found.append(order[start:end])
+        if self._dirty:
+            found.append(np.array(self._dirty))
+        if not found:
+            return np.array([], dtype=np.int64)
+
+        rows = np.unique(np.concatenate(found))
+        # Rows overwritten since the rebuild may no longer belong to these buckets
+        codes = self.codes[rows] >> shift
+        probes_match = np.isin(codes ^ query, flips).any(axis=1)
+        return rows[probes_match]
+
+
+class SemanticCache:
+    """Answers indexed by question embedding, searched within a context
+
+    The context (language, model, weather bucket, ...) and the question's
+    exact_terms() must match exactly; only the rest of the wording is
+    compared by similarity. The matrix is a
+    ring buffer of `max_entries` rows, so the oldest answers are replaced
+    first once it is full. A context's id is dropped with its last row.
+    """
+
+    def __init__(
+        self,
+        name,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        ttl=SEMANTIC_CACHE_TTL,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+        brute_force_max=SEMANTIC_CACHE_BRUTE_FORCE_MAX,
+        vectorizer=None,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.brute_force_max = brute_force_max
+        self.vectorizer = vectorizer or HashingVectorizer()
+        dim = self.vectorizer.dim
+
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.contexts = np.zeros(0, dtype=np.int32)
+        self.stored_at = np.zeros(0, dtype=np.float64)
+        self.answers = []
+        self.size = 0
+        self._next = 0
+        self._context_ids = {}
+        # Rows per context id, so ids of fully overwritten contexts are dropped
+        self._context_rows = {}
+        self._context_by_id = {}
+        self._next_context_id = 0
+        self.lsh = None
+        self.stats = {"hits": 0, "misses": 0, "lookup_ms_total": 0.0}
+        self._lock = threading.RLock()
+
+    def _context_id(self, context):
+        context_id = self._context_ids.get(context)
+        if context_id is None:
+            context_id = self._context_ids[context] = self._next_context_id
+            self._context_by_id[context_id] = context
+            self._context_rows[context_id] = 0
+            self._next_context_id += 1
+        return context_id
+
+    def _release_rows(self, slots):
+        """Forget the contexts of rows about to be overwritten if no rows remain"""
+        ids, counts = np.unique(self.contexts[slots], return_counts=True)
+        for context_id, count in zip(ids.tolist(), counts.tolist()):
+            self._context_rows[context_id] -= count
+            if not self._context_rows[context_id]:
+                del self._context_rows[context_id]
+                del self._context_ids[self._context_by_id.pop(context_id)]
+
+    def _grow(self, needed):
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        capacity = min(max(needed, capacity * 2, 1024), self.max_entries)
+        for name in ("vectors", "contexts", "stored_at"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.answers.extend([None] * (capacity - len(self.answers)))
+
+    def add_vectors(self, vectors, context, answers, stored_at=None):
+        """Store pre-computed question vectors with their answers"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.vectorizer.dim)
+        stored_at = time.time() if stored_at is None else stored_at
+        with self._lock:
+            count = min(len(vectors), self.max_entries)
+            vectors, answers = vectors[-count:], list(answers)[-count:]
+            self._grow(min(self.size + count, self.max_entries))
+            slots = (self._next + np.arange(count)) % self.max_entries
+            # Slots below size hold older rows that are about to be replaced
+            self._release_rows(slots[slots < self.size])
+            context_id = self._context_id(context)
+            self.vectors[slots] = vectors
+            self.contexts[slots] = context_id
+            self._context_rows[context_id] += count
+            self.stored_at[slots] = stored_at
+            for slot, answer in zip(slots, answers):
+                self.answers[slot] = answer
+            self._next = int((self._next + count) % self.max_entries)
+            self.size = min(self.size + count, self.max_entries)
+
+            if self.lsh is None and self.size > self.brute_force_max:
+                self.lsh = LSHIndex(self.vectorizer.dim)
+                self.lsh.index_all(self.vectors[: self.size])
+            elif self.lsh is not None:
+                self.lsh.update(slots, vectors, self.size)
+
+    def add(self, text, context, answer):
+        vector = self.vectorizer.transform(text)[None, :]
+        self.add_vectors(vector, (context, exact_terms(text)), [answer])
+
+    def search(self, vector, context, k=1, exact=None):
+        """Top-k (row, similarity) pairs for `vector` within `context`
+
+        Uses the LSH index once it exists unless `exact` is True.
+        """
+        with self._lock:
+            context_id = self._context_ids.get(context)
+            if context_id is None:
+                return []
+            if self.lsh is not None and not exact:
+                rows = self.lsh.candidates(vector)
+                scores = self.vectors[rows] @ vector
+                contexts, stored_at = self.contexts[rows], self.stored_at[rows]
+            else:
+                # Slices avoid copying the whole matrix for a full scan
+                rows = np.arange(self.size)
+                scores = self.vectors[: self.size] @ vector
+                contexts, stored_at = (
+                    self.contexts[: self.size],
+                    self.stored_at[: self.size],
+                )
+
+            live = (contexts == context_id) & (time.time() - stored_at < self.ttl)
+            scores = np.where(live, scores, -np.inf)
+            if not live.any():
+                return []
+
+            k = min(k, int(live.sum()))
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def lookup(self, text, context):
+        """Cached answer to the most similar question above the threshold, or None"""
+        started = time.perf_counter()
+        vector = self.vectorizer.transform(text)
+        answer = None
+        with self._lock:
+            if vector.any():
+                matches = self.search(vector, (context, exact_terms(text)))
+                if matches and matches[0][1] >= self.threshold:
+                    answer = self.answers[matches[0][0]]
+
+            self.stats["hits" if answer is not None else "misses"] += 1
+            self.stats["lookup_ms_total"] += (time.perf_counter() - started) * 1000
+        return answer
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            lookup_ms_total = stats.pop("lookup_ms_total")
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+            stats["avg_lookup_ms"] = (
+                round(lookup_ms_total / lookups, 3) if lookups else 0.0
+            )
+            stats["entries"] = self.size
+            stats["index"] = "lsh" if self.lsh is not None else "brute-force"
+            stats["threshold"] = self.threshold
+            return stats
+
+
+# One semantic layer per endpoint, matching the exact-match response caches
+endpoint_caches = {
+    "chat": SemanticCache("chat"),
+    "quick_query": SemanticCache("quick-query"),
+}
+
+
+def lookup(endpoint, text, context):
+    """Cached answer to a similar question for this endpoint, or None"""
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    return endpoint_caches[endpoint].lookup(text, context)
+
+
+def remember(endpoint, text, context, answer):
+    if SEMANTIC_CACHE_ENABLED and answer:
+        endpoint_caches[endpoint].add(text, context, answer)
+
+
+def get_or_generate(endpoint, text, context, generate):
+    """Answer from the semantic cache, or generate and remember the answer"""
+    answer = lookup(endpoint, text, context)
+    if answer is None:
+        answer = generate()
+        remember(endpoint, text, context, answer)
+    return answer
+
+
+def get_stats():
+    return {name: cache.get_stats() for name, cache in endpoint_caches.items()}
@@ -0,0 +1,286 @@
+"""
+Request coalescing: concurrent identical calls share one upstream call
+
+In-process, threads asking for the same key while a call is in flight wait
+for it and receive its result (or its exception); acoalesce() does the same
+for coroutines on one event loop. With
+SINGLEFLIGHT_MODE=sqlite, one call per key also runs across gunicorn
+workers: workers claim the key in a shared SQLite table and the others poll
+for the published result, which must then be JSON-serializable.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+SINGLEFLIGHT_MODE = os.getenv("SINGLEFLIGHT_MODE", "thread")
+# Longest a worker waits on another worker's call before making its own
+SINGLEFLIGHT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_TIMEOUT", "60"))
+# How long a finished result stays readable for workers still polling
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv("SINGLEFLIGHT_RESULT_TTL", "5"))
+
+
+def make_key(*parts):
+    """Stable key for a call from its JSON-able parts"""
+    encoded = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-process coalescing of concurrent calls with the same key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {"calls": 0, "shared": 0, "errors": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Finished calls are dropped, so the map only holds in-flight keys
+            with self._lock:
+                self._calls.pop(key, None)
+                self.stats["calls"] += 1
+                if call.error is not None:
+                    self.stats["errors"] += 1
+            call.done.set()
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Coalescing of concurrent coroutines with the same key on one event loop
+
+    The shared call runs as its own task, so a caller that is cancelled (e.g.
+    a hedged request that lost) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.stats = {"calls": 0, "shared": 0, "errors": 0}
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        self.stats["calls"] += 1
+        if task.cancelled() or task.exception() is not None:
+            self.stats["errors"] += 1
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def get_stats(self):
+        return {**self.stats, "in_flight": len(self._calls)}
+
+
+class SQLiteSingleFlight:
+    """Cross-process coalescing through a claim row per key in a shared SQLite file"""
+
+    def __init__(
+        self,
+        path,
+        timeout=SINGLEFLIGHT_TIMEOUT,
+        result_ttl=SINGLEFLIGHT_RESULT_TTL,
+        poll_interval=0.05,
+    ):
+        self.path = path
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.stats = {"leads": 0, "shared": 0, "timeouts": 0}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connect().execute("""CREATE TABLE IF NOT EXISTS singleflight (
+                key TEXT PRIMARY KEY,
+                claimed_until REAL NOT NULL,
+                value TEXT,
+                stored_at REAL
+            )""")
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        # A forked worker opens its own connection instead of the parent's
+        if connection is None or self._local.pid != os.getpid():
+            # Autocommit mode; claims use explicit BEGIN IMMEDIATE transactions
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _claim_or_read(self, key):
+        """("result", value), ("leader", None) or ("wait", None)"""
+        now = time.time()
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            state, value = "leader", None
+            row = connection.execute(
+                "SELECT claimed_until, value, stored_at FROM singleflight WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                claimed_until, stored, stored_at = row
+                if stored is not None and now - stored_at < self.result_ttl:
+                    state, value = "result", json.loads(stored)
+                elif stored is None and claimed_until > now:
+                    state = "wait"
+
+            if state == "leader":
+                connection.execute(
+                    """INSERT OR REPLACE INTO singleflight (key, claimed_until, value, stored_at)
+                    VALUES (?, ?, NULL, NULL)""",
+                    (key, now + self.timeout),
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return state, value
+
+    def _publish(self, key, value):
+        now = time.time()
+        connection = self._connect()
+        connection.execute(
+            "UPDATE singleflight SET value = ?, stored_at = ? WHERE key = ?",
+            (json.dumps(value), now, key),
+        )
+        # Old results are only useful to workers that were already waiting
+        connection.execute(
+            "DELETE FROM singleflight WHERE stored_at < ? OR claimed_until < ?",
+            (now - self.result_ttl, now - self.timeout),
+        )
+
+    def _release(self, key):
+        self._connect().execute(
+            "DELETE FROM singleflight WHERE key = ? AND value IS NULL", (key,)
+        )
+
+    def do(self, key, fn):
+        deadline = time.time() + self.timeout
+        while True:
+            state, value = self._claim_or_read(key)
+            if state == "result":
+                self._count("shared")
+                return value
+            if state == "leader":
+                self._count("leads")
+                try:
+                    value = fn()
+                except BaseException:
+                    # Let a waiting worker claim the key and try for itself
+                    self._release(key)
+                    raise
+                self._publish(key, value)
+                return value
+            if time.time() > deadline:
+                self._count("timeouts")
+                return fn()
+            time.sleep(self.poll_interval)
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class WorkerSingleFlight:
+    """Threads coalesce in-process first; one thread per worker then joins the SQLite flight"""
+
+    def __init__(self, path):
+        self.local = SingleFlight()
+        self.shared = SQLiteSingleFlight(path)
+
+    def do(self, key, fn):
+        return self.local.do(key, lambda: self.shared.do(key, fn))
+
+    def get_stats(self):
+        return {**self.local.get_stats(), "workers": self.shared.get_stats()}
+
+
+_flight = None
+_flight_lock = threading.Lock()
+
+
+def get_flight():
+    """Process-wide singleflight group for upstream LLM calls"""
+    global _flight
+    if _flight is None:
+        with _flight_lock:
+            if _flight is None:
+                if SINGLEFLIGHT_MODE == "sqlite":
+                    from services.cache import DEFAULT_SQLITE_PATH
+
+                    path = os.getenv("CACHE_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+                    _flight = WorkerSingleFlight(path)
+                else:
+                    _flight = SingleFlight()
+    return _flight
+
+
+def coalesce(key, fn):
+    """Run fn() once for all concurrent callers with this key"""
+    return get_flight().do(key, fn)
+
+
+_async_flights = weakref.WeakKeyDictionary()
+
+
+def get_async_flight():
+    """Singleflight group for coroutines on the running event loop"""
+    loop = asyncio.get_running_loop()
+    flight = _async_flights.get(loop)
+    if flight is None:
+        flight = _async_flights[loop] = AsyncSingleFlight()
+    return flight
+
+
+async def acoalesce(key, fn):
+    """Await fn() once for all concurrent coroutines with this key
+
+    Coalescing is per event loop; SINGLEFLIGHT_MODE=sqlite does not apply.
+    """
+    return await get_async_flight().do(key, fn)
@@ -0,0 +1,110 @@
+"""
+Server-Sent Events helpers and boundary-aware chunking for streamed AI text
+"""
+
+import json
+import re
+
+from flask import Response, stream_with_context
+
+# Whitespace runs that follow the end of a sentence or contain a line break
+SENTENCE_BREAK = re.compile(r"\s*\n\s*|(?<=[.!?।:])[ \t]+")
+WORD_BREAK = re.compile(r"\s+")
+
+
+class TextChunker:
+    """Re-split streamed text into segments that end on sentence or word breaks
+
+    Segments are cut just before a whitespace run, so words are never split
+    and each whitespace run (including blank lines) lands whole at the start
+    of the next segment. Per-segment regex post-processing therefore behaves
+    as it would on the complete text.
+    """
+
+    def __init__(self, max_chars=200):
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text and return any segments that are now complete"""
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                return segments
+            segments.append(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest, self._buffer = self._buffer, ""
+        return rest
+
+    def _find_cut(self):
+        # A whitespace run is only complete once non-whitespace follows it
+        cut = None
+        for match in SENTENCE_BREAK.finditer(self._buffer):
+            if match.start() > 0 and match.end() < len(self._buffer):
+                cut = match.start()
+        if cut is None and len(self._buffer) > self.max_chars:
+            for match in WORD_BREAK.finditer(self._buffer):
+                if match.start() > 0 and match.end() < len(self._buffer):
+                    cut = match.start()
+        return cut
+
+
+def cancel_generation(response):
+    """Abort an in-flight Gemini streaming call so no more tokens are generated"""
+    iterator = getattr(response, "_iterator", None)
+    cancel = getattr(iterator, "cancel", None)
+    if cancel is not None:
+        try:
+            cancel()
+        except Exception as e:
+            print(f"Failed to cancel Gemini stream: {e}")
+
+
+def iter_text(response):
+    """Yield text from a streaming Gemini response
+
+    If the consumer stops early (the client disconnected and the WSGI server
+    closed the response), the upstream call is cancelled. Use it with
+    contextlib.closing so that happens as soon as the outer stream closes.
+    """
+    completed = False
+    try:
+        for chunk in response:
+            yield chunk.text
+        completed = True
+    finally:
+        if not completed:
+            cancel_generation(response)
+            print("Client disconnected; cancelled Gemini stream")
+
+
+def wants_event_stream(request):
+    """True when the client asked for text/event-stream over JSON"""
+    best = request.accept_mimetypes.best_match(
+        ["application/json", "text/event-stream"]
+    )
+    return best == "text/event-stream"
+
+
+def sse_event(data, event=None):
+    """Encode one Server-Sent Event with a JSON payload"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events):
+    """Stream an iterable of encoded events to the client without buffering"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,278 @@
+"""
+Weather service shared by the home, knowledge and chat blueprints
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError
+
+from models import WeatherLog, db
+from services import weather_client
+from services.cache import Stamped, SWRCache, create_backend
+
+# One cache entry per (city, country) serves every endpoint
+weather_cache = SWRCache(
+    "weather",
+    create_backend(
+        os.getenv("WEATHER_CACHE_BACKEND", "memory"),
+        namespace="weather",
+        max_entries=int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256")),
+    ),
+    ttl=int(os.getenv("WEATHER_CACHE_TTL", "600")),
+    stale_ttl=int(os.getenv("WEATHER_CACHE_STALE_TTL", "1800")),
+)
+
+# Same-day weather_logs rows younger than this are served without going upstream
+WEATHER_LOG_MAX_AGE = int(
+    os.getenv("WEATHER_LOG_MAX_AGE", os.getenv("WEATHER_CACHE_TTL", "600"))
+)
+# While OpenWeather is down, a stored snapshot counts as fresh for at most
+# this many seconds before a refresh is tried again
+WEATHER_FALLBACK_TTL = int(os.getenv("WEATHER_FALLBACK_TTL", "60"))
+
+
+@dataclass
+class CurrentWeather:
+    location: str
+    temperature: float
+    feels_like: float
+    description: str
+    condition: str
+    humidity: float
+    wind_speed: float
+    pressure: float
+    visibility_km: float
+    icon: str
+    rain_1h: float = 0.0
+
+    @classmethod
+    def from_openweather(cls, data):
+        weather = data["weather"][0]
+        return cls(
+            location=data.get("name", ""),
+            temperature=data["main"]["temp"],
+            feels_like=data["main"]["feels_like"],
+            description=weather["description"],
+            condition=weather.get("main", ""),
+            humidity=data["main"]["humidity"],
+            wind_speed=data["wind"]["speed"],
+            pressure=data["main"].get("pressure", 0),
+            visibility_km=data.get("visibility", 0) / 1000,
+            icon=weather.get("icon", ""),
+            rain_1h=data.get("rain", {}).get("1h", 0.0),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class ForecastEntry:
+    time: datetime
+    temperature: float
+    feels_like: float
+    description: str
+    icon: str
+    humidity: float
+    rain_3h: float = 0.0
+
+    @classmethod
+    def from_openweather(cls, item):
+        return cls(
+            time=datetime.fromisoformat(item["dt_txt"].replace(" ", "T")),
+            temperature=item["main"]["temp"],
+            feels_like=item["main"]["feels_like"],
+            description=item["weather"][0]["description"],
+            icon=item["weather"][0]["icon"],
+            humidity=item["main"]["humidity"],
+            rain_3h=item.get("rain", {}).get("3h", 0.0),
+        )
+
+
+@dataclass
+class WeatherReport:
+    city: str
+    country: str
+    current: CurrentWeather
+    forecast: list = field(default_factory=list)
+
+    @classmethod
+    def from_payload(cls, city, country, payload):
+        forecast = (payload.get("forecast") or {}).get("list", [])
+        return cls(
+            city=city,
+            country=country,
+            current=CurrentWeather.from_openweather(payload["current"]),
+            forecast=[ForecastEntry.from_openweather(item) for item in forecast],
+        )
+
+    def next_hours(self, count=8):
+        """Forecast entries for the next count * 3 hours"""
+        return self.forecast[:count]
+
+    def bucket(self, temperature_band=2):
+        """Quantized (temperature band, condition, rain flag) for cache keys"""
+        current = self.current
+        band = int(current.temperature // temperature_band) * temperature_band
+        raining = current.rain_1h > 0 or any(
+            entry.rain_3h > 0 for entry in self.next_hours()
+        )
+        condition = (current.condition or current.description).lower()
+        return (band, condition, raining)
+
+
+def normalize_city(city):
+    return " ".join(city.split()).title()
+
+
+def _fetch_payload(city, country):
+    try:
+        return weather_client.fetch_weather(city, country)
+    except Exception as e:
+        print(f"Weather API error: {e}")
+        return None
+
+
+def utc_today():
+    # weather_logs rows are dated in UTC, like their date_updated
+    return datetime.utcnow().date()
+
+
+def save_weather_log(city, payload, country="IN"):
+    """Upsert today's observation for a city into weather_logs"""
+    current = CurrentWeather.from_openweather(payload["current"])
+    today = utc_today()
+
+    # A concurrent insert for the same (location, date) loses once and retries as an update
+    for attempt in range(2):
+        log = WeatherLog.query.filter_by(
+            location=city, country=country, date=today
+        ).first()
+        if log is None:
+            log = WeatherLog(location=city, country=country, date=today)
+            db.session.add(log)
+
+        # Keep the day's extremes across every observation
+        temperatures = [current.temperature]
+        temperatures += [
+            t for t in (log.temperature_max, log.temperature_min) if t is not None
+        ]
+        log.temperature_max = max(temperatures)
+        log.temperature_min = min(temperatures)
+        # Peak hourly rainfall (mm) observed during the day
+        log.rainfall = max(log.rainfall or 0.0, current.rain_1h)
+        log.humidity = current.humidity
+        log.wind_speed = current.wind_speed
+        log.weather_condition = current.condition or current.description
+        log.payload = json.dumps(payload)
+        log.date_updated = datetime.utcnow()
+
+        try:
+            db.session.commit()
+            return log
+        except IntegrityError:
+            db.session.rollback()
+    return None
+
+
+def _load_through_log(city, country):
+    """Read-through load: weather_logs first, then OpenWeather, then any stored snapshot"""
+    try:
+        log = WeatherLog.query.filter_by(
+            location=city, country=country, date=utc_today()
+        ).first()
+        if log and log.payload:
+            updated_at = log.date_updated.replace(tzinfo=timezone.utc).timestamp()
+            if time.time() - updated_at < WEATHER_LOG_MAX_AGE:
+                # Cached as of the observation, so it expires on schedule
+                return Stamped(json.loads(log.payload), updated_at)
+    except Exception as e:
+        print(f"Weather log read error: {e}")
+        db.session.rollback()
+
+    payload = _fetch_payload(city, country)
+    if payload is not None:
+        try:
+            save_weather_log(city, payload, country)
+        except Exception as e:
+            print(f"Weather log write error: {e}")
+            db.session.rollback()
+        return payload
+
+    # OpenWeather is unavailable, so fall back to the latest stored snapshot
+    try:
+        log = (
+            WeatherLog.query.filter(
+                WeatherLog.location == city,
+                WeatherLog.country == country,
+                WeatherLog.payload.isnot(None),
+            )
+            .order_by(WeatherLog.date.desc())
+            .first()
+        )
+        if log:
+            print(f"Serving stored weather for {city} from {log.date}")
+            # However old it is, cache it as fresh for only WEATHER_FALLBACK_TTL;
+            # after that it is served stale while refreshes retry OpenWeather
+            stored_at = time.time() - weather_cache.ttl + WEATHER_FALLBACK_TTL
+            return Stamped(json.loads(log.payload), stored_at)
+    except Exception as e:
+        print(f"Weather log read error: {e}")
+        db.session.rollback()
+    return None
+
+
+def _load_payload(city, country, app):
+    if app is None:
+        return _fetch_payload(city, country)
+    # Background refreshes run outside the request, so push the app context here
+    with app.app_context():
+        return _load_through_log(city, country)
+
+
+def get_weather(city="Kochi", country="IN"):
+    """Get a normalized weather report, served from the weather cache when possible"""
+    city = normalize_city(city)
+    country = country.strip().upper()
+    app = current_app._get_current_object() if has_app_context() else None
+    payload = weather_cache.get_or_load(
+        (city.lower(), country), lambda: _load_payload(city, country, app)
+    )
+    if payload is None:
+        return None
+
+    try:
+        return WeatherReport.from_payload(city, country, payload)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        print(f"Unexpected weather payload for {city}: {e}")
+        return None
+
+
+def refresh_weather(city="Kochi", country="IN"):
+    """Reload a city's weather into the cache now, ignoring its TTL"""
+    city = normalize_city(city)
+    country = country.strip().upper()
+    app = current_app._get_current_object() if has_app_context() else None
+    payload = weather_cache.refresh(
+        (city.lower(), country), lambda: _load_payload(city, country, app)
+    )
+    return payload is not None
+
+
+def get_weather_history(city, start, end, country="IN"):
+    """Get stored daily observations for a city between two dates (inclusive)"""
+    return (
+        WeatherLog.query.filter(
+            WeatherLog.location == normalize_city(city),
+            WeatherLog.country == country.strip().upper(),
+            WeatherLog.date >= start,
+            WeatherLog.date <= end,
+        )
+        .order_by(WeatherLog.date)
+        .all()
+    )
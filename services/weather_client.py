@@ -0,0 +1,124 @@
+"""
+OpenWeather HTTP client with a pooled keep-alive session
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from services import circuit_breaker
+
+OPENWEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
+
+# Seconds allowed to open a connection, and per-call deadlines for each endpoint
+CONNECT_TIMEOUT = float(os.getenv("OPENWEATHER_CONNECT_TIMEOUT", "3"))
+CURRENT_DEADLINE = float(os.getenv("OPENWEATHER_CURRENT_TIMEOUT", "10"))
+FORECAST_DEADLINE = float(os.getenv("OPENWEATHER_FORECAST_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("OPENWEATHER_POOL_SIZE", "16"))
+
+# Created on first use so forked workers never inherit them, and so
+# importing this module does not import requests
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_openweather_api_key():
+    """Get OpenWeather API key"""
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if not api_key:
+        raise ValueError("OpenWeather API key not configured")
+    return api_key
+
+
+def get_session():
+    """Get the shared keep-alive session for OpenWeather calls"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def get_executor():
+    """Get the thread pool used to issue OpenWeather calls in parallel"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=POOL_SIZE, thread_name_prefix="openweather"
+                )
+    return _executor
+
+
+def _get_json(endpoint, query, timeout):
+    params = {"q": query, "appid": get_openweather_api_key(), "units": "metric"}
+    breaker = circuit_breaker.get_breaker("openweather")
+    breaker.before_call()
+    try:
+        response = get_session().get(
+            f"{OPENWEATHER_BASE_URL}/{endpoint}",
+            params=params,
+            timeout=(CONNECT_TIMEOUT, timeout),
+        )
+    except Exception:
+        breaker.record_failure()
+        raise
+    # Server errors and rate limiting count against the breaker; an unknown
+    # city (404) says nothing about OpenWeather's health
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if response.status_code != 200:
+        print(f"OpenWeather {endpoint} returned {response.status_code} for {query}")
+        return None
+    return response.json()
+
+
+def _wait_for(future, endpoint, deadline):
+    """Return a call's JSON, or None if it failed or missed its deadline"""
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeoutError:
+        print(f"OpenWeather {endpoint} missed its deadline")
+    except Exception as e:
+        print(f"OpenWeather {endpoint} error: {e}")
+    return None
+
+
+def fetch_weather(city, country="IN"):
+    """Fetch current weather and 5-day forecast concurrently
+
+    Returns {"current": ..., "forecast": ...}. The forecast is None when only
+    that call fails or misses its deadline; the whole result is None when
+    current conditions are unavailable.
+    """
+    # Fail fast on a missing key or an open breaker, not inside the workers
+    get_openweather_api_key()
+    circuit_breaker.get_breaker("openweather").raise_if_open()
+
+    query = f"{city},{country}" if country else city
+    started = time.monotonic()
+    executor = get_executor()
+    current_future = executor.submit(_get_json, "weather", query, CURRENT_DEADLINE)
+    forecast_future = executor.submit(_get_json, "forecast", query, FORECAST_DEADLINE)
+
+    current = _wait_for(current_future, "weather", started + CURRENT_DEADLINE)
+    if current is None:
+        forecast_future.cancel()
+        return None
+
+    forecast = _wait_for(forecast_future, "forecast", started + FORECAST_DEADLINE)
+    return {"current": current, "forecast": forecast}
@@ -0,0 +1,151 @@
+"""
+Background pre-warmer that keeps weather fresh for every active farm location
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from models import Farm, db
+from services import weather
+
+PREWARM_INTERVAL = int(
+    os.getenv(
+        "WEATHER_PREWARM_INTERVAL",
+        str(int(int(os.getenv("WEATHER_CACHE_TTL", "600")) * 0.8)),
+    )
+)
+PREWARM_CONCURRENCY = int(os.getenv("WEATHER_PREWARM_CONCURRENCY", "4"))
+DEFAULT_LOCATIONS = ["Kochi"]
+
+_prewarmer = None
+
+
+def location_to_city(location):
+    """Farm locations look like "Kottayam, Kerala"; OpenWeather wants the city"""
+    return location.split(",")[0].strip()
+
+
+class WeatherPrewarmer:
+    """Periodically refreshes the weather cache for active farm locations"""
+
+    def __init__(self, app, interval=PREWARM_INTERVAL, concurrency=PREWARM_CONCURRENCY):
+        self.app = app
+        self.interval = interval
+        self.concurrency = concurrency
+        self.rounds = 0
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def active_locations(self):
+        """Distinct cities of active farms, plus the dashboard default"""
+        with self.app.app_context():
+            rows = (
+                db.session.query(Farm.location)
+                .filter(Farm.is_active.isnot(False))
+                .distinct()
+                .all()
+            )
+        cities = {weather.normalize_city(location_to_city(row[0])) for row in rows}
+        cities.update(DEFAULT_LOCATIONS)
+        return sorted(city for city in cities if city)
+
+    def refresh_location(self, city):
+        started = time.time()
+        error = None
+        try:
+            with self.app.app_context():
+                ok = weather.refresh_weather(city)
+            if not ok:
+                error = "weather unavailable"
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            entry = self.metrics.setdefault(
+                city,
+                {
+                    "successes": 0,
+                    "failures": 0,
+                    "consecutive_failures": 0,
+                    "last_success": None,
+                    "last_error": None,
+                },
+            )
+            entry["last_attempt"] = started
+            entry["last_duration_ms"] = round((time.time() - started) * 1000)
+            if error:
+                entry["failures"] += 1
+                entry["consecutive_failures"] += 1
+                entry["last_error"] = error
+            else:
+                entry["successes"] += 1
+                entry["consecutive_failures"] = 0
+                entry["last_success"] = time.time()
+        return error is None
+
+    def run_once(self):
+        """Refresh every active location with bounded concurrency"""
+        cities = self.active_locations()
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="weather-prewarm"
+        ) as executor:
+            results = list(executor.map(self.refresh_location, cities))
+        self.rounds += 1
+        return {"locations": len(cities), "refreshed": sum(results)}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Weather pre-warm error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="weather-prewarmer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self):
+        now = time.time()
+        with self._lock:
+            locations = {}
+            for city, entry in self.metrics.items():
+                stats = dict(entry)
+                # Refresh lag: how long since this location last refreshed successfully
+                stats["lag_seconds"] = (
+                    round(now - entry["last_success"])
+                    if entry["last_success"]
+                    else None
+                )
+                locations[city] = stats
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval": self.interval,
+            "concurrency": self.concurrency,
+            "rounds": self.rounds,
+            "locations": locations,
+        }
+
+
+def start_prewarmer(app):
+    """Start the in-process pre-warmer thread for this worker"""
+    global _prewarmer
+    if _prewarmer is None:
+        _prewarmer = WeatherPrewarmer(app)
+        _prewarmer.start()
+    return _prewarmer
+
+
+def get_prewarmer():
+    return _prewarmer
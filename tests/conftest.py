@@ -0,0 +1,145 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, with the stub LLM
+backend so no test reaches Gemini or GROQ
+"""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+# Read by the services at import time, so set before any of them is imported
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("LLM_STUB_LATENCY_MS", "1")
+os.environ.setdefault("LLM_STUB_LATENCY_SIGMA", "0")
+os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "cache.db"))
+
+
+@pytest.fixture
+def app(tmp_path):
+    from main import create_app
+    from models import db
+
+    app = create_app(
+        start_services=False,
+        config={
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+        },
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers(monkeypatch):
+    """A closed breaker per upstream, so failures in one test don't trip another"""
+    from services import circuit_breaker
+
+    for name in circuit_breaker.UPSTREAMS:
+        monkeypatch.setitem(
+            circuit_breaker.breakers, name, circuit_breaker.CircuitBreaker(name)
+        )
+
+
+@pytest.fixture(autouse=True)
+def fresh_response_caches(monkeypatch):
+    """Empty in-memory response caches, so answers don't leak between tests"""
+    from services import response_cache
+    from services.cache import MemoryBackend, SWRCache
+
+    for endpoint in response_cache.endpoint_caches:
+        monkeypatch.setitem(
+            response_cache.endpoint_caches,
+            endpoint,
+            SWRCache(
+                endpoint,
+                MemoryBackend(),
+                ttl=response_cache.RESPONSE_CACHE_TTL,
+                stale_ttl=0,
+            ),
+        )
+
+
+def make_weather_payload(temperature=29.0, description="light rain", rain_1h=0.0):
+    """OpenWeather current + forecast JSON, as weather_client.fetch_weather returns"""
+    condition = description.split()[-1].title()
+    return {
+        "current": {
+            "name": "Kochi",
+            "weather": [{"description": description, "main": condition, "icon": "10d"}],
+            "main": {
+                "temp": temperature,
+                "feels_like": temperature + 3,
+                "humidity": 84,
+                "pressure": 1008,
+            },
+            "wind": {"speed": 3.1},
+            "visibility": 8000,
+            "rain": {"1h": rain_1h} if rain_1h else {},
+        },
+        "forecast": {
+            "list": [
+                {
+                    "dt_txt": f"2026-10-18 {hour:02d}:00:00",
+                    "main": {
+                        "temp": temperature - 1,
+                        "feels_like": temperature,
+                        "humidity": 80,
+                    },
+                    "weather": [{"description": description, "icon": "10d"}],
+                }
+                for hour in range(0, 24, 3)
+            ]
+        },
+    }
+
+
+class FakeOpenWeather:
+    """Stands in for weather_client.fetch_weather, counting calls per city"""
+
+    def __init__(self):
+        self.payloads = {}
+        self.calls = []
+        self.down = False
+
+    def __call__(self, city, country="IN"):
+        self.calls.append((city, country))
+        if self.down:
+            return None
+        return self.payloads.get((city, country), make_weather_payload())
+
+
+@pytest.fixture
+def openweather(monkeypatch):
+    """Fake OpenWeather behind an empty weather cache"""
+    from services import weather, weather_client
+    from services.cache import MemoryBackend, SWRCache
+
+    fake = FakeOpenWeather()
+    monkeypatch.setattr(weather_client, "fetch_weather", fake)
+    monkeypatch.setattr(
+        weather,
+        "weather_cache",
+        SWRCache("weather", MemoryBackend(), ttl=600, stale_ttl=1800),
+    )
+    return fake
+
+
+def read_events(response):
+    """[(event, data)] from an SSE response body"""
+    events = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        if not block:
+            continue
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
@@ -0,0 +1,101 @@
+import pytest
+
+from blueprints import home
+from conftest import make_weather_payload
+from services.cache import MemoryBackend, SWRCache
+from services.weather import WeatherReport
+
+
+def report(**weather):
+    return WeatherReport.from_payload("Kochi", "IN", make_weather_payload(**weather))
+
+
+class FakeRouter:
+    """Stands in for llm_router.generate, counting prompts"""
+
+    def __init__(self, reply="Irrigate in the evening"):
+        self.reply = reply
+        self.prompts = []
+
+    def __call__(self, task, providers, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+@pytest.fixture
+def router(monkeypatch):
+    fake = FakeRouter()
+    monkeypatch.setattr(home.llm_router, "generate", fake)
+    monkeypatch.setattr(
+        home,
+        "advisory_cache",
+        SWRCache("advisory", MemoryBackend(), ttl=3600, stale_ttl=0),
+    )
+    return fake
+
+
+def test_bucket_quantizes_weather():
+    assert report(temperature=29.0).bucket() == (28, "rain", False)
+    assert report(temperature=28.1).bucket() == report(temperature=29.9).bucket()
+    assert report(rain_1h=0.4).bucket()[2] is True
+
+
+def test_similar_weather_reuses_the_advisory(router):
+    first = home.generate_farming_advisory(report(temperature=28.2), "Kochi")
+    second = home.generate_farming_advisory(report(temperature=29.7), " kochi ")
+
+    assert first == second == "Irrigate in the evening"
+    assert len(router.prompts) == 1
+
+
+@pytest.mark.parametrize(
+    "weather, language",
+    [({"temperature": 33.0}, "en"), ({"rain_1h": 2.0}, "en"), ({}, "ml")],
+)
+def test_different_weather_or_language_generates_again(router, weather, language):
+    home.generate_farming_advisory(report(), "Kochi")
+    home.generate_farming_advisory(report(**weather), "Kochi", language)
+
+    assert len(router.prompts) == 2
+    assert ("Malayalam" in router.prompts[-1]) == (language == "ml")
+
+
+def test_refresh_replaces_the_cached_advisory(router):
+    home.generate_farming_advisory(report(), "Kochi")
+    router.reply = "Spray neem oil after the rain"
+
+    assert home.generate_farming_advisory(report(), "Kochi", refresh=True) == (
+        "Spray neem oil after the rain"
+    )
+    assert home.generate_farming_advisory(report(), "Kochi") == (
+        "Spray neem oil after the rain"
+    )
+    assert len(router.prompts) == 2
+
+
+def test_failed_generations_are_not_cached(router):
+    router.reply = None
+    assert home.generate_farming_advisory(report(), "Kochi") == (
+        "Unable to generate advisory at this time."
+    )
+
+    router.reply = "Irrigate in the evening"
+    assert (
+        home.generate_farming_advisory(report(), "Kochi") == "Irrigate in the evening"
+    )
+
+
+def test_insights_and_advisories_are_cached_apart(router):
+    home.generate_farming_advisory(report(), "Kochi")
+    home.generate_weather_forecast_insights(report(), "Kochi")
+    home.generate_weather_forecast_insights(report(), "Kochi")
+
+    assert len(router.prompts) == 2
+    assert home.advisory_cache.get_stats()["hits"] == 1
+
+
+def test_advisory_stats_endpoint(client):
+    response = client.get("/api/home/advisory/stats")
+
+    assert response.status_code == 200
+    assert "hits" in response.json["data"]["cache"]
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from asgi import AsyncApp
+from blueprints import chat
+from services import llm_router
+
+
+@pytest.fixture
+def asgi_app(app):
+    return AsyncApp(app, wsgi_workers=2)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Prompts that reached llm_router.agenerate"""
+    calls = []
+    agenerate = llm_router.agenerate
+
+    async def counting(task, factories, prompt, **options):
+        calls.append(prompt)
+        return await agenerate(task, factories, prompt, **options)
+
+    monkeypatch.setattr(llm_router, "agenerate", counting)
+    return calls
+
+
+def request(asgi_app, method, path, body=None, headers=()):
+    """(status, headers, body) of one request sent straight to the ASGI app"""
+    raw = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(raw)).encode()),
+        ]
+        + [(name.encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 5000),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": raw, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start = messages[0]
+    response_headers = {
+        name.decode(): value.decode() for name, value in start["headers"]
+    }
+    content = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], response_headers, content
+
+
+def post_json(asgi_app, path, body, headers=()):
+    status, _, content = request(asgi_app, "POST", path, body, headers)
+    return status, json.loads(content)
+
+
+def test_chat_matches_the_flask_route(asgi_app, client):
+    message = {"message": "How do I grow paddy?"}
+
+    status, body = post_json(asgi_app, "/api/chat", message)
+
+    assert status == 200
+    assert body["response"] == client.post("/api/chat", json=message).json["response"]
+
+
+def test_requests_that_are_not_json_objects_are_rejected(asgi_app):
+    status, body = post_json(asgi_app, "/api/chat", ["not", "an", "object"])
+    assert (status, body) == (400, {"error": "Expected a JSON object"})
+    assert post_json(asgi_app, "/api/chat", {})[0] == 400
+
+
+def test_other_routes_and_streams_go_to_flask(asgi_app):
+    status, _, content = request(asgi_app, "GET", "/api/health")
+    assert status == 200 and json.loads(content)["status"] == "healthy"
+
+    status, headers, content = request(
+        asgi_app,
+        "POST",
+        "/api/chat",
+        {"message": "How do I grow paddy?"},
+        headers=[("accept", "text/event-stream")],
+    )
+    assert headers["content-type"].startswith("text/event-stream")
+    assert b"event: done" in content
+
+
+def test_cors_headers_follow_allowed_origins(asgi_app):
+    _, headers, _ = request(
+        asgi_app,
+        "POST",
+        "/api/quick-query",
+        {"query": "Coconut prices"},
+        headers=[("origin", "http://localhost:3000")],
+    )
+    assert headers["access-control-allow-origin"] == "http://localhost:3000"
+
+
+def test_quick_query_is_cached_and_reports_the_provider(asgi_app, llm_calls):
+    query = {"query": "Coconut prices", "type": "general"}
+
+    _, first = post_json(asgi_app, "/api/quick-query", query)
+    _, second = post_json(asgi_app, "/api/quick-query", query)
+
+    assert first["response"] == second["response"]
+    assert first["powered_by"] in ("GEMINI", "GROQ")
+    assert second["powered_by"] == "cache"
+    assert len(llm_calls) == 1
+
+
+def cached_entry(message):
+    _, _, _, cache_key = chat.build_chat_prompt(message)
+    entry = chat.response_cache.get_cache("chat").backend.get(cache_key)
+    return cache_key, entry
+
+
+def test_exact_hits_keep_their_expiry(asgi_app, llm_calls):
+    post_json(asgi_app, "/api/chat", {"message": "How do I grow paddy?"})
+    _, first = cached_entry("How do I grow paddy?")
+    post_json(asgi_app, "/api/chat", {"message": "how do i grow PADDY"})
+
+    assert cached_entry("How do I grow paddy?")[1] == first
+    assert len(llm_calls) == 1
+
+
+def test_entries_past_their_ttl_are_regenerated(asgi_app, llm_calls):
+    post_json(asgi_app, "/api/chat", {"message": "How do I grow paddy?"})
+    cache_key, (answer, _) = cached_entry("How do I grow paddy?")
+    cache = chat.response_cache.get_cache("chat")
+    cache.backend.set(cache_key, answer, time.time() - cache.ttl - 1)
+
+    post_json(asgi_app, "/api/chat", {"message": "How do I grow paddy?"})
+
+    assert len(llm_calls) == 2
+    assert time.time() - cached_entry("How do I grow paddy?")[1][1] < cache.ttl
@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+
+from services.cache import (
+    MemoryBackend,
+    SQLiteBackend,
+    Stamped,
+    SWRCache,
+    TieredBackend,
+)
+
+
+class Loader:
+    """Counts calls and returns the next value"""
+
+    def __init__(self, *values, delay=0):
+        self.values = list(values)
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.values[min(self.calls, len(self.values)) - 1]
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_fresh_entries_are_served_without_loading():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    loader = Loader("sunny")
+
+    assert cache.get_or_load("kochi", loader) == "sunny"
+    assert cache.get_or_load("kochi", loader) == "sunny"
+    assert loader.calls == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_stale_entries_are_served_while_refreshed_in_background():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    cache.backend.set("kochi", "old", time.time() - 90)
+    loader = Loader("new", delay=0.05)
+
+    assert cache.get_or_load("kochi", loader) == "old"
+    wait_for(lambda: cache.get("kochi") == "new")
+    assert cache.get_stats()["stale_hits"] == 1
+    assert cache.get_stats()["refreshes"] == 1
+
+
+def test_expired_entries_load_inline():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    cache.backend.set("kochi", "ancient", time.time() - 500)
+
+    assert cache.get_or_load("kochi", Loader("new")) == "new"
+
+
+def test_none_is_never_cached():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    loader = Loader(None, "sunny")
+
+    assert cache.get_or_load("kochi", loader) is None
+    assert cache.get_or_load("kochi", loader) == "sunny"
+    assert loader.calls == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    loader = Loader("sunny", delay=0.1)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_load("kochi", loader))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["sunny"] * 8
+    assert loader.calls == 1
+
+
+def test_stamped_values_age_from_their_own_time():
+    cache = SWRCache("test", MemoryBackend(), ttl=60, stale_ttl=60)
+    cache.get_or_load("kochi", lambda: Stamped("snapshot", time.time() - 90))
+
+    assert cache.lookup("kochi") is None
+    assert cache.get("kochi") == "snapshot"
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1, 0)
+    backend.set("b", 2, 0)
+    backend.get("a")
+    backend.set("c", 3, 0)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == (1, 0)
+    assert len(backend) == 2
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def test_sqlite_backend_is_shared_and_bounded(sqlite_path):
+    writer = SQLiteBackend(sqlite_path, namespace="weather", max_entries=2)
+    reader = SQLiteBackend(sqlite_path, namespace="weather")
+    for stored_at, city in enumerate(["kochi", "thrissur", "kollam"]):
+        writer.set([city, "IN"], {"temp": stored_at}, stored_at)
+
+    assert reader.get(["kollam", "IN"]) == ({"temp": 2}, 2)
+    assert reader.get(["kochi", "IN"]) is None
+    assert len(SQLiteBackend(sqlite_path, namespace="other")) == 0
+
+
+def test_sqlite_claims_let_one_process_refresh(sqlite_path):
+    first = SQLiteBackend(sqlite_path, namespace="weather")
+    second = SQLiteBackend(sqlite_path, namespace="weather")
+    first.set("kochi", "old", 0)
+
+    assert first.try_claim("kochi", 30)
+    assert not second.try_claim("kochi", 30)
+    # Storing a new value releases the claim
+    first.set("kochi", "new", 1)
+    assert second.try_claim("kochi", 30)
+
+
+def test_tiered_backend_promotes_persistent_entries(sqlite_path):
+    persistent = SQLiteBackend(sqlite_path, namespace="weather")
+    persistent.set("kochi", "sunny", 5)
+    tiered = TieredBackend(MemoryBackend(), persistent)
+
+    assert tiered.get("kochi") == ("sunny", 5)
+    assert tiered.memory.get("kochi") == ("sunny", 5)
+
+
+def test_weather_stats_endpoint(client):
+    response = client.get("/api/home/weather/stats")
+
+    assert response.status_code == 200
+    assert "hits" in response.json["data"]["cache"]
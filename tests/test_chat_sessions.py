@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import ChatSession, ChatTurn, db
+from services import chat_sessions
+
+
+def summarize(text, max_length):
+    return f"Talked about {text.count(chr(10)) + 1} turns"
+
+
+@pytest.fixture
+def lagging_folds(monkeypatch):
+    """Folds never run, as when the summarizer keeps failing"""
+    monkeypatch.setattr(chat_sessions, "_fold_in_background", lambda *args: None)
+
+
+def add_exchanges(state, count):
+    for number in range(count):
+        chat_sessions.record_exchange(
+            state, f"Question {number}", f"Answer {number}", summarize
+        )
+        state = chat_sessions.get_session(state.id)
+    return state
+
+
+def reload(session_id):
+    chat_sessions._cache.delete(session_id)
+    return chat_sessions.get_session(session_id)
+
+
+def test_follow_ups_carry_the_conversation(client):
+    session_id = client.post("/api/chat/sessions").json["data"]["session_id"]
+
+    first = client.post(
+        "/api/chat", json={"message": "How do I grow paddy?", "session_id": session_id}
+    ).json
+    client.post(
+        "/api/chat", json={"message": "And in summer?", "session_id": session_id}
+    )
+
+    assert first["session_saved"]
+    state = chat_sessions.get_session(session_id)
+    assert "User: How do I grow paddy?" in state.history()
+    details = client.get(f"/api/chat/sessions/{session_id}").json["data"]
+    assert [turn["role"] for turn in details["turns"]] == ["user", "assistant"] * 2
+
+    assert client.delete(f"/api/chat/sessions/{session_id}").status_code == 200
+    missing = client.post(
+        "/api/chat", json={"message": "Hello", "session_id": session_id}
+    )
+    assert missing.status_code == 404
+
+
+def test_cached_state_matches_a_reload(app, lagging_folds):
+    state = add_exchanges(chat_sessions.create_session(), 3)
+
+    assert state.turns == reload(state.id).turns
+    assert chat_sessions.get_stats()["cache_hits"] > 0
+
+
+def test_unsummarized_turns_are_kept_until_a_fold_catches_up(app, lagging_folds):
+    state = add_exchanges(chat_sessions.create_session(), 6)
+
+    # 12 turns, none summarized: more than the window, all still in the prompt
+    assert len(state.turns) == 12 > chat_sessions.CHAT_SESSION_WINDOW
+    assert len(reload(state.id).turns) == 12
+    assert "Question 0" in reload(state.id).history()
+
+
+def test_unsummarized_turns_are_capped(app, lagging_folds, monkeypatch):
+    monkeypatch.setattr(chat_sessions, "CHAT_SESSION_MAX_TURNS", 10)
+    state = add_exchanges(chat_sessions.create_session(), 8)
+
+    assert len(state.turns) == len(reload(state.id).turns) == 10
+    assert reload(state.id).turns[-1] == ("assistant", "Answer 7")
+
+
+def test_fold_moves_old_turns_into_the_summary(app, lagging_folds):
+    state = add_exchanges(chat_sessions.create_session(), 6)
+
+    assert chat_sessions.fold_session(state.id, summarize)
+
+    state = chat_sessions.get_session(state.id)
+    half = chat_sessions.CHAT_SESSION_WINDOW // 2
+    assert state.summarized_turns == 12 - half
+    assert len(state.turns) == half
+    assert state.summary == f"Talked about {12 - half} turns"
+    assert "Summary of the earlier conversation" in state.history()
+
+
+def test_purge_job_deletes_idle_sessions(app):
+    idle = chat_sessions.create_session()
+    add_exchanges(idle, 1)
+    active = chat_sessions.create_session()
+    db.session.get(ChatSession, idle.id).last_active = datetime.utcnow() - timedelta(
+        days=chat_sessions.CHAT_SESSION_MAX_IDLE_DAYS + 1
+    )
+    db.session.commit()
+
+    # Creating sessions does not purge; the job does
+    chat_sessions.create_session()
+    assert db.session.get(ChatSession, idle.id) is not None
+
+    assert chat_sessions.SessionPurgeJob(app).run_once() == 1
+    assert db.session.get(ChatSession, idle.id) is None
+    assert ChatTurn.query.filter_by(session_id=idle.id).count() == 0
+    assert db.session.get(ChatSession, active.id) is not None
@@ -0,0 +1,133 @@
+import pytest
+
+from services import circuit_breaker, weather_client
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.llm import StubProvider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def fail(breaker, error=RuntimeError("upstream down")):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_seconds=30)
+    for _ in range(3):
+        fail(breaker)
+
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pytest.fail("called through an open breaker")
+    state = breaker.get_state()
+    assert (state["state"], state["trips"], state["rejected"]) == ("open", 1, 1)
+
+
+def test_a_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3)
+    fail(breaker)
+    fail(breaker)
+    with breaker.guard():
+        pass
+    fail(breaker)
+
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_half_open_trial_closes_or_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+    fail(breaker)
+    clock.now += 31
+
+    # One trial at a time while half-open
+    breaker.before_call()
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.is_open()
+
+    clock.now += 31
+    with breaker.guard():
+        pass
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_excluded_and_abandoned_calls_are_not_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+    fail(breaker, ValueError("blocked content"))
+    assert breaker.state == circuit_breaker.CLOSED
+
+    fail(breaker)
+    clock.now += 31
+
+    def stream():
+        with breaker.guard():
+            yield "Paddy"
+            yield "needs water"
+
+    chunks = stream()
+    next(chunks)
+    # A client disconnect gives the trial slot back instead of failing it
+    chunks.close()
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    with breaker.guard():
+        pass
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_stub_provider_fails_fast_once_the_breaker_opens(monkeypatch):
+    monkeypatch.setitem(
+        circuit_breaker.breakers, "groq", CircuitBreaker("groq", failure_threshold=2)
+    )
+    provider = StubProvider("groq:test", latency_ms=1, error_rate=1.0, breaker="groq")
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            provider.generate("q")
+
+    calls = StubProvider.stats["calls"]
+    with pytest.raises(CircuitOpenError):
+        provider.generate("q")
+    assert StubProvider.stats["calls"] == calls
+
+
+def test_open_openweather_breaker_skips_the_request(monkeypatch):
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    breaker = circuit_breaker.get_breaker("openweather")
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+    monkeypatch.setattr(weather_client, "get_session", pytest.fail)
+
+    with pytest.raises(CircuitOpenError):
+        weather_client.fetch_weather("Kochi")
+
+
+def test_health_reports_open_circuits_as_degraded(client):
+    assert client.get("/api/health").json["status"] == "healthy"
+
+    breaker = circuit_breaker.get_breaker("gemini")
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+    health = client.get("/api/health")
+    assert health.status_code == 200
+    assert health.json["status"] == "degraded"
+    assert health.json["circuits"]["gemini"]["state"] == "open"
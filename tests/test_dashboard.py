@@ -0,0 +1,62 @@
+import threading
+import time
+
+from blueprints import home
+
+
+def sleeper(seconds, result="ok"):
+    def provider():
+        time.sleep(seconds)
+        return result
+
+    return provider
+
+
+def test_providers_run_concurrently(app):
+    started = time.monotonic()
+    results, meta = home.run_dashboard_providers(
+        {"a": sleeper(0.2, "a"), "b": sleeper(0.2, "b")}
+    )
+
+    assert results == {"a": "a", "b": "b"}
+    assert time.monotonic() - started < 0.35
+    assert set(meta["timings_ms"]) == {"a", "b"}
+
+
+def test_slow_sections_time_out_without_holding_up_the_rest(app, monkeypatch):
+    monkeypatch.setitem(home.DASHBOARD_DEADLINES, "stats", 0.05)
+    release = threading.Event()
+
+    started = time.monotonic()
+    results, meta = home.run_dashboard_providers(
+        {"stats": lambda: release.wait(2), "weather": sleeper(0, "sunny")}
+    )
+    release.set()
+
+    assert results == {"weather": "sunny"}
+    assert meta["timed_out"] == ["stats"]
+    assert time.monotonic() - started < 0.5
+
+
+def test_failing_or_empty_sections_are_degraded(app):
+    def broken():
+        raise RuntimeError("database is locked")
+
+    results, meta = home.run_dashboard_providers(
+        {"stats": broken, "weather": lambda: None, "seasonal_activities": sleeper(0)}
+    )
+
+    assert results == {"seasonal_activities": "ok"}
+    assert sorted(meta["degraded"]) == ["stats", "weather"]
+    assert meta["timed_out"] == []
+
+
+def test_dashboard_endpoint(client, openweather):
+    response = client.get("/api/home/dashboard?location=Kochi")
+
+    data = response.json["data"]
+    assert response.status_code == 200
+    assert data["weather"]["temperature"] == 29
+    assert data["advisory"] is None
+    assert data["seasonal_activities"]
+    assert "timed_out" in data["meta"]
@@ -0,0 +1,77 @@
+"""
+ModelRegistry binds models to per-key clients through google-generativeai
+internals (_ClientManager, GenerativeModel._client / _async_client); these
+tests fail if an SDK upgrade moves them, instead of calls silently going
+out on the wrong key.
+"""
+
+import asyncio
+
+import pytest
+
+genai = pytest.importorskip("google.generativeai")
+
+from services.gemini import ModelRegistry  # noqa: E402
+
+
+class CallMarker(Exception):
+    pass
+
+
+class FakeClient:
+    """Stands in for a key's client and records that it was called"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, request, **kwargs):
+        raise CallMarker(self.name)
+
+    async def agenerate_content(self, request, **kwargs):
+        raise CallMarker(self.name)
+
+
+def test_sdk_internals_exist():
+    from google.generativeai.client import _ClientManager
+
+    manager = _ClientManager()
+    manager.configure(api_key="key-a")
+    assert manager.get_default_client("generative") is not None
+
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    assert hasattr(model, "_client")
+    assert hasattr(model, "_async_client")
+
+
+def test_models_get_their_own_keys_clients():
+    registry = ModelRegistry()
+    model_a = registry.get("key-a")
+    model_b = registry.get("key-b")
+
+    assert model_a is registry.get("key-a")
+    assert model_a._client is not model_b._client
+    assert model_a._client is registry.get("key-a", system_instruction="x")._client
+
+
+def test_generate_content_uses_the_bound_client():
+    registry = ModelRegistry()
+    model = registry.get("key-a")
+    model._client = FakeClient("key-a")
+
+    with pytest.raises(CallMarker, match="key-a"):
+        model.generate_content("hello")
+
+
+def test_generate_content_async_uses_the_bound_async_client():
+    registry = ModelRegistry()
+
+    async def call():
+        model = registry.get_async("key-b")
+        assert model._async_client is not None
+        fake = FakeClient("key-b")
+        fake.generate_content = fake.agenerate_content
+        model._async_client = fake
+        await model.generate_content_async("hello")
+
+    with pytest.raises(CallMarker, match="key-b"):
+        asyncio.run(call())
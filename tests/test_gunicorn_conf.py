@@ -0,0 +1,98 @@
+import os
+import runpy
+
+import pytest
+
+import main
+from services.cache import SQLiteBackend
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "gunicorn.conf.py")
+
+GUNICORN_ENV = (
+    "GUNICORN_WORKERS",
+    "GUNICORN_THREADS",
+    "GUNICORN_UPSTREAM_CONCURRENCY",
+    "GUNICORN_TIMEOUT",
+    "GUNICORN_PRELOAD",
+    "GEMINI_TIMEOUT",
+    "GROQ_TIMEOUT",
+)
+
+
+@pytest.fixture
+def load_config(monkeypatch):
+    """Settings of gunicorn.conf.py under the given environment"""
+
+    def load(**env):
+        for name in GUNICORN_ENV:
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(CONFIG)
+
+    return load
+
+
+def test_threads_cover_the_upstream_concurrency(load_config):
+    config = load_config(GUNICORN_WORKERS="4", GUNICORN_UPSTREAM_CONCURRENCY="100")
+
+    assert config["worker_class"] == "gthread"
+    assert config["preload_app"] is True
+    assert (config["workers"], config["threads"]) == (4, 25)
+    assert config["workers"] * config["threads"] >= 100
+
+
+def test_timeout_covers_a_gemini_timeout_and_groq_failover(load_config):
+    config = load_config(GEMINI_TIMEOUT="30", GROQ_TIMEOUT="20")
+    assert config["timeout"] == config["graceful_timeout"] == 65
+
+    assert load_config(GUNICORN_TIMEOUT="120")["timeout"] == 120
+
+
+def test_at_least_two_workers_by_default(load_config):
+    assert load_config()["workers"] >= 2
+
+
+def test_workers_start_their_own_services(load_config, monkeypatch):
+    started = []
+    monkeypatch.setattr(main, "start_worker_services", started.append)
+
+    class Worker:
+        wsgi = object()
+
+    load_config()["post_worker_init"](Worker)
+    assert started == [Worker.wsgi]
+
+
+def test_background_jobs_start_only_when_enabled(app, monkeypatch):
+    started = []
+    monkeypatch.setattr(main, "SDK_WARM_UP", False)
+    monkeypatch.setattr(main, "start_prewarmer", lambda app: started.append("weather"))
+    monkeypatch.setattr(
+        main, "start_market_summary_job", lambda app: started.append("market")
+    )
+    monkeypatch.setattr(
+        main, "start_session_purge_job", lambda app: started.append("sessions")
+    )
+
+    monkeypatch.setattr(main, "CHAT_SESSION_PURGE_INTERVAL", 0)
+    main.start_worker_services(app)
+    assert started == []
+
+    monkeypatch.setenv("WEATHER_PREWARM", "true")
+    monkeypatch.setenv("MARKET_SUMMARY_JOB", "true")
+    monkeypatch.setattr(main, "CHAT_SESSION_PURGE_INTERVAL", 3600)
+    main.start_worker_services(app)
+    assert started == ["weather", "market", "sessions"]
+
+
+def test_sqlite_cache_reconnects_in_a_forked_worker(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    backend.set("key", "answer", 1.0)
+    parent = backend._connect()
+    assert backend._connect() is parent
+
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+
+    assert backend._connect() is not parent
+    assert backend.get("key") == ("answer", 1.0)
@@ -0,0 +1,104 @@
+import json
+
+from blueprints import knowledge
+from conftest import read_events
+from services.streaming import iter_text
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStreamingResponse:
+    """A streaming Gemini response whose gRPC iterator can be cancelled"""
+
+    def __init__(self, *texts):
+        self.texts = texts
+        self.cancelled = False
+        self._iterator = self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __iter__(self):
+        return iter(Chunk(text) for text in self.texts)
+
+
+def test_iter_text_cancels_when_closed_early():
+    response = FakeStreamingResponse("Paddy ", "needs ", "water.")
+    texts = iter_text(response)
+
+    assert next(texts) == "Paddy "
+    texts.close()
+    assert response.cancelled
+
+
+def test_iter_text_leaves_finished_streams_alone():
+    response = FakeStreamingResponse("Paddy ", "needs ", "water.")
+
+    assert "".join(iter_text(response)) == "Paddy needs water."
+    assert not response.cancelled
+
+
+def test_closing_the_event_stream_closes_the_generation(monkeypatch):
+    closed = []
+
+    def generation(*args, **kwargs):
+        try:
+            yield "Paddy "
+            yield "needs water."
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(knowledge.llm_router, "stream", generation)
+    events = knowledge.stream_generation_events([], "prompt", "content", {}, "n/a")
+
+    assert next(events) == 'data: {"delta": "Paddy "}\n\n'
+    # What the WSGI server does when the client disconnects
+    events.close()
+    assert closed == [True]
+
+
+def test_content_stream_ends_with_the_json_body(client):
+    events = read_events(
+        client.post(
+            "/api/knowledge/content/stream",
+            json={"prompt": "Coconut care", "category_id": 2},
+        )
+    )
+
+    deltas = [data["delta"] for event, data in events if event == "message"]
+    event, done = events[-1]
+    assert event == "done"
+    assert done["success"] and done["category_id"] == 2
+    assert done["content"] == "".join(deltas)
+
+
+def test_weather_analysis_stream_includes_the_weather(client, openweather):
+    response = client.get(
+        "/api/knowledge/weather-analysis", headers={"Accept": "text/event-stream"}
+    )
+
+    event, done = read_events(response)[-1]
+    assert event == "done"
+    assert done["weather_data"]["temperature"] == 29.0
+    assert done["analysis"]
+
+
+def test_stream_errors_send_the_generic_message(client, monkeypatch):
+    def broken(*args, **kwargs):
+        yield "Coconut "
+        raise RuntimeError("429 quota exceeded for key AIza-secret")
+
+    monkeypatch.setattr(knowledge.llm_router, "stream", broken)
+
+    events = read_events(
+        client.post("/api/knowledge/content/stream", json={"prompt": "Coconut care"})
+    )
+
+    assert events[-1] == (
+        "error",
+        {"success": False, "error": "Unable to generate content at this moment."},
+    )
+    assert "AIza" not in json.dumps(events)
@@ -0,0 +1,46 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(statement, **env):
+    """Which of main.LAZY_SDKS a fresh interpreter has loaded after `statement`"""
+    script = (
+        f"import json, sys\n{statement}\n"
+        f"print(json.dumps([m for m in {list(main.LAZY_SDKS)!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env={**os.environ, "LLM_BACKEND": "stub", **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_importing_main_does_not_load_the_sdks():
+    assert loaded_after("import main") == []
+
+
+def test_building_the_app_without_services_does_not_load_them():
+    assert loaded_after("import main; main.create_app(start_services=False)") == []
+
+
+def test_warm_up_loads_the_installed_sdks():
+    loaded = loaded_after("import main; main.warm_up_sdks()")
+
+    assert "requests" in loaded
+    installed = [
+        name
+        for name in main.LAZY_SDKS
+        if importlib.util.find_spec(name.split(".")[0]) is not None
+    ]
+    assert loaded == installed
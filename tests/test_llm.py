@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from services import circuit_breaker, llm
+from services.llm import StubProvider, StubProviderError
+
+
+def stub(**options):
+    return StubProvider("stub:test", latency_ms=1, latency_sigma=0, **options)
+
+
+def test_stub_backend_is_selected_by_env():
+    assert llm.LLM_BACKEND == "stub"
+    assert isinstance(llm.get_gemini("GEMINI_API_KEY_1"), StubProvider)
+    assert isinstance(llm.get_groq(), StubProvider)
+    assert llm.model_label("gemini-2.5-flash") == "stub"
+
+
+def test_replies_depend_only_on_the_prompt():
+    provider = stub(response_words=40)
+
+    reply = provider.generate("How do I grow paddy?")
+    assert reply == stub(response_words=40).generate("How do I grow paddy?")
+    assert reply != provider.generate("How do I grow banana?")
+    assert reply.startswith("(stub:test) Reply to: How do I grow paddy?")
+    assert len(reply.split()) >= 40
+
+
+def test_canned_response_and_token_limit():
+    assert stub(response="Echo: {prompt}").generate("a\nb\nlast line") == (
+        "Echo: last line"
+    )
+    assert len(stub(response_words=200).generate("q", max_tokens=20).split()) < 40
+
+
+def test_stream_yields_the_same_text_as_generate():
+    provider = stub()
+    chunks = list(provider.stream("How do I grow paddy?"))
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == provider.generate("How do I grow paddy?")
+
+
+def test_agenerate_matches_generate():
+    provider = stub()
+
+    reply = asyncio.run(provider.agenerate("How do I grow paddy?"))
+    assert reply == provider.generate("How do I grow paddy?")
+
+
+def test_failures_raise_and_count_against_the_breaker():
+    provider = stub(error_rate=1.0, breaker="groq")
+
+    with pytest.raises(StubProviderError):
+        provider.generate("q")
+    with pytest.raises(StubProviderError):
+        list(provider.stream("q"))
+    assert circuit_breaker.get_breaker("groq").stats["failures"] == 2
+
+
+def test_multimodal_prompts_use_their_text_parts():
+    provider = stub(response="{prompt}")
+
+    assert provider.generate(["Identify this leaf", object()]) == "Identify this leaf"
+
+
+def test_base_provider_stream_falls_back_to_generate():
+    class Echo(llm.LLMProvider):
+        def generate(self, prompt, system=None, max_tokens=None, temperature=None):
+            return prompt.upper()
+
+    assert list(Echo().stream("paddy")) == ["PADDY"]
+    assert asyncio.run(Echo().agenerate("paddy")) == "PADDY"
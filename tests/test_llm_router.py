@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from services import llm_router
+from services.llm import StubProvider, StubProviderError
+from services.llm_router import LLMRouter
+
+
+@pytest.fixture(autouse=True)
+def few_samples(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_ROUTER_MIN_SAMPLES", 2)
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_MIN_MS", 10)
+
+
+def stub(name, latency_ms=1, **options):
+    return StubProvider(
+        name, latency_ms=latency_ms, latency_sigma=0, response="{prompt}", **options
+    )
+
+
+def warm(router, task, *providers, calls=3):
+    for provider in providers:
+        for _ in range(calls):
+            router.generate(task, [provider], "warm up")
+
+
+def test_fastest_healthy_provider_is_tried_first():
+    router = LLMRouter()
+    slow, fast = stub("gemini:slow", latency_ms=40), stub("groq:fast")
+    warm(router, "generate", slow, fast)
+
+    assert router.rank([slow, fast], "generate", "reply") == [fast, slow]
+    assert router.generate("generate", [slow, fast], "paddy") == "paddy"
+    assert llm_router.answered_by() == "GROQ"
+
+
+def test_failures_fail_over_and_demote_the_provider():
+    router = LLMRouter()
+    broken, backup = stub("gemini:broken", error_rate=1.0), stub("groq:backup")
+
+    assert router.generate("generate", [broken, backup], "paddy") == "paddy"
+    assert router.stats["failovers"] == 1
+    with pytest.raises(StubProviderError):
+        router.generate("generate", [broken], "paddy")
+
+    assert router.rank([broken, backup], "generate", "reply") == [backup, broken]
+
+
+def test_latency_is_tracked_per_task_class():
+    router = LLMRouter()
+    gemini, groq = stub("gemini:g", latency_ms=40), stub("groq:q")
+    warm(router, "generate", gemini, groq)
+    warm(router, "summarize", gemini)
+
+    # No summarize samples for groq yet, so the configured order stands
+    assert router.rank([gemini, groq], "summarize", "reply") == [gemini, groq]
+    stats = router.get_stats()["providers"]
+    assert stats["gemini:g:stub"]["summarize"]["reply"]["samples"] == 3
+    assert stats["groq:q:stub"]["summarize"]["reply"]["samples"] == 0
+
+
+def test_slow_calls_are_hedged_on_hedged_tasks(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_TASKS", {"generate"})
+    router = LLMRouter()
+    gemini, groq = stub("gemini:g", latency_ms=20), stub("groq:q", latency_ms=40)
+    warm(router, "generate", gemini, groq)
+    gemini.latency_ms = 500
+
+    assert router.generate("generate", [gemini, groq], "paddy") == "paddy"
+    assert llm_router.answered_by() == "GROQ"
+    assert (router.stats["hedges"], router.stats["hedge_wins"]) == (1, 1)
+
+
+def test_unhedged_tasks_wait_for_the_first_provider():
+    router = LLMRouter()
+    gemini, groq = stub("gemini:g", latency_ms=20), stub("groq:q", latency_ms=20)
+    warm(router, "summarize", gemini, groq)
+    gemini.latency_ms = 100
+
+    router.generate("summarize", [gemini, groq], "paddy")
+    assert router.stats["hedges"] == 0
+
+
+def test_agenerate_reports_the_answering_backend():
+    router = LLMRouter()
+    broken, backup = stub("groq:broken", error_rate=1.0), stub("gemini:backup")
+
+    async def main():
+        reply = await router.agenerate("generate", [broken, backup], "paddy")
+        return reply, llm_router.answered_by()
+
+    assert asyncio.run(main()) == ("paddy", "GEMINI")
+
+
+def test_quick_query_reports_the_provider_then_the_cache(client):
+    query = {"query": "Coconut prices", "type": "general"}
+
+    first = client.post("/api/quick-query", json=query).json
+    second = client.post("/api/quick-query", json=query).json
+
+    assert first["powered_by"] in ("GEMINI", "GROQ")
+    assert second["powered_by"] == "cache"
+    assert first["response"] == second["response"]
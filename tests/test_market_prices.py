@@ -0,0 +1,74 @@
+import pytest
+
+from models import MarketPrice
+from services import market_prices
+from services.cache import MemoryBackend, SWRCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot_cache(monkeypatch):
+    monkeypatch.setattr(
+        market_prices,
+        "snapshot_cache",
+        SWRCache("market-prices", MemoryBackend(), ttl=300, stale_ttl=0),
+    )
+
+
+def rows(commodity, *prices, market="Ernakulam", unit="kg"):
+    return [
+        {
+            "commodity": commodity,
+            "market": market,
+            "date": f"2026-10-{day:02d}",
+            "price": price,
+            "unit": unit,
+        }
+        for day, price in enumerate(prices, start=1)
+    ]
+
+
+def test_default_prices_until_any_are_loaded(app):
+    assert market_prices.get_price_snapshot() == market_prices.DEFAULT_PRICES
+
+
+def test_load_prices_upserts_and_skips_invalid_rows(app):
+    assert market_prices.load_prices(rows("Rice", 44.0, 45.0)) == 2
+    loaded = market_prices.load_prices(
+        rows("Rice", 44.5) + [{"commodity": "Rice", "price": "n/a"}]
+    )
+
+    assert loaded == 1
+    assert MarketPrice.query.count() == 2
+    assert MarketPrice.query.filter_by(date="2026-10-01").one().price == 44.5
+
+
+def test_loading_invalidates_the_snapshot(app):
+    market_prices.load_prices(rows("Rice", 40.0))
+    assert market_prices.get_price_snapshot()[0]["price"] == 40.0
+
+    market_prices.load_prices(rows("Rice", 40.0, 42.0))
+    assert market_prices.get_price_snapshot()[0]["price"] == 42.0
+
+
+def test_markets_are_averaged_per_day(app):
+    market_prices.load_prices(rows("Rice", 44.0) + rows("Rice", 46.0, market="Kochi"))
+
+    (rice,) = market_prices.get_price_snapshot()
+    assert rice["price"] == 45.0
+    assert rice["date"] == "2026-10-01"
+
+
+def test_sample_file_loads(app):
+    assert market_prices.load_prices_from_file(market_prices.SAMPLE_PRICES_PATH) > 0
+    names = {entry["name"] for entry in market_prices.get_price_snapshot()}
+    assert {"Rice", "Coconut"} <= names
+
+
+def test_dashboard_serves_stored_prices(client, app, openweather):
+    market_prices.load_prices(rows("Cardamom", 1200.0, unit="kg"))
+
+    response = client.get("/api/home/dashboard")
+
+    (cardamom,) = response.json["data"]["market_prices"]
+    assert cardamom["name"] == "Cardamom"
+    assert cardamom["price"] == 1200.0
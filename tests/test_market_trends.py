@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from services.market_prices import PriceHistoryView, compute_trends
+
+START = date(2026, 9, 1)
+
+
+def view(**series):
+    """A view from {commodity: [price per day, None for a missing day]}"""
+    return PriceHistoryView.from_rows(
+        [
+            (commodity, START + timedelta(days=day), price, "kg")
+            for commodity, prices in series.items()
+            for day, price in enumerate(prices)
+            if price is not None
+        ]
+    )
+
+
+def trend(name, **series):
+    return next(
+        entry for entry in compute_trends(view(**series)) if entry["name"] == name
+    )
+
+
+def test_missing_days_are_forward_filled():
+    prices = view(rice=[40.0, None, None, 43.0], coconut=[None, 30.0, None, None])
+
+    np.testing.assert_array_equal(prices.series("rice")[1], [40, 40, 40, 43])
+    np.testing.assert_array_equal(prices.series("coconut")[1], [np.nan, 30, 30, 30])
+    assert prices.dates[0] == np.datetime64("2026-09-01")
+
+
+def test_percent_changes():
+    # 31 days rising by 1 a day: 100 -> 130
+    rice = trend("rice", rice=[100.0 + day for day in range(31)])
+
+    assert rice["price"] == 130.0
+    assert rice["change_1d"] == pytest.approx(100 / 129, abs=0.1)
+    assert rice["change_7d"] == pytest.approx(700 / 123, abs=0.1)
+    assert rice["change_30d"] == 30.0
+    assert rice["change"] == rice["change_7d"]
+
+
+def test_moving_averages_need_a_full_window():
+    rice = trend("rice", rice=[10.0] * 3 + [20.0] * 7)
+
+    assert rice["ma_7"] == 20.0
+    assert rice["ma_30"] is None
+    assert rice["change_30d"] is None
+
+
+def test_short_history_has_no_week_change():
+    rice = trend("rice", rice=[40.0, 41.0])
+
+    assert rice["change_7d"] is None
+    assert rice["change"] == 0.0
+    assert rice["volatility_30d"] is None
+
+
+def test_volatility_of_daily_returns():
+    steady = trend("steady", steady=[50.0] * 31, swinging=[50.0, 55.0] * 15 + [50.0])
+    swinging = trend(
+        "swinging", steady=[50.0] * 31, swinging=[50.0, 55.0] * 15 + [50.0]
+    )
+
+    assert steady["volatility_30d"] == 0.0
+    assert swinging["volatility_30d"] > 5
+
+
+def test_commodities_are_computed_independently():
+    trends = compute_trends(view(rice=[40.0] * 8, pepper=[None] * 7 + [650.0]))
+
+    assert [entry["name"] for entry in trends] == ["pepper", "rice"]
+    pepper = trends[0]
+    assert pepper["price"] == 650.0
+    assert pepper["change_1d"] is None
+    assert pepper["date"] == trends[1]["date"] == "2026-09-08"
+
+
+def test_empty_view():
+    assert compute_trends(PriceHistoryView.from_rows([])) is None
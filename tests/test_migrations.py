@@ -0,0 +1,95 @@
+import os
+import sqlite3
+
+import pytest
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+
+import db_manager
+from models import db
+
+MIGRATIONS = os.path.join(os.path.dirname(db_manager.__file__), "migrations")
+BASELINE = "cc4c215f7b3d"
+
+
+@pytest.fixture
+def migrate_to(tmp_path, monkeypatch):
+    path = tmp_path / "migrated.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    app, _ = db_manager.create_app()
+
+    def run(revision="head"):
+        with app.app_context():
+            upgrade(directory=MIGRATIONS, revision=revision)
+        return sqlite3.connect(path)
+
+    return run
+
+
+def test_weather_logs_migration_keeps_the_newest_row_per_day(migrate_to):
+    connection = migrate_to(BASELINE)
+    connection.executemany(
+        "INSERT INTO weather_logs (location, date, temperature_max, date_created) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            ("Kochi", "2026-10-01", 30.0, "2026-10-01 01:00:00"),
+            ("Kochi", "2026-10-01", 31.0, "2026-10-01 02:00:00"),
+            ("Kollam", "2026-10-01", 29.0, "2026-10-01 03:00:00"),
+        ],
+    )
+    connection.commit()
+
+    connection = migrate_to()
+    rows = connection.execute(
+        "SELECT location, country, temperature_max, date_updated "
+        "FROM weather_logs ORDER BY location"
+    ).fetchall()
+    assert rows == [
+        ("Kochi", "IN", 31.0, "2026-10-01 02:00:00"),
+        ("Kollam", "IN", 29.0, "2026-10-01 03:00:00"),
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute(
+            "INSERT INTO weather_logs (location, country, date, date_created, "
+            "date_updated) VALUES ('Kochi', 'IN', '2026-10-01', '', '')"
+        )
+
+
+def test_market_prices_migration(migrate_to):
+    connection = migrate_to()
+    connection.execute(
+        "INSERT INTO market_prices (commodity, market, date, price, date_created) "
+        "VALUES ('Rice', 'Kochi', '2026-10-01', 45.0, '')"
+    )
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute(
+            "INSERT INTO market_prices (commodity, market, date, price, date_created) "
+            "VALUES ('Rice', 'Kochi', '2026-10-01', 46.0, '')"
+        )
+
+
+def test_chat_sessions_migration(migrate_to):
+    connection = migrate_to()
+    connection.execute(
+        "INSERT INTO chat_sessions (id, summarized_turns, turn_count, date_created, "
+        "last_active) VALUES ('abc', 0, 1, '', '')"
+    )
+    connection.execute(
+        "INSERT INTO chat_turns (session_id, position, role, content, date_created) "
+        "VALUES ('abc', 0, 'user', 'Paddy?', '')"
+    )
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute(
+            "INSERT INTO chat_turns (session_id, position, role, content, "
+            "date_created) VALUES ('abc', 0, 'assistant', 'Water it.', '')"
+        )
+
+
+def test_head_matches_the_models(migrate_to, tmp_path):
+    migrate_to()
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert compare_metadata(context, db.metadata) == []
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+from blueprints import chat
+from services import gemini, groq_chat, prompts
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty template registry"""
+    monkeypatch.setattr(prompts, "_templates", {})
+    monkeypatch.setattr(prompts, "_by_system", {})
+
+
+def test_render_formats_only_the_dynamic_part(registry):
+    template = prompts.register("test", "You are a farming assistant.", "Q: {message}")
+
+    assert template.render(message="Paddy?") == (
+        "You are a farming assistant.",
+        "Q: Paddy?",
+    )
+    with pytest.raises(KeyError, match="message"):
+        template.render()
+    with pytest.raises(ValueError):
+        prompts.register("test", "Another prompt")
+
+
+def test_chat_system_prompt_is_the_same_on_every_request():
+    first, first_prompt, _, _ = chat.build_chat_prompt("How do I grow paddy?")
+    second, second_prompt, _, _ = chat.build_chat_prompt("Pests in banana?")
+
+    assert first == second == chat.CHAT_PROMPTS["en"].system
+    assert "How do I grow paddy?" in first_prompt
+    assert "How do I grow paddy?" not in first
+
+
+def test_provider_usage_is_counted_per_template(registry):
+    template = prompts.register("test", "You are a farming assistant.")
+    gemini.record_usage(
+        template.system,
+        SimpleNamespace(
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=1200, cached_content_token_count=900
+            )
+        ),
+    )
+    groq_chat.record_usage(
+        {"messages": [{"role": "system", "content": template.system}]},
+        SimpleNamespace(usage=SimpleNamespace(prompt_tokens=800)),
+    )
+    # Calls without a registered system prompt are not counted anywhere
+    prompts.record_usage("Some other prompt", 500, 500)
+
+    stats = prompts.get_stats()["test"]
+    assert (stats["measured_calls"], stats["prompt_tokens"]) == (2, 2000)
+    assert stats["cached_tokens_per_call"] == 450
+    assert stats["cached_ratio"] == 0.45
+
+
+def test_current_prompts_are_below_the_implicit_cache_minimum(monkeypatch):
+    stats = prompts.get_stats()
+
+    assert stats
+    assert not any(template["implicit_cache_eligible"] for template in stats.values())
+
+    monkeypatch.setattr(prompts, "GEMINI_IMPLICIT_CACHE_MIN_TOKENS", 100)
+    assert prompts.get("chat.en").cache_eligible()
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from services import llm_router, rate_limiter
+from services.llm import StubProvider
+from services.llm_router import LLMRouter
+from services.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitExceeded,
+    RateScheduler,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """A fresh scheduler: KEY_A and KEY_B allow one request a minute"""
+    for name in ("KEY_A", "KEY_B"):
+        monkeypatch.setenv(f"{name}_RPM", "1")
+    scheduler = RateScheduler()
+    monkeypatch.setattr(rate_limiter, "scheduler", scheduler)
+    return scheduler
+
+
+def test_estimate_counts_text_images_and_the_reply():
+    assert rate_limiter.estimate_tokens("x" * 400, 100) == 200
+    assert rate_limiter.estimate_tokens(["x" * 40, object()], 10) == (
+        10 + rate_limiter.IMAGE_TOKENS + 10
+    )
+    assert rate_limiter.estimate_tokens("") == rate_limiter.GEMINI_RATE_OUTPUT_TOKENS
+
+
+def test_bucket_refills_at_its_rate(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(60)
+
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    now[0] += 30
+    assert bucket.available() == 30
+    # Larger calls than the bucket holds wait for a full bucket, not forever
+    assert bucket.wait_time(1000) == 30.0
+    assert TokenBucket(0).wait_time(10**6) == 0.0
+
+
+def test_calls_spill_onto_the_next_key(scheduler):
+    assert scheduler.acquire(["KEY_A", "KEY_B"], 10) == "KEY_A"
+    assert scheduler.acquire(["KEY_A", "KEY_B"], 10) == "KEY_B"
+
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire(["KEY_A", "KEY_B"], 10, max_wait=0.1)
+    stats = scheduler.get_stats()
+    assert (stats["granted"], stats["spilled"], stats["rejected"]) == (2, 1, 1)
+    assert stats["keys"]["KEY_B"]["spilled_in"] == 1
+
+
+def test_unset_limits_never_wait():
+    scheduler = RateScheduler()
+
+    for _ in range(100):
+        assert scheduler.acquire(["GEMINI_TEST_KEY"], 10**6, max_wait=0) == (
+            "GEMINI_TEST_KEY"
+        )
+
+
+def test_interactive_calls_are_served_before_background_ones(monkeypatch):
+    monkeypatch.setenv("KEY_C_RPM", "600")
+    scheduler = RateScheduler()
+    scheduler.acquire(["KEY_C"], 1)
+    with scheduler._cond:
+        scheduler._budget("KEY_C").requests.level = 0
+    served = []
+
+    def call(level):
+        scheduler.acquire(["KEY_C"], 1, level=level, max_wait=2)
+        served.append(level)
+
+    background = threading.Thread(target=call, args=(BACKGROUND,))
+    interactive = threading.Thread(target=call, args=(INTERACTIVE,))
+    background.start()
+    time.sleep(0.02)
+    interactive.start()
+    background.join()
+    interactive.join()
+
+    assert served == [INTERACTIVE, BACKGROUND]
+
+
+def test_priority_context_sets_the_default_level():
+    assert rate_limiter.current_priority() == INTERACTIVE
+    with rate_limiter.priority(BACKGROUND):
+        assert rate_limiter.current_priority() == BACKGROUND
+    assert rate_limiter.current_priority() == INTERACTIVE
+
+
+def test_router_fails_over_without_counting_an_error(scheduler, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "GEMINI_RATE_MAX_WAIT", 0.05)
+    router = LLMRouter()
+    gemini = StubProvider(
+        "gemini:paced", latency_ms=1, response="gemini", rate_keys=["KEY_A"]
+    )
+    groq = StubProvider("groq:backup", latency_ms=1, response="groq")
+
+    replies = [router.generate("generate", [gemini, groq], "q") for _ in range(2)]
+
+    assert replies == ["gemini", "groq"]
+    assert llm_router.answered_by() == "GROQ"
+    stats = router.get_stats()["providers"]["gemini:paced:stub"]["generate"]
+    assert stats["reply"]["samples"] == 1
+    assert stats["reply"]["error_rate"] == 0
@@ -0,0 +1,100 @@
+import pytest
+
+from blueprints import chat
+from services import llm_router
+from services.response_cache import make_key, normalize_prompt
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Prompts that reached llm_router.generate"""
+    calls = []
+    generate = llm_router.generate
+
+    def counting(task, factories, prompt, **options):
+        calls.append(prompt)
+        return generate(task, factories, prompt, **options)
+
+    monkeypatch.setattr(llm_router, "generate", counting)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("How to grow Paddy?", "how to grow paddy"),
+        ("  pests   in banana!! ", "Pests in banana"),
+        ("നെല്ലിന് വളം?", "നെല്ലിന് വളം"),
+        # Decomposed and precomposed forms of the same text
+        ("Café crops", "Café crops"),
+    ],
+)
+def test_equivalent_questions_normalize_alike(first, second):
+    assert normalize_prompt(first) == normalize_prompt(second)
+
+
+def test_malayalam_vowel_signs_and_joiners_are_kept():
+    assert normalize_prompt("വളം") != normalize_prompt("വള")
+    assert "‍" in normalize_prompt("ന്‍")
+
+
+def test_key_includes_weather_and_variant():
+    assert make_key("Rain?", "en", "m") != make_key("Rain?", "en", "m", (28, "rain"))
+    assert make_key("Rain?", "en", "m", variant="summary") != make_key(
+        "Rain?", "en", "m", variant="general"
+    )
+    assert make_key("Rain?", "en", "m", [28, "rain"])[3] == (28, "rain")
+
+
+def test_repeated_chat_questions_are_answered_from_the_cache(client, llm_calls):
+    first = client.post("/api/chat", json={"message": "How do I grow paddy?"})
+    second = client.post("/api/chat", json={"message": "how do i grow PADDY"})
+
+    assert first.json["response"] == second.json["response"]
+    assert len(llm_calls) == 1
+    stats = client.get("/api/chat/cache/stats").json["data"]["exact"]["chat"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_fallback_answers_are_not_cached(client, monkeypatch):
+    generate = chat.generate_chat_response
+    failures = [RuntimeError("upstream down")]
+
+    def flaky(*args):
+        if failures:
+            raise failures.pop()
+        return generate(*args)
+
+    monkeypatch.setattr(chat, "generate_chat_response", flaky)
+    fallback = client.post("/api/chat", json={"message": "How do I grow paddy?"})
+    answer = client.post("/api/chat", json={"message": "How do I grow paddy?"})
+
+    assert fallback.json["response"] == chat.get_fallback_response(
+        "How do I grow paddy?", "en"
+    )
+    assert answer.json["response"] != fallback.json["response"]
+
+
+def test_quick_queries_are_cached_per_type(client, llm_calls):
+    for task_type in ["general", "general", "summary"]:
+        response = client.post(
+            "/api/quick-query", json={"query": "Coconut prices", "type": task_type}
+        )
+        assert response.status_code == 200
+
+    assert len(llm_calls) == 2
+
+
+def test_classifications_are_not_cached(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        chat,
+        "get_groq_classification",
+        lambda text, categories: calls.append(text) or categories[0],
+    )
+    for _ in range(2):
+        client.post(
+            "/api/quick-query", json={"query": "Leaf spots", "type": "classify"}
+        )
+
+    assert len(calls) == 2
@@ -0,0 +1,103 @@
+import pytest
+
+from services.semantic_cache import SemanticCache, exact_terms
+
+CONTEXT = ("en", "gemini", None)
+
+# Near-identical wording, different questions: must never share an answer
+DIFFERENT_QUESTIONS = [
+    ("fertilizer dose for 2 acres paddy", "fertilizer dose for 20 acres paddy"),
+    ("1 acre", "10 acre"),
+    ("fertilizer dose for 1 acre paddy", "fertilizer dose for 10 acre paddy"),
+    (
+        "should I spray pesticide before rain",
+        "should I not spray pesticide before rain",
+    ),
+    ("spray pesticide before rain", "don't spray pesticide before rain"),
+    ("നെല്ലിന് വളം വേണം", "നെല്ലിന് വളം വേണ്ട"),
+]
+
+SAME_QUESTIONS = [
+    ("how to control pests in banana", "how do I control pests in my banana"),
+    ("best fertilizer for paddy", "which fertilizer is best for paddy"),
+    ("fertilizer dose for 2 acres paddy", "Fertilizer dose for 2 acres, paddy?"),
+]
+
+
+@pytest.mark.parametrize("cached, asked", DIFFERENT_QUESTIONS)
+def test_numbers_and_negations_never_match(cached, asked):
+    cache = SemanticCache("test", threshold=0.0)
+    cache.add(cached, CONTEXT, "answer")
+
+    assert cache.lookup(asked, CONTEXT) is None
+
+
+@pytest.mark.parametrize("cached, asked", SAME_QUESTIONS)
+def test_rewordings_match(cached, asked):
+    cache = SemanticCache("test")
+    cache.add(cached, CONTEXT, "answer")
+
+    assert cache.lookup(asked, CONTEXT) == "answer"
+
+
+def test_exact_terms():
+    assert exact_terms("dose for 02 acres and 5 cents") == (("2", "5"), False)
+    assert exact_terms("do not irrigate") == ((), True)
+    assert exact_terms("ചെയ്യരുത്") == ((), True)
+    assert exact_terms("നല്ല വിത്ത്") == ((), False)
+
+
+def test_context_ids_are_dropped_with_their_last_row():
+    cache = SemanticCache("test", max_entries=4)
+    for crop in ["paddy", "banana", "pepper", "coconut", "rubber", "ginger"]:
+        cache.add(f"pests in {crop}", ("en", crop), "answer")
+
+    assert len(cache._context_ids) == 4
+    assert cache.lookup("pests in paddy", ("en", "paddy")) is None
+    assert cache.lookup("pests in ginger", ("en", "ginger")) == "answer"
+
+
+def test_lsh_index_takes_over_above_the_brute_force_limit():
+    cache = SemanticCache("test", max_entries=100, brute_force_max=20)
+    for n in range(30):
+        cache.add(f"question about crop variety {n}", CONTEXT, f"answer {n}")
+
+    assert cache.get_stats()["index"] == "lsh"
+    assert cache.lookup("question about crop variety 7?", CONTEXT) == "answer 7"
+
+
+@pytest.fixture
+def semantic_chat(monkeypatch):
+    from services import semantic_cache
+
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setitem(semantic_cache.endpoint_caches, "chat", SemanticCache("chat"))
+
+
+def ask(client, message):
+    # Reading the body runs the stream to the end, where answers are stored
+    client.post("/api/chat/stream", json={"message": message}).get_data()
+
+
+def stored_at(message):
+    from blueprints import chat
+
+    _, _, _, cache_key = chat.build_chat_prompt(message)
+    entry = chat.response_cache.get_cache("chat").backend.get(cache_key)
+    return entry and entry[1]
+
+
+def test_exact_hits_keep_their_expiry(client, semantic_chat):
+    ask(client, "How do I grow paddy?")
+    first = stored_at("How do I grow paddy?")
+    ask(client, "How do I grow paddy?")
+
+    assert first is not None
+    assert stored_at("How do I grow paddy?") == first
+
+
+def test_semantic_hits_are_stored_as_exact_entries(client, semantic_chat):
+    ask(client, "how to control pests in banana")
+    ask(client, "how do I control pests in my banana")
+
+    assert stored_at("how do I control pests in my banana") is not None
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.singleflight import (
+    AsyncSingleFlight,
+    SingleFlight,
+    SQLiteSingleFlight,
+    make_key,
+)
+
+
+class SlowCall:
+    def __init__(self, result="answer", delay=0.1, error=None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(fn, count=8):
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(fn) for _ in range(count)]
+    return futures
+
+
+def test_make_key_is_stable_across_argument_order():
+    assert make_key("stub", {"a": 1, "b": 2}) == make_key("stub", {"b": 2, "a": 1})
+    assert make_key("stub", "prompt") != make_key("stub", "prompt", None)
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    call = SlowCall()
+
+    futures = run_concurrently(lambda: flight.do("key", call))
+
+    assert [future.result() for future in futures] == ["answer"] * 8
+    assert call.calls == 1
+    assert flight.get_stats() == {"calls": 1, "shared": 7, "errors": 0, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    failing = SlowCall(error=RuntimeError("quota exceeded"))
+
+    futures = run_concurrently(lambda: flight.do("key", failing))
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="quota exceeded"):
+            future.result()
+    assert failing.calls == 1
+    # The next call runs again instead of replaying the failure
+    assert flight.do("key", SlowCall(delay=0)) == "answer"
+
+
+def test_different_keys_do_not_wait_on_each_other():
+    flight = SingleFlight()
+    started = time.monotonic()
+
+    threads = [
+        threading.Thread(target=flight.do, args=(key, SlowCall(delay=0.2)))
+        for key in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started < 0.35
+
+
+def test_async_calls_share_one_task_and_survive_a_cancelled_caller():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        loser = asyncio.ensure_future(flight.do("key", fetch))
+        others = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        loser.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(main()) == ["answer"] * 3
+    assert len(calls) == 1
+
+
+def test_sqlite_flight_shares_a_result_across_instances(tmp_path):
+    path = str(tmp_path / "flight.db")
+    # Separate instances stand in for separate gunicorn workers
+    leader, follower = SQLiteSingleFlight(path), SQLiteSingleFlight(path)
+    call = SlowCall(result={"text": "answer"}, delay=0.2)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(leader.do, "key", call)
+        time.sleep(0.05)
+        second = executor.submit(follower.do, "key", call)
+
+    assert first.result() == second.result() == {"text": "answer"}
+    assert call.calls == 1
+    assert follower.get_stats()["shared"] == 1
+
+
+def test_sqlite_flight_lets_a_waiter_retry_after_a_failure(tmp_path):
+    path = str(tmp_path / "flight.db")
+    leader, follower = SQLiteSingleFlight(path), SQLiteSingleFlight(path)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(
+            leader.do, "key", SlowCall(error=RuntimeError("down"), delay=0.1)
+        )
+        time.sleep(0.03)
+        second = executor.submit(follower.do, "key", SlowCall(delay=0))
+
+    with pytest.raises(RuntimeError):
+        first.result()
+    assert second.result() == "answer"
+    assert follower.get_stats()["leads"] == 1
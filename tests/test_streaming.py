@@ -0,0 +1,121 @@
+import json
+import random
+
+import pytest
+
+from blueprints import chat
+from conftest import read_events
+from services.streaming import TextChunker, sse_event
+
+TEXT = (
+    "Hello farmer! Paddy needs standing water.\n\n"
+    "1. Keep 5 cm of water in the field.\n"
+    "2. Apply **urea** in two splits:  first at tillering.\n"
+    "Watch for stem borer. " + "word " * 60 + "end."
+)
+
+
+def random_chunks(text, rng):
+    cuts = sorted(rng.sample(range(1, len(text)), 12))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunker_cuts_only_before_whitespace(seed):
+    chunker = TextChunker(max_chars=40)
+    segments = []
+    for chunk in random_chunks(TEXT, random.Random(seed)):
+        segments += chunker.feed(chunk)
+    segments.append(chunker.flush())
+
+    assert "".join(segments) == TEXT
+    # Every later segment starts with the whole whitespace run it was cut at
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment[0].isspace() and not previous[-1].isspace()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_segment_post_processing_matches_the_whole_text(seed):
+    chunker = TextChunker(max_chars=40)
+    parts = []
+    for chunk in random_chunks(TEXT, random.Random(seed)):
+        for segment in chunker.feed(chunk):
+            parts.append(chat.format_ai_response(segment, strip=False))
+    parts.append(chat.format_ai_response(chunker.flush(), strip=False))
+
+    assert "".join(parts).strip() == chat.format_ai_response(TEXT)
+
+
+def test_sse_event_encoding():
+    assert sse_event({"delta": "നെല്ല്"}) == 'data: {"delta": "നെല്ല്"}\n\n'
+    assert sse_event({}, event="done") == "event: done\ndata: {}\n\n"
+
+
+def test_chat_stream_matches_the_json_response(client):
+    message = {"message": "How do I grow paddy?"}
+    events = read_events(client.post("/api/chat/stream", json=message))
+
+    deltas = [data["delta"] for event, data in events if event == "message"]
+    (done,) = [data for event, data in events if event == "done"]
+    assert len(deltas) > 1
+    assert "".join(deltas) == done["response"]
+
+    # Generated separately, the JSON endpoint returns the same text
+    system_prompt, prompt, language, _ = chat.build_chat_prompt(message["message"])
+    assert done["response"] == chat.generate_chat_response(
+        system_prompt, prompt, language
+    )
+
+
+def test_accept_header_selects_the_stream(client):
+    response = client.post(
+        "/api/chat",
+        json={"message": "How do I grow paddy?"},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["X-Accel-Buffering"] == "no"
+    assert read_events(response)[-1][0] == "done"
+
+
+def test_repeated_questions_stream_from_the_cache(client, monkeypatch):
+    client.post("/api/chat/stream", json={"message": "How do I grow paddy?"}).get_data()
+    monkeypatch.setattr(chat.llm_router, "stream", pytest.fail)
+
+    events = read_events(
+        client.post("/api/chat/stream", json={"message": "how do i grow PADDY"})
+    )
+
+    assert [event for event, _ in events] == ["message", "done"]
+    assert events[0][1]["delta"] == events[1][1]["response"]
+
+
+def test_failure_before_any_text_streams_the_fallback(client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("upstream down")
+        yield
+
+    monkeypatch.setattr(chat.llm_router, "stream", broken)
+
+    events = read_events(client.post("/api/chat/stream", json={"message": "Hello"}))
+
+    assert [event for event, _ in events] == ["message", "done"]
+    assert events[1][1]["response"] == chat.get_fallback_response("Hello", "en")
+
+
+def test_interrupted_streams_report_an_error_and_are_not_cached(client, monkeypatch):
+    def interrupted(*args, **kwargs):
+        yield "Paddy needs standing water. "
+        yield "Keep 5 cm"
+        raise RuntimeError("connection reset by upstream")
+
+    monkeypatch.setattr(chat.llm_router, "stream", interrupted)
+    message = "Paddy water level?"
+
+    events = read_events(client.post("/api/chat/stream", json={"message": message}))
+
+    assert ("error", {"error": "Response interrupted"}) in events
+    assert "connection reset" not in json.dumps(events)
+    _, _, _, cache_key = chat.build_chat_prompt(message)
+    assert chat.response_cache.get_cache("chat").lookup(cache_key) is None
@@ -0,0 +1,57 @@
+from conftest import make_weather_payload
+
+from services import weather
+
+
+def test_report_parses_current_weather_and_forecast():
+    report = weather.WeatherReport.from_payload(
+        "Kochi", "IN", make_weather_payload(temperature=31, rain_1h=2.5)
+    )
+
+    assert report.current.temperature == 31
+    assert report.current.rain_1h == 2.5
+    assert report.current.visibility_km == 8
+    assert len(report.next_hours()) == 8
+    assert report.next_hours(2)[1].time.hour == 3
+
+
+def test_bucket_quantizes_temperature_and_flags_rain():
+    dry = make_weather_payload(temperature=29.4, description="clear sky")
+    dry["forecast"]["list"] = []
+    wet = make_weather_payload(temperature=28.1, rain_1h=1.0)
+
+    assert weather.WeatherReport.from_payload("Kochi", "IN", dry).bucket() == (
+        28,
+        "sky",
+        False,
+    )
+    assert weather.WeatherReport.from_payload("Kochi", "IN", wet).bucket()[::2] == (
+        28,
+        True,
+    )
+
+
+def test_city_names_are_normalized():
+    assert weather.normalize_city("  new   delhi ") == "New Delhi"
+
+
+def test_every_caller_shares_one_lookup_per_city(openweather):
+    first = weather.get_weather("kochi")
+    second = weather.get_weather(" Kochi ")
+
+    assert first.current.temperature == second.current.temperature
+    assert openweather.calls == [("Kochi", "IN")]
+
+
+def test_unexpected_payload_is_no_weather(openweather):
+    openweather.payloads[("Kochi", "IN")] = {"current": {"main": {}}}
+
+    assert weather.get_weather("Kochi") is None
+
+
+def test_home_and_knowledge_endpoints_share_the_cache(client, openweather):
+    forecast = client.get("/api/home/weather-forecast/Kochi")
+    analysis = client.get("/api/knowledge/weather-analysis")
+
+    assert forecast.status_code == analysis.status_code == 200
+    assert openweather.calls == [("Kochi", "IN")]
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from conftest import make_weather_payload
+
+
+def batch(client, **body):
+    response = client.post("/api/home/weather/batch", json=body)
+    if response.status_code != 200:
+        return response, None
+    lines = response.get_data(as_text=True).splitlines()
+    return response, {line["city"]: line for line in map(json.loads, lines)}
+
+
+def test_each_city_streams_one_line(client, openweather):
+    openweather.payloads[("Kollam", "IN")] = make_weather_payload(temperature=33.0)
+
+    response, results = batch(client, cities=["kochi", "Kollam"])
+
+    assert response.mimetype == "application/x-ndjson"
+    assert set(results) == {"Kochi", "Kollam"}
+    assert results["Kollam"]["data"]["current"]["temperature"] == 33
+    assert "insights" not in results["Kochi"]["data"]
+
+
+def test_cities_are_deduped_on_their_normalized_name(client, openweather):
+    _, results = batch(client, cities=["kochi", " Kochi ", "KOCHI"])
+
+    assert list(results) == ["Kochi"]
+    assert openweather.calls == [("Kochi", "IN")]
+
+
+def test_unavailable_cities_fail_on_their_own_line(client, openweather):
+    openweather.payloads[("Atlantis", "IN")] = None
+
+    _, results = batch(client, cities=["Kochi", "Atlantis"])
+
+    assert results["Kochi"]["success"]
+    assert results["Atlantis"] == {
+        "city": "Atlantis",
+        "success": False,
+        "error": "Weather data not available",
+    }
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {},
+        {"cities": []},
+        {"cities": "Kochi"},
+        {"cities": [1, "  "]},
+        {"cities": [f"City {n}" for n in range(101)]},
+    ],
+)
+def test_invalid_requests_are_rejected_before_streaming(client, openweather, body):
+    response, _ = batch(client, **body)
+
+    assert response.status_code == 400
+    assert response.json["success"] is False
+    assert openweather.calls == []
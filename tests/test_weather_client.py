@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from services import circuit_breaker, weather_client
+
+CURRENT = {"name": "Kochi", "main": {"temp": 29}}
+FORECAST = {"list": []}
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Answers OpenWeather calls by endpoint after `delay` seconds"""
+
+    def __init__(self, responses, delay=0):
+        self.responses = responses
+        self.delay = delay
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls.append((endpoint, params["q"]))
+        time.sleep(self.delay)
+        response = self.responses[endpoint]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+
+
+def use_session(monkeypatch, session):
+    monkeypatch.setattr(weather_client, "_session", session)
+    return session
+
+
+def test_current_and_forecast_are_fetched_concurrently(monkeypatch):
+    session = use_session(
+        monkeypatch,
+        FakeSession(
+            {
+                "weather": FakeResponse(200, CURRENT),
+                "forecast": FakeResponse(200, FORECAST),
+            },
+            delay=0.2,
+        ),
+    )
+
+    started = time.monotonic()
+    result = weather_client.fetch_weather("Kochi")
+
+    assert result == {"current": CURRENT, "forecast": FORECAST}
+    assert time.monotonic() - started < 0.35
+    assert sorted(session.calls) == [("forecast", "Kochi,IN"), ("weather", "Kochi,IN")]
+
+
+def test_forecast_failure_keeps_current_weather(monkeypatch):
+    use_session(
+        monkeypatch,
+        FakeSession(
+            {"weather": FakeResponse(200, CURRENT), "forecast": FakeResponse(500)}
+        ),
+    )
+
+    assert weather_client.fetch_weather("Kochi") == {
+        "current": CURRENT,
+        "forecast": None,
+    }
+
+
+def test_current_failure_means_no_weather(monkeypatch):
+    use_session(
+        monkeypatch,
+        FakeSession(
+            {
+                "weather": ConnectionError("down"),
+                "forecast": FakeResponse(200, FORECAST),
+            }
+        ),
+    )
+
+    assert weather_client.fetch_weather("Kochi") is None
+
+
+def test_missed_deadline_means_no_weather(monkeypatch):
+    monkeypatch.setattr(weather_client, "CURRENT_DEADLINE", 0.05)
+    use_session(
+        monkeypatch,
+        FakeSession(
+            {
+                "weather": FakeResponse(200, CURRENT),
+                "forecast": FakeResponse(200, FORECAST),
+            },
+            delay=0.3,
+        ),
+    )
+
+    assert weather_client.fetch_weather("Kochi") is None
+
+
+def test_unknown_city_does_not_count_against_the_breaker(monkeypatch):
+    use_session(
+        monkeypatch,
+        FakeSession({"weather": FakeResponse(404), "forecast": FakeResponse(404)}),
+    )
+
+    assert weather_client.fetch_weather("Atlantis") is None
+    assert circuit_breaker.get_breaker("openweather").failures == 0
+
+
+def test_missing_api_key_fails_before_any_call(monkeypatch):
+    monkeypatch.delenv("OPENWEATHER_API_KEY")
+    session = use_session(monkeypatch, FakeSession({}))
+
+    with pytest.raises(ValueError):
+        weather_client.fetch_weather("Kochi")
+    assert session.calls == []
+
+
+def test_session_is_shared(monkeypatch):
+    monkeypatch.setattr(weather_client, "_session", None)
+
+    assert weather_client.get_session() is weather_client.get_session()
@@ -0,0 +1,92 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+from conftest import make_weather_payload
+
+from models import WeatherLog, db
+from services import weather
+
+
+def forget_cached_weather():
+    weather.weather_cache.backend._entries.clear()
+
+
+def test_lookups_read_through_todays_log(app, openweather):
+    weather.get_weather("Kochi")
+    forget_cached_weather()
+    report = weather.get_weather("Kochi")
+
+    assert report.current.temperature == 29
+    assert openweather.calls == [("Kochi", "IN")]
+    log = WeatherLog.query.one()
+    assert (log.location, log.country, log.date) == ("Kochi", "IN", weather.utc_today())
+
+
+def test_logs_are_kept_per_country(app, openweather):
+    openweather.payloads[("Kochi", "US")] = make_weather_payload(temperature=12)
+    weather.get_weather("Kochi", "IN")
+    forget_cached_weather()
+
+    assert weather.get_weather("Kochi", "US").current.temperature == 12
+    assert openweather.calls == [("Kochi", "IN"), ("Kochi", "US")]
+    assert WeatherLog.query.count() == 2
+
+
+def test_observations_keep_the_days_extremes(app):
+    for temperature, rain in [(27, 0.0), (33, 4.0), (30, 1.0)]:
+        weather.save_weather_log(
+            "Kochi", make_weather_payload(temperature=temperature, rain_1h=rain)
+        )
+
+    log = WeatherLog.query.one()
+    assert (log.temperature_min, log.temperature_max, log.rainfall) == (27, 33, 4.0)
+    assert json.loads(log.payload)["current"]["main"]["temp"] == 30
+
+
+def test_outage_serves_the_stored_snapshot_briefly(app, openweather):
+    db.session.add(
+        WeatherLog(
+            location="Kochi",
+            country="IN",
+            date=weather.utc_today() - timedelta(days=2),
+            payload=json.dumps(make_weather_payload(temperature=26)),
+            date_updated=datetime.utcnow() - timedelta(days=2),
+        )
+    )
+    db.session.commit()
+    openweather.down = True
+
+    assert weather.get_weather("Kochi").current.temperature == 26
+    _, stored_at = weather.weather_cache.backend.get(("kochi", "IN"))
+    fresh_for = weather.weather_cache.ttl - (time.time() - stored_at)
+    assert 0 < fresh_for <= weather.WEATHER_FALLBACK_TTL
+
+
+def test_history_endpoint_filters_dates_and_country(client):
+    today = weather.utc_today()
+    for days_ago, country in [(1, "IN"), (3, "IN"), (20, "IN"), (1, "US")]:
+        db.session.add(
+            WeatherLog(
+                location="Kochi",
+                country=country,
+                date=today - timedelta(days=days_ago),
+                temperature_max=30,
+            )
+        )
+    db.session.commit()
+
+    response = client.get("/api/home/weather-history/kochi")
+    days = response.json["data"]["days"]
+
+    assert [day["date"] for day in days] == [
+        (today - timedelta(days=3)).isoformat(),
+        (today - timedelta(days=1)).isoformat(),
+    ]
+    assert {day["country"] for day in days} == {"IN"}
+
+
+def test_history_endpoint_rejects_bad_dates(client):
+    response = client.get("/api/home/weather-history/Kochi?from=yesterday")
+
+    assert response.status_code == 400
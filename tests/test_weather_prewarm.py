@@ -0,0 +1,60 @@
+from models import Farm, Farmer, db
+from services.weather_prewarm import WeatherPrewarmer, location_to_city
+
+
+def add_farms(*locations, inactive=()):
+    farmer = Farmer(name="Lakshmi", phone_number="9800000001")
+    db.session.add(farmer)
+    db.session.flush()
+    for location in locations + tuple(inactive):
+        db.session.add(
+            Farm(
+                farmer_id=farmer.id,
+                size=1.5,
+                location=location,
+                is_active=location not in inactive,
+            )
+        )
+    db.session.commit()
+
+
+def test_location_to_city():
+    assert location_to_city("Kottayam, Kerala") == "Kottayam"
+    assert location_to_city("Thrissur") == "Thrissur"
+
+
+def test_active_locations_are_distinct_cities_plus_default(app):
+    add_farms("kottayam, Kerala", "Kottayam", "Palakkad", inactive=["Idukki"])
+
+    assert WeatherPrewarmer(app).active_locations() == ["Kochi", "Kottayam", "Palakkad"]
+
+
+def test_run_once_refreshes_every_location(app, openweather):
+    add_farms("Palakkad, Kerala")
+    prewarmer = WeatherPrewarmer(app, concurrency=2)
+
+    assert prewarmer.run_once() == {"locations": 2, "refreshed": 2}
+    assert sorted(openweather.calls) == [("Kochi", "IN"), ("Palakkad", "IN")]
+    # Another round within WEATHER_LOG_MAX_AGE reuses the stored observations
+    assert prewarmer.run_once() == {"locations": 2, "refreshed": 2}
+    assert len(openweather.calls) == 2
+
+
+def test_failures_are_tracked_per_location(app, openweather):
+    prewarmer = WeatherPrewarmer(app)
+    openweather.down = True
+    prewarmer.run_once()
+
+    kochi = prewarmer.get_stats()["locations"]["Kochi"]
+    assert (kochi["successes"], kochi["failures"]) == (0, 1)
+    assert kochi["last_error"] == "weather unavailable"
+    assert kochi["lag_seconds"] is None
+
+    openweather.down = False
+    prewarmer.run_once()
+
+    stats = prewarmer.get_stats()
+    kochi = stats["locations"]["Kochi"]
+    assert stats["rounds"] == 2
+    assert (kochi["successes"], kochi["consecutive_failures"]) == (1, 0)
+    assert kochi["lag_seconds"] == 0
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Weather pre-warm worker for Krishi Sakhi
+
+Keeps weather_logs (and a shared sqlite weather cache, if configured)
+fresh for every active farm location so API workers rarely go upstream.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import create_app
+from services.weather_prewarm import (
+    PREWARM_CONCURRENCY,
+    PREWARM_INTERVAL,
+    WeatherPrewarmer,
+)
+
+
+def print_round(prewarmer, summary):
+    print(
+        f"🌦️  Round {prewarmer.rounds}: refreshed {summary['refreshed']}"
+        f"/{summary['locations']} locations"
+    )
+    for city, stats in sorted(prewarmer.get_stats()["locations"].items()):
+        status = "✅" if stats["consecutive_failures"] == 0 else "❌"
+        print(
+            f"   {status} {city}: {stats['last_duration_ms']} ms, "
+            f"lag {stats['lag_seconds']}s, failures {stats['failures']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Krishi Sakhi Weather Pre-warmer")
+    parser.add_argument(
+        "--once", action="store_true", help="Refresh every location once and exit"
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=PREWARM_INTERVAL,
+        help="Seconds between refresh rounds",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=PREWARM_CONCURRENCY,
+        help="Locations refreshed in parallel",
+    )
+
+    args = parser.parse_args()
+
+    app = create_app(start_services=False)
+    prewarmer = WeatherPrewarmer(
+        app, interval=args.interval, concurrency=args.concurrency
+    )
+
+    try:
+        while True:
+            print_round(prewarmer, prewarmer.run_once())
+            if args.once:
+                break
+            time.sleep(args.interval)
+
+    except KeyboardInterrupt:
+        print("👋 Weather pre-warmer stopped")
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
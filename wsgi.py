@@ -0,0 +1,17 @@
+"""
+WSGI entry point for production serving
+
+    gunicorn wsgi:app
+
+gunicorn picks up gunicorn.conf.py from the working directory. The app is
+built without its per-process services; the config's post_worker_init
+hook starts them in each worker, so preloading the app in the master is
+safe. The SDKs are imported here too (unless SDK_WARM_UP=false), once for
+every worker when the app is preloaded.
+"""
+
+import main
+
+app = main.create_app(start_services=False)
+if main.SDK_WARM_UP:
+    main.warm_up_sdks()